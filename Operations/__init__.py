@@ -1,17 +1,33 @@
 """
 Operations Package
 Simple imports for email and file operations
+
+The tool modules are imported on first access, so importing a light submodule
+(e.g. Operations.content_search in a search worker process) does not load the
+email client and LangChain.
 """
 
-from . import email_operations as email_functions
-from . import file_operations as file_functions
+import importlib
+
+
+_SUBMODULES = {
+    'email_functions': 'email_operations',
+    'file_functions': 'file_operations',
+}
 
-# Export the tools lists
-from .email_operations import LANGCHAIN_TOOLS as EMAIL_TOOLS
-from .file_operations import LANGCHAIN_TOOLS as FILE_TOOLS
 
-# Combined tools list
-ALL_TOOLS = EMAIL_TOOLS + FILE_TOOLS
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{_SUBMODULES[name]}", __name__)
+    # Export the tools lists
+    if name == 'EMAIL_TOOLS':
+        return __getattr__('email_functions').LANGCHAIN_TOOLS
+    if name == 'FILE_TOOLS':
+        return __getattr__('file_functions').LANGCHAIN_TOOLS
+    # Combined tools list
+    if name == 'ALL_TOOLS':
+        return __getattr__('EMAIL_TOOLS') + __getattr__('FILE_TOOLS')
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 __all__ = [
@@ -20,4 +36,4 @@ __all__ = [
     'EMAIL_TOOLS',
     'FILE_TOOLS',
     'ALL_TOOLS'
-]
\ No newline at end of file
+]
@@ -0,0 +1,164 @@
+"""
+Content Search
+grep-style regex/literal search inside files. Files are memory-mapped and large
+ones split into line-aligned chunks, so one file can be searched by several
+worker processes. Worker processes import only this module; it depends on the
+standard library alone, and the Operations package loads its tool modules lazily.
+"""
+
+import mmap
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+# Files are split into chunks of about this many bytes; each chunk is one task
+CHUNK_BYTES = 16 * 1024 * 1024
+# A NUL byte in the first BINARY_SNIFF_BYTES bytes marks a file as binary
+BINARY_SNIFF_BYTES = 8192
+# Matched lines and context lines longer than this are shortened (minified files)
+MAX_LINE_CHARS = 300
+
+
+def compile_pattern(pattern: str, literal: bool = False, case_sensitive: bool = False) -> re.Pattern:
+    """
+    Compile a search pattern for byte buffers. ^ and $ match at line boundaries;
+    case-insensitive matching only folds ASCII letters.
+    """
+    source = re.escape(pattern) if literal else pattern
+    flags = re.MULTILINE | (0 if case_sensitive else re.IGNORECASE)
+    return re.compile(source.encode("utf-8"), flags)
+
+
+def plan_chunks(files: List[Tuple[str, int]], chunk_bytes: Optional[int] = None) -> List[Tuple[str, int, int]]:
+    """Split (path, size) pairs into (path, start, end) byte ranges of at most chunk_bytes (default CHUNK_BYTES)"""
+    chunk_bytes = chunk_bytes or CHUNK_BYTES
+    chunks = []
+    for path, size in files:
+        for start in range(0, max(size, 1), chunk_bytes):
+            chunks.append((path, start, min(size, start + chunk_bytes)))
+    return chunks
+
+
+def _is_binary(buf) -> bool:
+    return buf.find(b"\x00", 0, BINARY_SNIFF_BYTES) != -1
+
+
+def _line_bounds(buf, position: int, size: int) -> Tuple[int, int]:
+    """Start and end (excluding the newline) of the line containing position"""
+    start = buf.rfind(b"\n", 0, position) + 1
+    end = buf.find(b"\n", position, size)
+    return start, size if end == -1 else end
+
+
+def _decode_line(buf, start: int, end: int) -> str:
+    text = buf[start:min(end, start + MAX_LINE_CHARS * 4)].decode("utf-8", errors="replace").rstrip("\r")
+    return text if len(text) <= MAX_LINE_CHARS else text[:MAX_LINE_CHARS] + "…"
+
+
+def _context(buf, line_start: int, line_end: int, size: int, lines: int) -> Tuple[List[str], List[str]]:
+    before = []
+    position = line_start
+    while len(before) < lines and position > 0:
+        start = buf.rfind(b"\n", 0, position - 1) + 1
+        before.insert(0, _decode_line(buf, start, position - 1))
+        position = start
+    after = []
+    position = line_end + 1
+    while len(after) < lines and position < size:
+        end = buf.find(b"\n", position, size)
+        end = size if end == -1 else end
+        after.append(_decode_line(buf, position, end))
+        position = end + 1
+    return before, after
+
+
+def _search_buffer(buf, size: int, start: int, end: int, regex: re.Pattern, context_lines: int,
+                   max_matches: int) -> Tuple[int, List[Dict]]:
+    """Matches on lines starting in [start, end); returns (newlines in that range, matches with chunk-relative lines)"""
+    # a line belongs to the chunk it starts in
+    if start > 0 and buf[start - 1:start] != b"\n":
+        newline = buf.find(b"\n", start, size)
+        start = size if newline == -1 else newline + 1
+    if end < size and buf[end - 1:end] != b"\n":
+        newline = buf.find(b"\n", end, size)
+        end = size if newline == -1 else newline + 1
+    if start >= end:
+        return 0, []
+
+    matches = []
+    line = 1
+    counted_to = start
+    position = start
+    while len(matches) < max_matches:
+        match = regex.search(buf, position, end)
+        if match is None:
+            break
+        line_start, line_end = _line_bounds(buf, match.start(), size)
+        if line_start >= end:
+            break
+        if match.end() > line_end + 1 and regex.search(buf, line_start, line_end) is None:
+            # matched across a newline (e.g. \s*); like grep, only a match within one line counts
+            position = line_end + 1
+            continue
+        line += buf[counted_to:line_start].count(b"\n")
+        counted_to = line_start
+        before, after = _context(buf, line_start, line_end, size, context_lines)
+        matches.append({"line": line, "text": _decode_line(buf, line_start, line_end),
+                        "before": before, "after": after})
+        # one result per line, however many times it matches
+        position = max(line_end + 1, match.end())
+        if position >= end:
+            break
+    return buf[start:end].count(b"\n"), matches
+
+
+def search_chunk(path: str, start: int, end: int, pattern: str, literal: bool, case_sensitive: bool,
+                 context_lines: int, max_matches: int) -> Dict:
+    """
+    Worker task: search one chunk of one file. Returns {'path', 'start', 'end', 'newlines', 'matches'}
+    with line numbers relative to the chunk, or 'binary'/'error' set when the file was skipped.
+    """
+    result = {"path": path, "start": start, "end": end, "newlines": 0, "matches": [], "binary": False,
+              "error": None}
+    regex = compile_pattern(pattern, literal, case_sensitive)
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return result
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                if _is_binary(buf):
+                    result["binary"] = True
+                    return result
+                result["newlines"], result["matches"] = _search_buffer(
+                    buf, size, start, min(end, size), regex, context_lines, max_matches
+                )
+    except (OSError, ValueError) as e:
+        result["error"] = str(e)
+    return result
+
+
+def number_matches(chunk_results: List[Dict], max_matches: Optional[int] = None) -> List[Dict]:
+    """
+    Turn chunk results into matches with absolute line numbers, ordered by line within each
+    file and files in the order they first appear in chunk_results. Every earlier chunk of a
+    file must be present to number a later one; matches of chunks with a missing predecessor
+    are dropped.
+    """
+    by_file = {}
+    for chunk in chunk_results:
+        by_file.setdefault(chunk["path"], []).append(chunk)
+
+    matches = []
+    for path in by_file:
+        lines_before = 0
+        expected_start = 0
+        for chunk in sorted(by_file[path], key=lambda c: c["start"]):
+            if chunk["start"] != expected_start:
+                break
+            for match in chunk["matches"]:
+                matches.append({"path": path, **match, "line": match["line"] + lines_before})
+            lines_before += chunk["newlines"]
+            expected_start = chunk["end"]
+    return matches[:max_matches] if max_matches is not None else matches
@@ -0,0 +1,162 @@
+"""
+Email Full-Text Index
+Local BM25-ranked search over subjects, senders, snippets and decoded bodies of
+every email the agent has fetched, using SQLite FTS5
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+
+# email_docs maps message ids to FTS rowids, so updates never scan the index
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS email_docs (
+    rowid INTEGER PRIMARY KEY,
+    message_id TEXT NOT NULL UNIQUE
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS email_fts USING fts5(
+    message_id UNINDEXED,
+    thread_id UNINDEXED,
+    date UNINDEXED,
+    subject,
+    sender,
+    recipient,
+    snippet,
+    body,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+# bm25() weights, in column order; unindexed columns get 0
+COLUMN_WEIGHTS = (0.0, 0.0, 0.0, 4.0, 3.0, 1.0, 1.0, 1.0)
+BODY_COLUMN = 7
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _match_expression(query: str, operator: str) -> Optional[str]:
+    """Turn free text into an FTS5 expression of quoted terms, so user input is never parsed as syntax"""
+    terms = _WORD_RE.findall(query)
+    if not terms:
+        return None
+    return f" {operator} ".join(f'"{term}"' for term in terms)
+
+
+class EmailIndex:
+    """SQLite FTS5 index of email text, filled incrementally as messages are fetched"""
+
+    def __init__(self, db_path: str):
+        self.db_path = os.path.expanduser(db_path)
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+    def add(self, email: Dict, body: Optional[str] = None) -> None:
+        """
+        Index an email details dict (id, thread_id, date, subject, from, to, snippet).
+        body=None keeps whatever body was indexed for the message before.
+        """
+        self.add_many([email], [body])
+
+    def add_many(self, emails: List[Dict], bodies: Optional[List[Optional[str]]] = None) -> None:
+        """Index several emails in one transaction; see add()"""
+        bodies = bodies or [None] * len(emails)
+        with self._lock, self._conn:
+            for email, body in zip(emails, bodies):
+                row = self._conn.execute(
+                    "SELECT rowid FROM email_docs WHERE message_id = ?", (email['id'],)
+                ).fetchone()
+                if row:
+                    rowid = row[0]
+                    if body is None:
+                        previous = self._conn.execute(
+                            "SELECT body FROM email_fts WHERE rowid = ?", (rowid,)
+                        ).fetchone()
+                        body = previous[0] if previous else ''
+                    self._conn.execute("DELETE FROM email_fts WHERE rowid = ?", (rowid,))
+                else:
+                    rowid = self._conn.execute(
+                        "INSERT INTO email_docs (message_id) VALUES (?)", (email['id'],)
+                    ).lastrowid
+
+                self._conn.execute(
+                    "INSERT INTO email_fts "
+                    "(rowid, message_id, thread_id, date, subject, sender, recipient, snippet, body) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        rowid,
+                        email['id'],
+                        email.get('thread_id', ''),
+                        email.get('date', ''),
+                        email.get('subject', ''),
+                        email.get('from', ''),
+                        email.get('to', ''),
+                        email.get('snippet', ''),
+                        body or '',
+                    )
+                )
+
+    def remove(self, message_ids: List[str]) -> None:
+        with self._lock, self._conn:
+            for message_id in message_ids:
+                row = self._conn.execute(
+                    "SELECT rowid FROM email_docs WHERE message_id = ?", (message_id,)
+                ).fetchone()
+                if row:
+                    self._conn.execute("DELETE FROM email_fts WHERE rowid = ?", (row[0],))
+                    self._conn.execute("DELETE FROM email_docs WHERE rowid = ?", (row[0],))
+
+    def _run_search(self, expression: str, max_results: int, offset: int) -> List[Dict]:
+        weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+        rows = self._conn.execute(
+            f"SELECT message_id, thread_id, date, subject, sender, snippet, "
+            f"snippet(email_fts, {BODY_COLUMN}, '[', ']', '…', 16), bm25(email_fts, {weights}) AS score "
+            f"FROM email_fts WHERE email_fts MATCH ? ORDER BY score LIMIT ? OFFSET ?",
+            (expression, max_results, offset)
+        ).fetchall()
+        return [
+            {
+                'id': row[0],
+                'thread_id': row[1],
+                'date': row[2],
+                'subject': row[3],
+                'from': row[4],
+                # the body excerpt around the hits, or the Gmail snippet if the body was never fetched
+                'excerpt': row[6] or row[5],
+                # bm25() is lower-is-better; flip it so higher means more relevant
+                'score': round(-row[7], 6)
+            }
+            for row in rows
+        ]
+
+    def search(self, query: str, max_results: int = 20, offset: int = 0) -> Dict:
+        """
+        BM25-ranked search. All terms must match; if nothing does, any-term matches
+        are returned instead. Returns {'matched': 'all'|'any', 'total', 'results'}.
+        """
+        with self._lock:
+            for operator, matched in (('AND', 'all'), ('OR', 'any')):
+                expression = _match_expression(query, operator)
+                if expression is None:
+                    break
+                total = self._conn.execute(
+                    "SELECT COUNT(*) FROM email_fts WHERE email_fts MATCH ?", (expression,)
+                ).fetchone()[0]
+                if total:
+                    return {
+                        'matched': matched,
+                        'total': total,
+                        'results': self._run_search(expression, max_results, offset)
+                    }
+        return {'matched': 'none', 'total': 0, 'results': []}
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM email_docs").fetchone()[0]
@@ -1,21 +1,40 @@
 # ============================================================
-# OAUTH SETUP - REPLACE YOUR CURRENT OAUTH SECTION WITH THIS
+# OAUTH SETUP
 import base64
 from email.mime.text import MIMEText
-from typing import List, Dict, Optional
+from email.utils import formatdate
+from typing import Callable, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors import HttpError
 import json
+import re
+from functools import lru_cache, partial, wraps
+from html.parser import HTMLParser
 from langchain_core.tools import tool
 
+from .email_index import EmailIndex
+from .email_outbox import EmailOutbox
+from .email_store import EmailStore
+from .gmail_executor import MAX_RETRIES, execute_request, execute_batch, is_retryable
+from .gmail_pool import ServicePool
+from .file_operations import normalize_path
 
 
+
+import asyncio
 import os
-import pickle
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import httplib2
 from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 
 SCOPES = [
     'https://www.googleapis.com/auth/gmail.readonly',
@@ -23,18 +42,122 @@ SCOPES = [
     'https://www.googleapis.com/auth/gmail.modify'
 ]
 
-# TOKEN_PICKLE = 'token.pickle'
 CREDENTIALS_FILE = 'credentials.json'  # Your OAuth client credentials from Google Cloud Console
+TOKEN_FILE = os.getenv('GMAIL_TOKEN_FILE', 'token.json')  # Authorized user token, written after the first login
+
+# Nothing here runs at import time: the OAuth flow and the service are created on the
+# first email tool call, so file-only sessions never need a browser or network access.
+_credentials = None
+_injected_service = None
+_service_lock = threading.Lock()
+_thread_local = threading.local()
+
+# Gmail services (one keep-alive connection each) shared by all threads through a pool;
+# GMAIL_POOL_SIZE caps how many exist, and so how many Gmail calls run at once
+GMAIL_POOL_SIZE = int(os.getenv('GMAIL_POOL_SIZE', '32'))
+GMAIL_POOL_IDLE_SECONDS = 300
+GMAIL_HTTP_TIMEOUT = 60
+_service_pool = None
+
+
+def _get_credentials() -> Credentials:
+    """Internal helper to load, refresh or (first time only) interactively obtain OAuth credentials"""
+    creds = None
+    if os.path.exists(TOKEN_FILE):
+        creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+    
+    if creds and creds.valid:
+        return creds
+    
+    if creds and creds.expired and creds.refresh_token:
+        creds.refresh(Request())
+    else:
+        flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
+        creds = flow.run_local_server(port=8080)
+    
+    with open(TOKEN_FILE, 'w') as token:
+        token.write(creds.to_json())
+    return creds
+
+
+@lru_cache(maxsize=1)
+def _gmail_discovery_document() -> str:
+    """Internal helper returning the Gmail discovery document bundled with googleapiclient"""
+    return get_static_doc('gmail', 'v1')
+
+
+def _build_gmail_service():
+    """Internal helper to build a Gmail service with its own keep-alive connection"""
+    return build_from_document(
+        _gmail_discovery_document(),
+        http=AuthorizedHttp(_credentials, http=httplib2.Http(timeout=GMAIL_HTTP_TIMEOUT))
+    )
+
+
+def get_gmail_service():
+    """
+    Return the Gmail API service for the calling thread, authenticating on first use.
+    googleapiclient's HTTP object is not thread-safe, so each thread leases its own
+    service from a shared pool; the lease ends with the surrounding gmail_service_scope()
+    (every email tool call is one) or when the thread exits.
+    """
+    global _credentials, _service_pool
+    if _injected_service is not None:
+        return _injected_service
+    
+    if _credentials is None:
+        with _service_lock:
+            if _credentials is None:
+                _credentials = _get_credentials()
+                _service_pool = ServicePool(
+                    _build_gmail_service,
+                    max_size=GMAIL_POOL_SIZE,
+                    max_idle_seconds=GMAIL_POOL_IDLE_SECONDS
+                )
+                print("✅ Gmail service authenticated successfully!")
+    
+    lease = getattr(_thread_local, 'lease', None)
+    if lease is None:
+        lease = _thread_local.lease = _service_pool.acquire()
+    return lease.service
+
+
+@contextmanager
+def gmail_service_scope():
+    """Keep one pooled Gmail service leased to the calling thread until the block ends (re-entrant)"""
+    depth = getattr(_thread_local, 'scope_depth', 0)
+    # a lease taken before the scope began belongs to the caller, not to the scope
+    leased_before = getattr(_thread_local, 'lease', None) is not None
+    _thread_local.scope_depth = depth + 1
+    try:
+        yield
+    finally:
+        _thread_local.scope_depth = depth
+        lease = getattr(_thread_local, 'lease', None)
+        if depth == 0 and lease is not None and not leased_before:
+            _thread_local.lease = None
+            lease.release()
+
 
-flow = InstalledAppFlow.from_client_secrets_file('credentials.json', SCOPES)
-creds = flow.run_local_server(port=8080)
-service = build('gmail', 'v1', credentials=creds)
+def _pooled(func):
+    """Internal helper running func inside gmail_service_scope(), so its service goes back to the pool"""
+    @wraps(func)
+    def _pooled_func(*args, **kwargs):
+        with gmail_service_scope():
+            return func(*args, **kwargs)
+    return _pooled_func
 
 
+def get_gmail_pool_stats() -> Dict:
+    """Size, use and health-check counters of the Gmail service pool"""
+    return _service_pool.stats() if _service_pool is not None else {'size': 0, 'max_size': GMAIL_POOL_SIZE}
 
-# Initialize service
-# service = get_gmail_service()
-print("✅ Gmail service authenticated successfully!")
+
+def set_gmail_service(service) -> None:
+    """Replace the Gmail API service for all threads (e.g. with a local fake); pass None to undo"""
+    global _injected_service
+    with _service_lock:
+        _injected_service = service
 
 
 
@@ -42,14 +165,8 @@ print("✅ Gmail service authenticated successfully!")
 # HELPER FUNCTIONS (Internal use)
 # ============================================================
 
-def _get_email_details(message_id: str) -> Dict:
-    """Internal helper to get email details"""
-    message = service.users().messages().get(
-        userId='me',
-        id=message_id,
-        format='full'
-    ).execute()
-    
+def _parse_email_details(message: Dict) -> Dict:
+    """Internal helper to turn a Gmail message resource into a details dict"""
     headers = message['payload']['headers']
     subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
     sender = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown')
@@ -57,7 +174,7 @@ def _get_email_details(message_id: str) -> Dict:
     to = next((h['value'] for h in headers if h['name'] == 'To'), 'Unknown')
     
     return {
-        'id': message_id,
+        'id': message['id'],
         'subject': subject,
         'from': sender,
         'to': to,
@@ -67,25 +184,806 @@ def _get_email_details(message_id: str) -> Dict:
     }
 
 
+# Only the headers and fields _parse_email_details reads are requested, so listing
+# tools never download message bodies
+METADATA_HEADERS = ['Subject', 'From', 'To', 'Date']
+METADATA_FIELDS = 'id,threadId,labelIds,snippet,internalDate,payload/headers'
+
+
+def _metadata_request(message_id: str):
+    """Internal helper to build a metadata-only messages.get request"""
+    return get_gmail_service().users().messages().get(
+        userId='me',
+        id=message_id,
+        format='metadata',
+        metadataHeaders=METADATA_HEADERS,
+        fields=METADATA_FIELDS
+    )
+
+
+def _get_email_details(message_id: str) -> Dict:
+    """Internal helper to get email details"""
+    message = execute_request(_metadata_request(message_id))
+    return _parse_email_details(message)
+
+
+# Gmail accepts up to 100 calls per batch, but recommends staying at 50 or below
+BATCH_SIZE = 50
+
+
+def _get_messages_batch(message_ids: List[str]) -> Tuple[Dict[str, Dict], Dict[str, Exception]]:
+    """
+    Internal helper to fetch metadata for many messages using Gmail batch requests.
+    Returns (messages, errors), both keyed by message id.
+    """
+    messages = {}
+    errors = {}
+    
+    # request ids must be unique within a batch
+    unique_ids = list(dict.fromkeys(message_ids))
+    for start in range(0, len(unique_ids), BATCH_SIZE):
+        chunk = unique_ids[start:start + BATCH_SIZE]
+        responses, failures = execute_batch(
+            get_gmail_service(),
+            {message_id: _metadata_request(message_id) for message_id in chunk}
+        )
+        messages.update(responses)
+        errors.update(failures)
+    
+    return messages, errors
+
+
+def _get_email_details_batch(message_ids: List[str]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Internal helper to get details for many emails using Gmail batch requests.
+    Returns (emails, failed): emails keep the order of message_ids, failed lists
+    the ids whose individual fetch errored.
+    """
+    messages, errors = _get_messages_batch(message_ids)
+    details = {message_id: _parse_email_details(message) for message_id, message in messages.items()}
+    
+    _index_emails(list(details.values()))
+    
+    emails = [details[message_id] for message_id in message_ids if message_id in details]
+    failed = [{'id': message_id, 'error': str(error)} for message_id, error in errors.items()]
+    return emails, failed
+
+
 # ============================================================
-# CORE EMAIL FUNCTIONS
+# PAGINATION
 # ============================================================
 
-def send_email(to: str, subject: str, body: str) -> Dict:
-    """Send an email to a recipient."""
+# Ids listed per messages.list call (Gmail allows up to 500)
+LIST_PAGE_SIZE = 100
+
+def _encode_cursor(q: str, page_token: Optional[str], offset: int, email_chars: Optional[int] = None) -> str:
+    """
+    Internal helper to encode a resumable position in a query's results; email_chars carries
+    the measured size of a compacted email to the next call of a token-budgeted listing
+    """
+    position = {'q': q, 'page_token': page_token, 'offset': offset}
+    if email_chars:
+        position['email_chars'] = email_chars
+    return base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('utf-8')
+
+
+def _decode_cursor(cursor: str, q: str) -> Dict:
+    """Internal helper to decode a cursor, checking it belongs to the query q"""
     try:
-        message = MIMEText(body)
-        message['to'] = to
-        message['subject'] = subject
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode('utf-8')))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if position.get('q') != q:
+        raise ValueError(f"Cursor belongs to query '{position.get('q')}', not '{q}'")
+    return position
+
+
+def _list_message_page(q: str, page_size: int, page_token: Optional[str]) -> Tuple[List[Dict], Optional[str]]:
+    """Internal helper to list one page of message ids"""
+    results = execute_request(get_gmail_service().users().messages().list(
+        userId='me',
+        q=q,
+        maxResults=page_size,
+        pageToken=page_token
+    ))
+    return results.get('messages', []), results.get('nextPageToken')
+
+
+def _iter_message_pages(q: str, page_size: int = LIST_PAGE_SIZE, page_token: Optional[str] = None,
+                        needed: Optional[int] = None):
+    """
+    Generator over pages of message ids matching the Gmail query q.
+    Yields (page_token, messages, next_page_token). The next page is listed in a
+    background thread while the caller processes the current one; listing ahead
+    stops once `needed` ids have been produced, after which pages are listed only
+    as the caller asks for them.
+    """
+    produced = 0
+    with ThreadPoolExecutor(max_workers=1) as lister:
+        pending = lister.submit(_list_message_page, q, page_size, page_token)
+        while pending is not None:
+            messages, next_page_token = pending.result()
+            produced += len(messages)
+            
+            if next_page_token and (needed is None or produced < needed):
+                pending = lister.submit(_list_message_page, q, page_size, next_page_token)
+            else:
+                pending = None
+            
+            yield page_token, messages, next_page_token
+            page_token = next_page_token
+            if pending is None and next_page_token:
+                pending = lister.submit(_list_message_page, q, page_size, next_page_token)
+
+
+def iter_emails(query: str = "", page_size: int = LIST_PAGE_SIZE):
+    """
+    Stream email details for every message matching a Gmail query, one page at a time.
+    Yields lists of email dicts; memory use is bounded by page_size.
+    """
+    for _, messages, _ in _iter_message_pages(query, page_size):
+        emails, _ = _get_email_details_batch([msg['id'] for msg in messages])
+        yield emails
+
+
+def _list_emails(q: str, max_results: int, cursor: Optional[str] = None, max_tokens: int = 0, **extra) -> Dict:
+    """
+    Internal helper to list emails matching the Gmail query q, from the local store when
+    it can answer. Pass the returned next_cursor back as cursor to continue the listing.
+    max_tokens > 0 returns compacted emails within that token budget (see _shape_list_result),
+    and only fetches about as many emails as fit in it.
+    """
+    position = _decode_cursor(cursor, q) if cursor else {'q': q, 'page_token': None, 'offset': 0}
+    page_token, offset = position['page_token'], position['offset']
+    
+    store = _get_synced_email_store() if page_token is None else None
+    if store is not None:
+        emails = store.search(q, max_results + 1, offset)
+        if emails is not None:
+            result = {'success': True, **extra, 'count': min(len(emails), max_results),
+                      'emails': emails[:max_results], 'source': 'local_store'}
+            if len(emails) > max_results:
+                result['next_cursor'] = _encode_cursor(q, None, offset + max_results)
+            if max_tokens:
+                _shape_list_result(result, max_tokens, lambda kept: _encode_cursor(q, None, offset + kept))
+            return result
+    
+    emails = []
+    failed = []
+    # position to resume right after each fetched message, by message id
+    resume_after = {}
+    taken = 0
+    email_chars = position.get('email_chars')
+    wanted = max_results
+    if max_tokens:
+        wanted = max(1, min(max_results, _emails_that_fit(emails, max_tokens, extra, email_chars)))
+    next_cursor = None
+    page_size = max(1, min(max_results, LIST_PAGE_SIZE))
+    
+    for page_token, messages, next_page_token in _iter_message_pages(q, page_size, page_token, offset + wanted):
+        # a cursor's offset may reach past the first page it points at
+        skip = min(offset, len(messages))
+        offset -= skip
+        read_to = skip
         
-        raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
-        send_message = {'raw': raw_message}
+        while read_to < len(messages) and taken < wanted:
+            take = messages[read_to:read_to + wanted - taken]
+            for i, msg in enumerate(take, start=read_to + 1):
+                resume_after[msg['id']] = (page_token, i) if i < len(messages) else (next_page_token, 0)
+            read_to += len(take)
+            taken += len(take)
+            
+            page_emails, page_failed = _get_email_details_batch([msg['id'] for msg in take])
+            emails.extend(page_emails)
+            failed.extend(page_failed)
+            if max_tokens and emails:
+                email_chars = _average_email_chars(emails)
+                wanted = min(max_results, taken + _emails_that_fit(emails, max_tokens, extra, email_chars))
         
-        result = service.users().messages().send(
-            userId='me',
-            body=send_message
-        ).execute()
+        if taken >= wanted:
+            if read_to < len(messages):
+                next_cursor = _encode_cursor(q, page_token, read_to, email_chars)
+            elif next_page_token:
+                next_cursor = _encode_cursor(q, next_page_token, 0, email_chars)
+            break
+    
+    result = {'success': True, **extra, 'count': len(emails), 'emails': emails}
+    if failed:
+        result['failed'] = failed
+    if next_cursor:
+        result['next_cursor'] = next_cursor
+        if wanted < max_results:
+            # stopped at the token budget rather than at max_results
+            result['truncated'] = True
+            result['omitted'] = {'count': max_results - taken}
+    if max_tokens:
+        _shape_list_result(result, max_tokens,
+                           lambda kept: _encode_cursor(q, *resume_after[emails[kept - 1]['id']], email_chars))
+    return result
+
+
+# ============================================================
+# RESULT SHAPING
+# ============================================================
+
+# Tool results go back to the LLM on every later turn, so list tools return only
+# LIST_RESULT_FIELDS, snippets cut to SNIPPET_MAX_CHARS, and at most LIST_TOKEN_BUDGET
+# tokens of JSON; emails over the budget are summarised and left for next_cursor.
+LIST_RESULT_FIELDS = tuple(
+    field.strip() for field in os.getenv('EMAIL_RESULT_FIELDS', 'id,thread_id,from,subject,date,snippet').split(',')
+)
+SNIPPET_MAX_CHARS = int(os.getenv('EMAIL_SNIPPET_CHARS', '100'))
+LIST_TOKEN_BUDGET = int(os.getenv('EMAIL_RESULT_TOKEN_BUDGET', '1500'))
+
+# Characters held back for the summary of omitted emails
+OMITTED_SUMMARY_CHARS = 300
+
+# With a token budget, list tools fetch only as many emails as should fit instead of
+# max_results. The first fetch assumes ESTIMATED_EMAIL_CHARS per compacted email (on the
+# high side); later fetches and pages (via next_cursor) use the measured size.
+ESTIMATED_EMAIL_CHARS = 2 * SNIPPET_MAX_CHARS + 200
+
+
+def _to_json(result: Dict) -> str:
+    """Internal helper to serialise a tool result compactly (no padding, unescaped unicode)"""
+    return json.dumps(result, separators=(',', ':'), ensure_ascii=False)
+
+
+def _compact_email(email: Dict, text_field: str = 'snippet') -> Dict:
+    """Internal helper to project an email onto LIST_RESULT_FIELDS and shorten its snippet (or excerpt)"""
+    fields = [text_field if field == 'snippet' else field for field in LIST_RESULT_FIELDS]
+    compact = {field: email[field] for field in fields if field in email}
+    text = compact.get(text_field)
+    if text and SNIPPET_MAX_CHARS and len(text) > SNIPPET_MAX_CHARS:
+        compact[text_field] = text[:SNIPPET_MAX_CHARS].rstrip() + '…'
+    return compact
+
+
+def _fit_token_budget(result: Dict, key: str, max_tokens: int) -> int:
+    """
+    Internal helper to drop trailing items of result[key] until the JSON result fits in
+    max_tokens, adding a summary of the dropped ones. Returns how many items were kept.
+    """
+    items = result[key]
+    budget = max_tokens * CHARS_PER_TOKEN
+    if len(_to_json(result)) <= budget:
+        return len(items)
+    
+    used = len(_to_json({**result, key: []})) + OMITTED_SUMMARY_CHARS
+    kept = 0
+    for item in items:
+        used += len(_to_json(item)) + 1
+        # always keep one item, so a tiny budget still makes progress through the listing
+        if used > budget and kept:
+            break
+        kept += 1
+    
+    omitted = items[kept:]
+    senders = Counter(item.get('from', 'Unknown') for item in omitted)
+    result[key] = items[:kept]
+    result['count'] = kept
+    result['truncated'] = True
+    result['omitted'] = {
+        'count': len(omitted),
+        'top_senders': [{'from': sender, 'count': count} for sender, count in senders.most_common(3)]
+    }
+    return kept
+
+
+def _shape_list_result(result: Dict, max_tokens: int, cursor_after: Callable[[int], str]) -> Dict:
+    """
+    Internal helper to compact a _list_emails result and cut it to max_tokens;
+    cursor_after(kept) is the cursor resuming after the first kept emails
+    """
+    result['emails'] = [_compact_email(email) for email in result['emails']]
+    total = len(result['emails'])
+    kept = _fit_token_budget(result, 'emails', max_tokens)
+    if kept < total:
+        result['next_cursor'] = cursor_after(kept)
+    return result
+
+
+def _average_email_chars(emails: List[Dict]) -> int:
+    """Internal helper: average size of the emails once compacted, in JSON characters"""
+    return -(-sum(len(_to_json(_compact_email(email))) + 1 for email in emails) // len(emails))
+
+
+def _emails_that_fit(emails: List[Dict], max_tokens: int, extra: Dict, email_chars: Optional[int] = None) -> int:
+    """
+    Internal helper estimating how many more emails fit in max_tokens next to the ones
+    fetched so far, at email_chars per email (ESTIMATED_EMAIL_CHARS if not measured yet)
+    """
+    email_chars = email_chars or ESTIMATED_EMAIL_CHARS
+    overhead = len(_to_json({'success': True, **extra, 'count': 0, 'emails': [], 'next_cursor': 'x' * 120}))
+    used = sum(len(_to_json(_compact_email(email))) + 1 for email in emails)
+    return max(0, (max_tokens * CHARS_PER_TOKEN - overhead - used) // email_chars)
+
+
+# ============================================================
+# LOCAL METADATA STORE
+# ============================================================
+
+# The store is opt-in: set EMAIL_STORE_PATH (e.g. ~/.gmail_agent/metadata.db) to enable it.
+# Reads answered locally are at most EMAIL_STORE_MAX_AGE seconds behind Gmail. The initial
+# backfill runs on a background thread and resumes where it stopped after a restart; reads
+# go to the Gmail API until it has finished.
+_email_store = None
+_email_store_backfill = None
+_email_store_backfill_lock = threading.Lock()
+
+
+def _get_email_store() -> Optional[EmailStore]:
+    """Internal helper to open the local metadata store on first use"""
+    global _email_store
+    store_path = os.getenv('EMAIL_STORE_PATH', '')
+    if _email_store is None and store_path:
+        _email_store = EmailStore(store_path)
+    return _email_store
+
+
+def _mailbox_changed() -> None:
+    """Internal helper called after mutations: drops cached stats and counts and forces a store sync"""
+    _clear_inbox_stats_cache()
+    _clear_count_cache()
+    if _email_store is not None:
+        _email_store.mark_stale()
+
+
+def _labels_changed(message_ids: List[str], add: List[str] = (), remove: List[str] = ()) -> None:
+    """
+    Internal helper called after label changes: drops cached stats and counts and applies the
+    change to the store directly, so the next local read needs no history sync for it
+    """
+    _clear_inbox_stats_cache()
+    _clear_count_cache()
+    if _email_store is not None:
+        _email_store.update_labels(message_ids, add, remove)
+    if 'TRASH' in add:
+        _unindex_emails(message_ids)
+
+
+def _refresh_store_messages(store: EmailStore, message_ids: List[str]) -> None:
+    """Internal helper to re-fetch metadata for messages and write it to the store"""
+    for start in range(0, len(message_ids), 500):
+        chunk = message_ids[start:start + 500]
+        messages, errors = _get_messages_batch(chunk)
+        store.upsert_messages(list(messages.values()))
+        trashed = [message_id for message_id, message in messages.items() if 'TRASH' in message.get('labelIds', [])]
+        _index_emails([
+            _parse_email_details(message) for message in messages.values()
+            if 'TRASH' not in message.get('labelIds', [])
+        ])
+        gone = [
+            message_id for message_id, error in errors.items()
+            if isinstance(error, HttpError) and error.resp.status == 404
+        ]
+        store.delete_messages(gone)
+        _unindex_emails(trashed + gone)
+
+
+def _backfill_email_store(store: EmailStore) -> None:
+    """
+    Internal helper to load metadata for the whole mailbox into the store. The page token is
+    checkpointed after every page, so an interrupted backfill continues from the last page.
+    """
+    history_id, page_token = store.backfill_checkpoint()
+    if history_id is None:
+        store.reset()
+        # Taken before listing, so anything that changes during the backfill shows up in the next delta
+        history_id = execute_request(get_gmail_service().users().getProfile(userId='me'))['historyId']
+        page_token = ''
+        store.save_backfill_checkpoint(history_id, page_token)
+    
+    while True:
+        try:
+            results = execute_request(get_gmail_service().users().messages().list(
+                userId='me',
+                maxResults=500,
+                includeSpamTrash=True,
+                pageToken=page_token or None
+            ))
+        except HttpError as e:
+            # a checkpointed page token Gmail no longer accepts: start over
+            if page_token and e.resp.status == 400:
+                store.reset()
+                _backfill_email_store(store)
+                return
+            raise
+        _refresh_store_messages(store, [msg['id'] for msg in results.get('messages', [])])
         
+        page_token = results.get('nextPageToken')
+        if not page_token:
+            break
+        store.save_backfill_checkpoint(history_id, page_token)
+    
+    store.mark_synced(history_id)
+    store.mark_backfill_complete()
+
+
+@_pooled
+def _run_email_store_backfill(store: EmailStore) -> None:
+    """Internal helper: body of the background backfill thread"""
+    try:
+        _backfill_email_store(store)
+    except Exception as e:
+        print(f"⚠️ Email store backfill stopped, it resumes on the next read: {e}")
+
+
+def _start_email_store_backfill(store: EmailStore) -> None:
+    """Internal helper to start the background backfill unless it is already running"""
+    global _email_store_backfill
+    with _email_store_backfill_lock:
+        if _email_store_backfill is None or not _email_store_backfill.is_alive():
+            _email_store_backfill = threading.Thread(
+                target=_run_email_store_backfill, args=(store,), name='email-store-backfill', daemon=True
+            )
+            _email_store_backfill.start()
+
+
+def _sync_email_store_history(store: EmailStore) -> None:
+    """Internal helper to apply Gmail history deltas since the store's last sync"""
+    touched = set()
+    deleted = set()
+    page_token = None
+    
+    while True:
+        try:
+            results = execute_request(get_gmail_service().users().history().list(
+                userId='me',
+                startHistoryId=store.history_id,
+                pageToken=page_token
+            ))
+        except HttpError as e:
+            # History ids expire after about a week; start over from a full backfill
+            if e.resp.status == 404:
+                store.reset()
+                return
+            raise
+        
+        for record in results.get('history', []):
+            for key in ('messagesAdded', 'labelsAdded', 'labelsRemoved'):
+                touched.update(item['message']['id'] for item in record.get(key, []))
+            deleted.update(item['message']['id'] for item in record.get('messagesDeleted', []))
+        
+        page_token = results.get('nextPageToken')
+        if not page_token:
+            break
+    
+    store.delete_messages(list(deleted))
+    _unindex_emails(list(deleted))
+    _refresh_store_messages(store, list(touched - deleted))
+    store.mark_synced(results['historyId'])
+
+
+def _get_synced_email_store() -> Optional[EmailStore]:
+    """
+    Internal helper returning the store once it is within EMAIL_STORE_MAX_AGE, or None.
+    Starts the background backfill when the store has not been filled yet.
+    """
+    store = _get_email_store()
+    if store is None:
+        return None
+    
+    max_age = float(os.getenv('EMAIL_STORE_MAX_AGE', '60'))
+    if store.is_fresh(max_age):
+        return store
+    
+    if store.is_complete and store.history_id is not None:
+        try:
+            _sync_email_store_history(store)
+        except Exception as e:
+            print(f"⚠️ Email store sync failed, falling back to Gmail API: {e}")
+            return None
+        # an expired history id resets the store, which then needs a new backfill
+        if store.is_complete:
+            return store
+    
+    _start_email_store_backfill(store)
+    return None
+
+
+# ============================================================
+# LOCAL FULL-TEXT INDEX
+# ============================================================
+
+# Every email the tools fetch is added to a local BM25 index for offline search.
+# EMAIL_INDEX_PATH moves it; setting it to an empty string turns indexing off.
+DEFAULT_EMAIL_INDEX_PATH = '~/.gmail_agent/email_index.db'
+_email_index = None
+_email_index_disabled = False
+
+
+def _get_email_index() -> Optional[EmailIndex]:
+    """Internal helper to open the full-text index on first use; None when disabled or unavailable"""
+    global _email_index, _email_index_disabled
+    if _email_index is None and not _email_index_disabled:
+        index_path = os.getenv('EMAIL_INDEX_PATH', DEFAULT_EMAIL_INDEX_PATH)
+        try:
+            if index_path:
+                _email_index = EmailIndex(index_path)
+            else:
+                _email_index_disabled = True
+        except Exception as e:
+            print(f"⚠️ Email index unavailable, local search disabled: {e}")
+            _email_index_disabled = True
+    return _email_index
+
+
+def _index_emails(emails: List[Dict], bodies: Optional[List[Optional[str]]] = None) -> None:
+    """Internal helper to add fetched emails to the index; indexing never fails a tool call"""
+    index = _get_email_index()
+    if index is None or not emails:
+        return
+    try:
+        index.add_many(emails, bodies)
+    except Exception as e:
+        print(f"⚠️ Could not index emails: {e}")
+
+
+def _unindex_emails(message_ids: List[str]) -> None:
+    """Internal helper to drop trashed or deleted emails from the index; never fails a tool call"""
+    index = _get_email_index()
+    if index is None or not message_ids:
+        return
+    try:
+        index.remove(message_ids)
+    except Exception as e:
+        print(f"⚠️ Could not remove emails from the index: {e}")
+
+
+def _index_sent_email(result: Dict, to: str, subject: str, body: str) -> None:
+    """Internal helper to index an email just sent, from what was sent instead of fetching it back"""
+    _index_emails([{
+        'id': result['id'],
+        'thread_id': result.get('threadId', ''),
+        'date': formatdate(localtime=True),
+        'subject': subject,
+        'from': 'me',
+        'to': to,
+        'snippet': ' '.join(body.split())[:200]
+    }], [body])
+
+
+# ============================================================
+# OUTBOX
+# ============================================================
+
+# send_email and reply_to_email queue messages in a durable outbox and return a tracking
+# id at once; OUTBOX_WORKERS background threads send them. EMAIL_OUTBOX_PATH moves the
+# queue; setting it to an empty string makes sends synchronous again. An outbox left by an
+# earlier session is reopened when this module loads, so its queued emails go out then.
+DEFAULT_EMAIL_OUTBOX_PATH = '~/.gmail_agent/outbox.db'
+OUTBOX_WORKERS = 4
+OUTBOX_MAX_ATTEMPTS = 5
+_email_outbox = None
+_email_outbox_disabled = False
+_email_outbox_lock = threading.Lock()
+
+
+class _NothingSentError(Exception):
+    """A send that failed before messages.send was called (e.g. reading the replied-to email)"""
+    
+    def __init__(self, error: Exception):
+        super().__init__(str(error))
+        self.error = error
+
+
+def _outbox_retryable(error: Exception) -> bool:
+    """
+    Internal helper used as the outbox's retry test: failures before the send are retried
+    like any read, the send itself only on rate limits
+    """
+    if isinstance(error, _NothingSentError):
+        return is_retryable(error.error)
+    return is_retryable(error, idempotent=False)
+
+
+@_pooled
+def _deliver_email(kind: str, payload: Dict) -> Dict:
+    """Internal helper the outbox workers use to send one queued email; the outbox does the retrying"""
+    if kind == 'reply':
+        return _send_reply(payload['replied_to'], payload['reply_body'], send_retries=0)[0]
+    return _send_message(payload['to'], payload['subject'], payload['body'], send_retries=0)
+
+
+def _get_email_outbox() -> Optional[EmailOutbox]:
+    """Internal helper to open the outbox on first use and resume sends left from earlier sessions"""
+    global _email_outbox, _email_outbox_disabled
+    with _email_outbox_lock:
+        if _email_outbox is None and not _email_outbox_disabled:
+            outbox_path = os.getenv('EMAIL_OUTBOX_PATH', DEFAULT_EMAIL_OUTBOX_PATH)
+            try:
+                if outbox_path:
+                    _email_outbox = EmailOutbox(
+                        outbox_path,
+                        _deliver_email,
+                        _outbox_retryable,
+                        workers=OUTBOX_WORKERS,
+                        max_attempts=OUTBOX_MAX_ATTEMPTS
+                    )
+                    _email_outbox.start()
+                else:
+                    _email_outbox_disabled = True
+            except Exception as e:
+                print(f"⚠️ Email outbox unavailable, sending synchronously: {e}")
+                _email_outbox_disabled = True
+    return _email_outbox
+
+
+def _resume_email_outbox() -> None:
+    """Internal helper run when the module loads: reopens an existing outbox so emails queued earlier are sent"""
+    outbox_path = os.getenv('EMAIL_OUTBOX_PATH', DEFAULT_EMAIL_OUTBOX_PATH)
+    if outbox_path and os.path.exists(os.path.expanduser(outbox_path)):
+        _get_email_outbox()
+
+
+# ============================================================
+# MESSAGE BODIES
+# ============================================================
+
+# Decoded bodies are immutable, so they are kept per message id for the whole session
+BODY_CACHE_SIZE = 256
+
+
+class _HTMLTextExtractor(HTMLParser):
+    """Minimal HTML to text converter: drops scripts/styles, breaks lines at block tags"""
+    
+    BLOCK_TAGS = {'p', 'div', 'br', 'li', 'tr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'table', 'blockquote'}
+    SKIP_TAGS = {'script', 'style', 'head', 'title'}
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.chunks = []
+        self._skip_depth = 0
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self.chunks.append('\n')
+    
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in self.BLOCK_TAGS:
+            self.chunks.append('\n')
+    
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.chunks.append(data)
+
+
+def _html_to_text(html: str) -> str:
+    """Internal helper to convert an HTML body to readable plain text"""
+    extractor = _HTMLTextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    lines = (' '.join(line.split()) for line in ''.join(extractor.chunks).splitlines())
+    text = '\n'.join(lines)
+    # collapse the runs of blank lines left behind by nested block tags
+    while '\n\n\n' in text:
+        text = text.replace('\n\n\n', '\n\n')
+    return text.strip()
+
+
+def _decode_body_data(data: str) -> str:
+    """Internal helper to decode a base64url message part"""
+    padded = data + '=' * (-len(data) % 4)
+    return base64.urlsafe_b64decode(padded).decode('utf-8', errors='replace')
+
+
+def _extract_body(payload: Dict) -> str:
+    """
+    Internal helper to pull the text body out of a message payload.
+    Walks nested multipart trees; prefers the first text/plain part and falls
+    back to converting the first text/html part. Attachments are skipped.
+    """
+    plain = None
+    html = None
+    stack = [payload]
+    
+    while stack and plain is None:
+        part = stack.pop()
+        if part.get('parts'):
+            # reversed so parts are visited in document order
+            stack.extend(reversed(part['parts']))
+            continue
+        if part.get('filename') or 'data' not in part.get('body', {}):
+            continue
+        if part.get('mimeType') == 'text/plain':
+            plain = _decode_body_data(part['body']['data'])
+        elif part.get('mimeType') == 'text/html' and html is None:
+            html = _decode_body_data(part['body']['data'])
+    
+    if plain is not None:
+        return plain
+    return _html_to_text(html) if html is not None else ""
+
+
+# Rough size of an LLM token, used to cap how much text a tool returns
+CHARS_PER_TOKEN = 4
+
+_REPLY_HEADER_RE = re.compile(r'^\s*On\b.*\bwrote:\s*$', re.IGNORECASE)
+_FORWARD_HEADER_RE = re.compile(r'^\s*-{2,}\s*(Original Message|Forwarded message)\s*-{2,}\s*$', re.IGNORECASE)
+_OUTLOOK_HEADER_RE = re.compile(r'^\s*From:\s.+$', re.IGNORECASE)
+
+
+def _strip_quoted_text(body: str) -> str:
+    """
+    Internal helper to drop the quoted history a reply carries along: '>' lines and
+    everything after an 'On ... wrote:', '--- Original Message ---' or Outlook
+    'From:/Sent:' header.
+    """
+    lines = body.splitlines()
+    kept = []
+    for i, line in enumerate(lines):
+        # Gmail often wraps the attribution line: "On Mon, ... Alice <\nalice@x.com> wrote:"
+        joined = line + ' ' + lines[i + 1] if i + 1 < len(lines) else line
+        if _REPLY_HEADER_RE.match(line) or (line.lstrip().startswith('On ') and _REPLY_HEADER_RE.match(joined)):
+            break
+        if _FORWARD_HEADER_RE.match(line):
+            break
+        if _OUTLOOK_HEADER_RE.match(line) and any(
+            next_line.lower().lstrip().startswith(('sent:', 'date:')) for next_line in lines[i + 1:i + 4]
+        ):
+            break
+        if line.lstrip().startswith('>'):
+            continue
+        kept.append(line)
+    return '\n'.join(kept).strip()
+
+
+@lru_cache(maxsize=BODY_CACHE_SIZE)
+def _fetch_email_body(message_id: str) -> Tuple[str, Dict]:
+    """Internal helper fetching a message once and returning (body, details); cached by id"""
+    message = execute_request(get_gmail_service().users().messages().get(
+        userId='me',
+        id=message_id,
+        format='full'
+    ))
+    
+    body = _extract_body(message['payload'])
+    details = _parse_email_details(message)
+    _index_emails([details], [body])
+    return body, details
+
+
+# ============================================================
+# CORE EMAIL FUNCTIONS
+# ============================================================
+
+def _send_message(to: str, subject: str, body: str, send_retries: int = MAX_RETRIES) -> Dict:
+    """Internal helper that sends an email right away, returning Gmail's result; raises on failure"""
+    message = MIMEText(body)
+    message['to'] = to
+    message['subject'] = subject
+    
+    raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+    send_message = {'raw': raw_message}
+    
+    result = execute_request(get_gmail_service().users().messages().send(
+        userId='me',
+        body=send_message
+    ), idempotent=False, max_retries=send_retries)
+    _mailbox_changed()
+    _index_sent_email(result, to, subject, body)
+    return result
+
+
+def send_email(to: str, subject: str, body: str, queue: bool = True) -> Dict:
+    """Send an email to a recipient (queued in the outbox unless queue=False)."""
+    try:
+        outbox = _get_email_outbox() if queue else None
+        if outbox is not None:
+            tracking_id = outbox.enqueue('send', {'to': to, 'subject': subject, 'body': body})
+            return {
+                'success': True,
+                'status': 'queued',
+                'tracking_id': tracking_id,
+                'message': f'Email to {to} queued for sending'
+            }
+        
+        result = _send_message(to, subject, body)
         return {
             'success': True,
             'message_id': result['id'],
@@ -95,128 +993,237 @@ def send_email(to: str, subject: str, body: str) -> Dict:
         return {'success': False, 'error': str(e)}
 
 
-def get_recent_emails(max_results: int = 10, include_spam_trash: bool = False) -> Dict:
-    """Get the most recent emails."""
+def send_bulk_email(recipients: List[str], subject: str, body: str) -> Dict:
+    """Send the same email separately to each recipient, through the outbox."""
     try:
-        max_results = min(max_results, 100)
-        query = '' if include_spam_trash else '-in:spam -in:trash'
-        
-        results = service.users().messages().list(
-            userId='me',
-            maxResults=max_results,
-            q=query
-        ).execute()
+        if not recipients:
+            return {'success': False, 'error': 'No recipients given'}
         
-        messages = results.get('messages', [])
-        emails = [_get_email_details(msg['id']) for msg in messages]
+        outbox = _get_email_outbox()
+        if outbox is not None:
+            tracking_ids = outbox.enqueue_many([
+                ('send', {'to': to, 'subject': subject, 'body': body}) for to in recipients
+            ])
+            return {
+                'success': True,
+                'status': 'queued',
+                'queued': [{'to': to, 'tracking_id': tracking_id} for to, tracking_id in zip(recipients, tracking_ids)],
+                'message': f'{len(recipients)} emails queued for sending'
+            }
         
-        return {'success': True, 'count': len(emails), 'emails': emails}
+        # no outbox: send with the same bounded concurrency the outbox workers use
+        with ThreadPoolExecutor(max_workers=OUTBOX_WORKERS) as pool:
+            results = list(pool.map(lambda to: send_email(to, subject, body, queue=False), recipients))
+        sent = [{'to': to, 'message_id': r['message_id']} for to, r in zip(recipients, results) if r['success']]
+        failed = [{'to': to, 'error': r['error']} for to, r in zip(recipients, results) if not r['success']]
+        return {
+            'success': not failed,
+            'sent': sent,
+            'failed': failed,
+            'message': f'{len(sent)} of {len(recipients)} emails sent'
+        }
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
 
-def search_emails(query: str, max_results: int = 50) -> Dict:
-    """Search emails using Gmail query syntax."""
+def get_send_status(tracking_ids: Optional[List[str]] = None, limit: int = 20) -> Dict:
+    """Status of queued emails by tracking id, or an outbox summary when no ids are given."""
     try:
-        max_results = min(max_results, 100)
-        
-        results = service.users().messages().list(
-            userId='me',
-            q=query,
-            maxResults=max_results
-        ).execute()
+        outbox = _get_email_outbox()
+        if outbox is None:
+            return {'success': False, 'error': 'The outbox is disabled (EMAIL_OUTBOX_PATH is empty); emails are sent immediately'}
         
-        messages = results.get('messages', [])
-        emails = [_get_email_details(msg['id']) for msg in messages]
+        if not tracking_ids:
+            return {'success': True, **outbox.summary(limit)}
         
-        return {'success': True, 'query': query, 'count': len(emails), 'emails': emails}
+        statuses = outbox.status(tracking_ids)
+        return {
+            'success': True,
+            'statuses': [status for status in statuses.values() if status is not None],
+            'not_found': [tracking_id for tracking_id, status in statuses.items() if status is None]
+        }
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
 
-def count_emails(query: str = "") -> Dict:
-    """Count emails matching a query WITHOUT fetching full details."""
+def get_recent_emails(max_results: int = 10, include_spam_trash: bool = False, cursor: Optional[str] = None,
+                      max_tokens: int = 0) -> Dict:
+    """Get the most recent emails."""
     try:
-        results = service.users().messages().list(
-            userId='me',
-            q=query,
-            maxResults=1
-        ).execute()
+        query = '' if include_spam_trash else '-in:spam -in:trash'
         
-        total_count = results.get('resultSizeEstimate', 0)
+        return _list_emails(query, max_results, cursor, max_tokens)
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
+def search_emails(query: str, max_results: int = 50, cursor: Optional[str] = None, max_tokens: int = 0) -> Dict:
+    """Search emails using Gmail query syntax."""
+    try:
+        return _list_emails(query, max_results, cursor, max_tokens, query=query)
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
+def search_local_emails(query: str, max_results: int = 20, offset: int = 0, max_tokens: int = 0) -> Dict:
+    """Search previously fetched emails offline, ranked by relevance (BM25)."""
+    try:
+        index = _get_email_index()
+        if index is None:
+            return {'success': False, 'error': 'Local email index is disabled (EMAIL_INDEX_PATH is empty)'}
         
-        return {
+        found = index.search(query, max_results, offset)
+        result = {
             'success': True,
-            'query': query if query else 'all emails',
-            'count': total_count
+            'query': query,
+            'matched': found['matched'],
+            'total': found['total'],
+            'count': len(found['results']),
+            'results': found['results'],
+            'indexed_emails': index.count()
         }
+        if max_tokens:
+            result['results'] = [_compact_email(email, 'excerpt') for email in result['results']]
+            _fit_token_budget(result, 'results', max_tokens)
+        if offset + len(result['results']) < found['total']:
+            result['next_offset'] = offset + len(result['results'])
+        return result
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
 
-def get_unread_emails(max_results: int = 20) -> Dict:
-    """Get unread emails."""
+# count_emails results are reused for COUNT_CACHE_TTL seconds, for at most COUNT_CACHE_SIZE
+# distinct (normalised) queries; any mutation made through these tools clears them
+COUNT_CACHE_SIZE = 256
+COUNT_CACHE_TTL = 60
+_count_cache = OrderedDict()
+_count_cache_lock = threading.Lock()
+_count_cache_stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0, 'invalidations': 0}
+
+_DATE_OPERATOR_RE = re.compile(r'^(-?(?:after|before|older|newer):)(\d{4})-(\d{1,2})-(\d{1,2})$')
+
+
+def _normalize_query(query: str) -> str:
+    """
+    Internal helper giving equivalent Gmail queries one cache key: whitespace collapsed,
+    case folded (Gmail search is case-insensitive; OR/AND are kept), YYYY-MM-DD dates
+    written as YYYY/MM/DD, and plain AND-ed terms sorted.
+    """
+    tokens = []
+    for token in query.split():
+        token = token if token in ('OR', 'AND') else token.lower()
+        tokens.append(_DATE_OPERATOR_RE.sub(r'\1\2/\3/\4', token))
+    # grouping, OR and quoted phrases make term order significant
+    if not any(token in ('OR', 'AND') or any(ch in token for ch in '(){}"') for token in tokens):
+        tokens.sort()
+    return ' '.join(tokens)
+
+
+def _clear_count_cache() -> None:
+    """Internal helper to drop every cached count"""
+    with _count_cache_lock:
+        if _count_cache:
+            _count_cache_stats['invalidations'] += 1
+        _count_cache.clear()
+
+
+def get_count_cache_stats() -> Dict:
+    """Hit/miss counters and size of the count_emails cache, for tuning COUNT_CACHE_SIZE/TTL"""
+    with _count_cache_lock:
+        lookups = _count_cache_stats['hits'] + _count_cache_stats['misses']
+        return {
+            **_count_cache_stats,
+            'size': len(_count_cache),
+            'max_size': COUNT_CACHE_SIZE,
+            'ttl_seconds': COUNT_CACHE_TTL,
+            'hit_rate': round(_count_cache_stats['hits'] / lookups, 4) if lookups else 0.0
+        }
+
+
+def _count_emails_uncached(query: str) -> Dict:
+    """Internal helper to count emails for a query, from the local store when it can answer"""
+    store = _get_synced_email_store()
+    local_count = store.count(query) if store is not None else None
+    if local_count is not None:
+        return {
+            'success': True,
+            'query': query if query else 'all emails',
+            'count': local_count,
+            'source': 'local_store'
+        }
+    
+    results = execute_request(get_gmail_service().users().messages().list(
+        userId='me',
+        q=query,
+        maxResults=1
+    ))
+    
+    total_count = results.get('resultSizeEstimate', 0)
+    
+    return {
+        'success': True,
+        'query': query if query else 'all emails',
+        'count': total_count
+    }
+
+
+def count_emails(query: str = "", use_cache: bool = True) -> Dict:
+    """Count emails matching a query WITHOUT fetching full details."""
     try:
-        max_results = min(max_results, 100)
-        
-        results = service.users().messages().list(
-            userId='me',
-            q='is:unread',
-            maxResults=max_results
-        ).execute()
+        key = _normalize_query(query)
+        if use_cache:
+            with _count_cache_lock:
+                entry = _count_cache.get(key)
+                if entry is not None and entry[0] > time.monotonic():
+                    _count_cache.move_to_end(key)
+                    _count_cache_stats['hits'] += 1
+                    return {**entry[1], 'query': query if query else 'all emails', 'cached': True}
+                if entry is not None:
+                    del _count_cache[key]
+                    _count_cache_stats['expired'] += 1
+                _count_cache_stats['misses'] += 1
         
-        messages = results.get('messages', [])
-        emails = [_get_email_details(msg['id']) for msg in messages]
+        result = _count_emails_uncached(query)
         
-        return {'success': True, 'count': len(emails), 'emails': emails}
+        with _count_cache_lock:
+            _count_cache[key] = (time.monotonic() + COUNT_CACHE_TTL, result)
+            _count_cache.move_to_end(key)
+            while len(_count_cache) > COUNT_CACHE_SIZE:
+                _count_cache.popitem(last=False)
+                _count_cache_stats['evictions'] += 1
+        return result
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
+def get_unread_emails(max_results: int = 20, cursor: Optional[str] = None, max_tokens: int = 0) -> Dict:
+    """Get unread emails."""
+    try:
+        return _list_emails('is:unread', max_results, cursor, max_tokens)
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
 
-def get_emails_from_sender(sender_email: str, max_results: int = 50) -> Dict:
+def get_emails_from_sender(sender_email: str, max_results: int = 50, cursor: Optional[str] = None,
+                           max_tokens: int = 0) -> Dict:
     """Get all emails from a specific sender."""
     try:
-        max_results = min(max_results, 100)
         query = f'from:{sender_email}'
         
-        results = service.users().messages().list(
-            userId='me',
-            q=query,
-            maxResults=max_results
-        ).execute()
-        
-        messages = results.get('messages', [])
-        emails = [_get_email_details(msg['id']) for msg in messages]
-        
-        return {'success': True, 'sender': sender_email, 'count': len(emails), 'emails': emails}
+        return _list_emails(query, max_results, cursor, max_tokens, sender=sender_email)
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
 
-def get_emails_by_date_range(start_date: str, end_date: str, max_results: int = 50) -> Dict:
+def get_emails_by_date_range(start_date: str, end_date: str, max_results: int = 50,
+                             cursor: Optional[str] = None, max_tokens: int = 0) -> Dict:
     """Get emails within a date range."""
     try:
-        max_results = min(max_results, 100)
         start_date = start_date.replace('-', '/')
         end_date = end_date.replace('-', '/')
         
         query = f'after:{start_date} before:{end_date}'
-        results = service.users().messages().list(
-            userId='me',
-            q=query,
-            maxResults=max_results
-        ).execute()
-        
-        messages = results.get('messages', [])
-        emails = [_get_email_details(msg['id']) for msg in messages]
-        
-        return {
-            'success': True,
-            'start_date': start_date,
-            'end_date': end_date,
-            'count': len(emails),
-            'emails': emails
-        }
+        return _list_emails(query, max_results, cursor, max_tokens, start_date=start_date, end_date=end_date)
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
@@ -224,66 +1231,133 @@ def get_emails_by_date_range(start_date: str, end_date: str, max_results: int =
 def get_email_body(message_id: str) -> Dict:
     """Get the full body content of a specific email."""
     try:
-        message = service.users().messages().get(
-            userId='me',
-            id=message_id,
-            format='full'
-        ).execute()
-        
-        payload = message['payload']
-        body = ""
-        
-        if 'parts' in payload:
-            for part in payload['parts']:
-                if part['mimeType'] == 'text/plain':
-                    if 'data' in part['body']:
-                        body = base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
-                        break
-        else:
-            if 'data' in payload['body']:
-                body = base64.urlsafe_b64decode(payload['body']['data']).decode('utf-8')
+        body, details = _fetch_email_body(message_id)
         
         return {
             'success': True,
             'message_id': message_id,
             'body': body,
-            'metadata': _get_email_details(message_id)
+            'metadata': dict(details)
         }
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
 
-def reply_to_email(message_id: str, reply_body: str) -> Dict:
-    """Reply to a specific email."""
+def get_email_thread(thread_id: str, max_tokens: int = 0) -> Dict:
+    """Get every message of an email thread in one call, with quoted text removed."""
     try:
-        original = service.users().messages().get(
+        thread = execute_request(get_gmail_service().users().threads().get(
             userId='me',
-            id=message_id,
+            id=thread_id,
             format='full'
-        ).execute()
-        
-        headers = original['payload']['headers']
-        subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '')
-        to = next((h['value'] for h in headers if h['name'] == 'From'), '')
-        message_id_header = next((h['value'] for h in headers if h['name'] == 'Message-ID'), '')
-        
-        reply = MIMEText(reply_body)
-        reply['to'] = to
-        reply['subject'] = f"Re: {subject}" if not subject.startswith('Re:') else subject
-        reply['In-Reply-To'] = message_id_header
-        reply['References'] = message_id_header
-        
-        raw_message = base64.urlsafe_b64encode(reply.as_bytes()).decode('utf-8')
-        send_message = {
-            'raw': raw_message,
-            'threadId': original['threadId']
+        ))
+        
+        messages = []
+        seen_bodies = {}
+        for message in thread.get('messages', []):
+            details = _parse_email_details(message)
+            body = _strip_quoted_text(_extract_body(message['payload']))
+            
+            # replies that only repeat an earlier message add nothing
+            fingerprint = ' '.join(body.split())
+            if fingerprint and fingerprint in seen_bodies:
+                details['duplicate_of'] = seen_bodies[fingerprint]
+                body = ''
+            elif fingerprint:
+                seen_bodies[fingerprint] = details['id']
+            
+            details['body'] = body
+            messages.append(details)
+        
+        _index_emails(
+            [{key: value for key, value in details.items() if key != 'body'} for details in messages],
+            [details['body'] for details in messages]
+        )
+        
+        result = {
+            'success': True,
+            'thread_id': thread_id,
+            'message_count': len(messages),
+            'messages': messages
         }
         
-        result = service.users().messages().send(
+        if max_tokens > 0:
+            # spend the budget on the newest messages first; older ones are cut or dropped
+            budget = max_tokens * CHARS_PER_TOKEN
+            omitted = 0
+            for details in reversed(messages):
+                if len(details['body']) <= budget:
+                    budget -= len(details['body'])
+                    continue
+                if budget > 0:
+                    details['body'] = details['body'][:budget] + ' …[truncated]'
+                    budget = 0
+                else:
+                    details['body'] = ''
+                    omitted += 1
+                details['truncated'] = True
+            if omitted:
+                result['omitted_bodies'] = omitted
+        
+        return result
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
+def _send_reply(message_id: str, reply_body: str, send_retries: int = MAX_RETRIES) -> Tuple[Dict, str]:
+    """Internal helper that sends a reply right away, returning (Gmail's result, recipient); raises on failure"""
+    try:
+        original = execute_request(get_gmail_service().users().messages().get(
             userId='me',
-            body=send_message
-        ).execute()
+            id=message_id,
+            format='metadata',
+            metadataHeaders=['Subject', 'From', 'Message-ID'],
+            fields='threadId,payload/headers'
+        ))
+    except Exception as e:
+        raise _NothingSentError(e) from e
+    
+    headers = original['payload']['headers']
+    subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '')
+    to = next((h['value'] for h in headers if h['name'] == 'From'), '')
+    message_id_header = next((h['value'] for h in headers if h['name'] == 'Message-ID'), '')
+    
+    reply = MIMEText(reply_body)
+    reply['to'] = to
+    reply['subject'] = f"Re: {subject}" if not subject.startswith('Re:') else subject
+    reply['In-Reply-To'] = message_id_header
+    reply['References'] = message_id_header
+    
+    raw_message = base64.urlsafe_b64encode(reply.as_bytes()).decode('utf-8')
+    send_message = {
+        'raw': raw_message,
+        'threadId': original['threadId']
+    }
+    
+    result = execute_request(get_gmail_service().users().messages().send(
+        userId='me',
+        body=send_message
+    ), idempotent=False, max_retries=send_retries)
+    _mailbox_changed()
+    _index_sent_email(result, to, reply['subject'], reply_body)
+    return result, to
+
+
+def reply_to_email(message_id: str, reply_body: str, queue: bool = True) -> Dict:
+    """Reply to a specific email (queued in the outbox unless queue=False)."""
+    try:
+        outbox = _get_email_outbox() if queue else None
+        if outbox is not None:
+            tracking_id = outbox.enqueue('reply', {'replied_to': message_id, 'reply_body': reply_body})
+            return {
+                'success': True,
+                'status': 'queued',
+                'tracking_id': tracking_id,
+                'replied_to': message_id,
+                'message': f'Reply to email {message_id} queued for sending'
+            }
         
+        result, to = _send_reply(message_id, reply_body)
         return {
             'success': True,
             'message_id': result['id'],
@@ -297,11 +1371,12 @@ def reply_to_email(message_id: str, reply_body: str) -> Dict:
 def mark_as_read(message_id: str) -> Dict:
     """Mark an email as read."""
     try:
-        service.users().messages().modify(
+        execute_request(get_gmail_service().users().messages().modify(
             userId='me',
             id=message_id,
             body={'removeLabelIds': ['UNREAD']}
-        ).execute()
+        ))
+        _labels_changed([message_id], remove=['UNREAD'])
         
         return {
             'success': True,
@@ -315,11 +1390,12 @@ def mark_as_read(message_id: str) -> Dict:
 def mark_as_unread(message_id: str) -> Dict:
     """Mark an email as unread."""
     try:
-        service.users().messages().modify(
+        execute_request(get_gmail_service().users().messages().modify(
             userId='me',
             id=message_id,
             body={'addLabelIds': ['UNREAD']}
-        ).execute()
+        ))
+        _labels_changed([message_id], add=['UNREAD'])
         
         return {
             'success': True,
@@ -333,10 +1409,11 @@ def mark_as_unread(message_id: str) -> Dict:
 def delete_email(message_id: str) -> Dict:
     """Move an email to trash."""
     try:
-        service.users().messages().trash(
+        execute_request(get_gmail_service().users().messages().trash(
             userId='me',
             id=message_id
-        ).execute()
+        ))
+        _labels_changed([message_id], add=['TRASH'])
         
         return {
             'success': True,
@@ -347,95 +1424,169 @@ def delete_email(message_id: str) -> Dict:
         return {'success': False, 'error': str(e)}
 
 
-def get_email_labels() -> Dict:
+# Labels change rarely, so the id/name list is shared process-wide for LABEL_CACHE_TTL
+# seconds; a name that is not in the cache triggers one refresh before it is reported missing
+LABEL_CACHE_TTL = 300
+_label_cache = {'labels': None, 'expires': 0.0}
+_label_cache_lock = threading.RLock()
+
+
+def _get_labels(refresh: bool = False) -> List[Dict]:
+    """Internal helper returning [{'id', 'name'}] for every label, from the cache when it is fresh"""
+    with _label_cache_lock:
+        if refresh or _label_cache['labels'] is None or time.monotonic() >= _label_cache['expires']:
+            results = execute_request(get_gmail_service().users().labels().list(userId='me'))
+            _label_cache['labels'] = [{'id': label['id'], 'name': label['name']} for label in results.get('labels', [])]
+            _label_cache['expires'] = time.monotonic() + LABEL_CACHE_TTL
+        return _label_cache['labels']
+
+
+def _find_label(labels: List[Dict], label: str) -> Optional[Dict]:
+    """Internal helper to match a label id exactly, or a label name case-insensitively"""
+    lowered = label.strip().lower()
+    return (next((l for l in labels if l['id'] == label), None)
+            or next((l for l in labels if l['name'].lower() == lowered), None))
+
+
+def _resolve_label(label: str, create_if_missing: bool = False) -> Tuple[Dict, bool]:
+    """
+    Internal helper to turn a label name or id into its {'id', 'name'}, creating the
+    label when asked. Returns (label, created); raises ValueError for unknown labels.
+    """
+    with _label_cache_lock:
+        found = _find_label(_get_labels(), label) or _find_label(_get_labels(refresh=True), label)
+        if found:
+            return found, False
+        if not create_if_missing:
+            names = ', '.join(l['name'] for l in _label_cache['labels'])
+            raise ValueError(f"Label '{label}' not found. Available labels: {names}")
+        
+        try:
+            created = execute_request(get_gmail_service().users().labels().create(
+                userId='me',
+                body={'name': label.strip(), 'labelListVisibility': 'labelShow', 'messageListVisibility': 'show'}
+            ))
+        except HttpError as e:
+            # 409: someone else created it since the refresh above
+            if e.resp.status != 409:
+                raise
+            found = _find_label(_get_labels(refresh=True), label)
+            if not found:
+                raise
+            return found, False
+        
+        created = {'id': created['id'], 'name': created['name']}
+        _label_cache['labels'] = _label_cache['labels'] + [created]
+        return created, True
+
+
+def get_email_labels(refresh: bool = False) -> Dict:
     """Get all available Gmail labels."""
     try:
-        results = service.users().labels().list(userId='me').execute()
-        labels = results.get('labels', [])
-        label_list = [{'id': label['id'], 'name': label['name']} for label in labels]
+        label_list = _get_labels(refresh)
         
         return {'success': True, 'count': len(label_list), 'labels': label_list}
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
 
-def add_label_to_email(message_id: str, label_id: str) -> Dict:
-    """Add a label to an email."""
+def add_label_to_email(message_id: str, label: str, create_if_missing: bool = False) -> Dict:
+    """Add a label (by name or id) to an email, optionally creating the label first."""
     try:
-        service.users().messages().modify(
+        resolved, created = _resolve_label(label, create_if_missing)
+        execute_request(get_gmail_service().users().messages().modify(
             userId='me',
             id=message_id,
-            body={'addLabelIds': [label_id]}
-        ).execute()
+            body={'addLabelIds': [resolved['id']]}
+        ))
+        _labels_changed([message_id], add=[resolved['id']])
         
         return {
             'success': True,
             'message_id': message_id,
-            'label_id': label_id,
-            'message': 'Label added successfully'
+            'label_id': resolved['id'],
+            'label_name': resolved['name'],
+            'label_created': created,
+            'message': f"Label '{resolved['name']}' {'created and ' if created else ''}added successfully"
         }
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
 
-def get_emails_with_attachments(max_results: int = 20) -> Dict:
+def get_emails_with_attachments(max_results: int = 20, cursor: Optional[str] = None, max_tokens: int = 0) -> Dict:
     """Get emails that have attachments."""
     try:
-        max_results = min(max_results, 100)
-        
-        results = service.users().messages().list(
-            userId='me',
-            q='has:attachment',
-            maxResults=max_results
-        ).execute()
-        
-        messages = results.get('messages', [])
-        emails = [_get_email_details(msg['id']) for msg in messages]
-        
-        return {'success': True, 'count': len(emails), 'emails': emails}
+        return _list_emails('has:attachment', max_results, cursor, max_tokens)
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
 
-def get_starred_emails(max_results: int = 20) -> Dict:
+def get_starred_emails(max_results: int = 20, cursor: Optional[str] = None, max_tokens: int = 0) -> Dict:
     """Get starred/important emails."""
     try:
-        max_results = min(max_results, 100)
-        
-        results = service.users().messages().list(
-            userId='me',
-            q='is:starred',
-            maxResults=max_results
-        ).execute()
-        
-        messages = results.get('messages', [])
-        emails = [_get_email_details(msg['id']) for msg in messages]
-        
-        return {'success': True, 'count': len(emails), 'emails': emails}
+        return _list_emails('is:starred', max_results, cursor, max_tokens)
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
 
-def get_inbox_stats() -> Dict:
-    """Get statistics about the inbox."""
+# get_inbox_stats results are reused for INBOX_STATS_TTL seconds unless a mutation happens.
+# Every mutation bumps the generation, so stats fetched while one was under way are not cached.
+INBOX_STATS_TTL = 30
+_inbox_stats_cache = {'stats': None, 'expires': 0.0, 'generation': 0}
+_inbox_stats_lock = threading.Lock()
+
+
+def _clear_inbox_stats_cache() -> None:
+    """Internal helper to drop the cached inbox stats"""
+    with _inbox_stats_lock:
+        _inbox_stats_cache['stats'] = None
+        _inbox_stats_cache['generation'] += 1
+
+
+def get_inbox_stats(use_cache: bool = True) -> Dict:
+    """Get statistics about the inbox. Totals other than emails_in_inbox cover all mail except spam and trash."""
     try:
-        total = count_emails("")['count']
-        unread = count_emails("is:unread")['count']
-        starred = count_emails("is:starred")['count']
-        with_attachments = count_emails("has:attachment")['count']
-        in_inbox = count_emails("in:inbox")['count']
+        with _inbox_stats_lock:
+            if use_cache and _inbox_stats_cache['stats'] is not None and time.time() < _inbox_stats_cache['expires']:
+                return {'success': True, 'stats': dict(_inbox_stats_cache['stats']), 'cached': True}
+            generation = _inbox_stats_cache['generation']
         
-        return {
-            'success': True,
-            'stats': {
-                'total_emails': total,
-                'unread_emails': unread,
-                'starred_emails': starred,
-                'emails_with_attachments': with_attachments,
-                'emails_in_inbox': in_inbox,
-                'read_emails': total - unread
-            }
+        # Label totals and the profile are exact; only the attachment count needs a
+        # query estimate. All seven lookups share one batched round trip.
+        service = get_gmail_service()
+        requests = {
+            'profile': service.users().getProfile(userId='me'),
+            'has:attachment': service.users().messages().list(userId='me', q='has:attachment', maxResults=1)
+        }
+        for label_id in ('INBOX', 'UNREAD', 'STARRED', 'SPAM', 'TRASH'):
+            requests[label_id] = service.users().labels().get(userId='me', id=label_id)
+        responses, errors = execute_batch(service, requests)
+        
+        if errors:
+            request_id, error = next(iter(errors.items()))
+            raise RuntimeError(f"{request_id}: {error}")
+        
+        # Like Gmail searches, totals leave out spam and trash (a message is never in both)
+        spam, trash = responses['SPAM'], responses['TRASH']
+        total = (responses['profile'].get('messagesTotal', 0)
+                 - spam.get('messagesTotal', 0) - trash.get('messagesTotal', 0))
+        unread = (responses['UNREAD'].get('messagesTotal', 0)
+                  - spam.get('messagesUnread', 0) - trash.get('messagesUnread', 0))
+        stats = {
+            'total_emails': total,
+            'unread_emails': unread,
+            'starred_emails': responses['STARRED'].get('messagesTotal', 0),
+            'emails_with_attachments': responses['has:attachment'].get('resultSizeEstimate', 0),
+            'emails_in_inbox': responses['INBOX'].get('messagesTotal', 0),
+            'read_emails': total - unread
         }
+        
+        with _inbox_stats_lock:
+            if _inbox_stats_cache['generation'] == generation:
+                _inbox_stats_cache['stats'] = stats
+                _inbox_stats_cache['expires'] = time.time() + INBOX_STATS_TTL
+        
+        return {'success': True, 'stats': dict(stats)}
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
@@ -452,13 +1603,405 @@ def count_emails_in_date_range(start_date: str, end_date: str) -> Dict:
     return count_emails(f"after:{start_date} before:{end_date}")
 
 
+# ============================================================
+# ATTACHMENTS
+# ============================================================
+
+# Attachments fetched at once per download call
+ATTACHMENT_WORKERS = 4
+# base64 text decoded per write; a multiple of 4 so chunks decode independently
+DECODE_CHUNK_CHARS = 1024 * 1024
+
+
+def _find_attachments(payload: Dict) -> List[Dict]:
+    """Internal helper to collect attachment parts from a (possibly nested) message payload"""
+    attachments = []
+    stack = [payload]
+    while stack:
+        part = stack.pop()
+        if part.get('parts'):
+            stack.extend(reversed(part['parts']))
+        elif part.get('filename'):
+            attachments.append(part)
+    return attachments
+
+
+def _write_base64url(data: str, file_path: str) -> int:
+    """Internal helper to decode base64url text into a file chunk by chunk; returns bytes written"""
+    written = 0
+    with open(file_path, 'wb') as f:
+        for start in range(0, len(data), DECODE_CHUNK_CHARS):
+            chunk = data[start:start + DECODE_CHUNK_CHARS]
+            decoded = base64.urlsafe_b64decode(chunk + '=' * (-len(chunk) % 4))
+            f.write(decoded)
+            written += len(decoded)
+    return written
+
+
+def _unique_path(directory: str, filename: str, reserved: set) -> str:
+    """Internal helper to pick a file path that is neither on disk nor reserved, e.g. 'report (1).pdf'"""
+    base, ext = os.path.splitext(filename)
+    candidate = os.path.join(directory, filename)
+    counter = 1
+    while os.path.exists(candidate) or candidate in reserved:
+        candidate = os.path.join(directory, f"{base} ({counter}){ext}")
+        counter += 1
+    return candidate
+
+
+def _download_attachment(message_id: str, part: Dict, file_path: str) -> Dict:
+    """Internal helper to download one attachment part to file_path"""
+    data = part['body'].get('data')
+    if data is None:
+        response = execute_request(get_gmail_service().users().messages().attachments().get(
+            userId='me',
+            messageId=message_id,
+            id=part['body']['attachmentId']
+        ))
+        data = response['data']
+    
+    # write to a side file first so a failed download never leaves a truncated attachment behind
+    partial_path = file_path + '.part'
+    try:
+        size = _write_base64url(data, partial_path)
+        os.replace(partial_path, file_path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+    
+    return {'filename': os.path.basename(file_path), 'path': file_path, 'size': size}
+
+
+def list_email_attachments(message_id: str) -> Dict:
+    """List the attachments of a specific email."""
+    try:
+        message = execute_request(get_gmail_service().users().messages().get(
+            userId='me',
+            id=message_id,
+            format='full',
+            fields='id,payload'
+        ))
+        
+        attachments = [
+            {
+                'filename': part['filename'],
+                'mime_type': part.get('mimeType', ''),
+                'size': part['body'].get('size', 0),
+                'attachment_id': part['body'].get('attachmentId', '')
+            }
+            for part in _find_attachments(message['payload'])
+        ]
+        
+        return {'success': True, 'message_id': message_id, 'count': len(attachments), 'attachments': attachments}
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
+def download_email_attachments(message_id: str, save_path: str = ".", filenames: Optional[List[str]] = None,
+                               overwrite: bool = False) -> Dict:
+    """Download the attachments of an email into a folder."""
+    try:
+        target_dir = normalize_path(save_path)
+        if not os.path.exists(target_dir):
+            os.makedirs(target_dir, exist_ok=True)
+        
+        message = execute_request(get_gmail_service().users().messages().get(
+            userId='me',
+            id=message_id,
+            format='full',
+            fields='id,payload'
+        ))
+        
+        parts = _find_attachments(message['payload'])
+        if filenames:
+            parts = [part for part in parts if part['filename'] in filenames]
+        if not parts:
+            return {'success': False, 'error': f"No matching attachments in email {message_id}"}
+        
+        # paths are chosen up front so attachments sharing a name cannot race for the same file
+        file_paths = set()
+        jobs = []
+        for part in parts:
+            # never let a sender-chosen name escape the target folder
+            filename = os.path.basename(part['filename'].replace('\\', '/')) or 'attachment'
+            if overwrite and os.path.join(target_dir, filename) not in file_paths:
+                file_path = os.path.join(target_dir, filename)
+            else:
+                file_path = _unique_path(target_dir, filename, file_paths)
+            file_paths.add(file_path)
+            jobs.append((part, file_path))
+        
+        downloaded = []
+        failed = []
+        with ThreadPoolExecutor(max_workers=ATTACHMENT_WORKERS) as pool:
+            futures = {
+                pool.submit(_download_attachment, message_id, part, file_path): part['filename']
+                for part, file_path in jobs
+            }
+            for future, filename in futures.items():
+                try:
+                    downloaded.append(future.result())
+                except Exception as e:
+                    failed.append({'filename': filename, 'error': str(e)})
+        
+        result = {
+            'success': not failed,
+            'message_id': message_id,
+            'directory': target_dir,
+            'count': len(downloaded),
+            'files': downloaded
+        }
+        if failed:
+            result['failed'] = failed
+        return result
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
+# ============================================================
+# BULK EMAIL OPERATIONS
+# ============================================================
+
+# messages.batchModify accepts at most 1000 ids per call
+BATCH_MODIFY_SIZE = 1000
+
+
+def _resolve_message_ids(message_ids: Optional[List[str]], query: Optional[str], max_messages: int) -> List[str]:
+    """
+    Internal helper returning the ids to act on: the given ids, or every message matching
+    query (up to max_messages). Query matches are collected before anything is modified,
+    so label changes cannot shift the pages still being listed.
+    """
+    if message_ids:
+        return list(dict.fromkeys(message_ids))[:max_messages]
+    if not query:
+        raise ValueError("Provide message_ids or a query")
+    
+    ids = []
+    for _, messages, _ in _iter_message_pages(query, 500, needed=max_messages):
+        ids.extend(msg['id'] for msg in messages)
+        if len(ids) >= max_messages:
+            break
+    return ids[:max_messages]
+
+
+def batch_modify_emails(message_ids: Optional[List[str]] = None, query: Optional[str] = None,
+                        add_label_ids: Optional[List[str]] = None,
+                        remove_label_ids: Optional[List[str]] = None,
+                        max_messages: int = 1000) -> Dict:
+    """Add/remove labels on many emails with server-side batchModify calls."""
+    try:
+        ids = _resolve_message_ids(message_ids, query, max_messages)
+        
+        modified = []
+        errors = []
+        for start in range(0, len(ids), BATCH_MODIFY_SIZE):
+            chunk = ids[start:start + BATCH_MODIFY_SIZE]
+            try:
+                execute_request(get_gmail_service().users().messages().batchModify(
+                    userId='me',
+                    body={
+                        'ids': chunk,
+                        'addLabelIds': add_label_ids or [],
+                        'removeLabelIds': remove_label_ids or []
+                    }
+                ))
+                modified.extend(chunk)
+            except Exception as e:
+                errors.append(str(e))
+        
+        if modified:
+            _labels_changed(modified, add_label_ids or [], remove_label_ids or [])
+        
+        result = {
+            'success': not errors,
+            'matched_count': len(ids),
+            'modified_count': len(modified),
+            'failed_count': len(ids) - len(modified)
+        }
+        if query and not message_ids:
+            result['query'] = query
+        if errors:
+            result['errors'] = errors
+        return result
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
+def bulk_mark_as_read(message_ids: Optional[List[str]] = None, query: Optional[str] = None,
+                      max_messages: int = 1000) -> Dict:
+    """Mark many emails as read."""
+    return batch_modify_emails(message_ids, query, remove_label_ids=['UNREAD'], max_messages=max_messages)
+
+
+def bulk_mark_as_unread(message_ids: Optional[List[str]] = None, query: Optional[str] = None,
+                        max_messages: int = 1000) -> Dict:
+    """Mark many emails as unread."""
+    return batch_modify_emails(message_ids, query, add_label_ids=['UNREAD'], max_messages=max_messages)
+
+
+def bulk_delete_emails(message_ids: Optional[List[str]] = None, query: Optional[str] = None,
+                       max_messages: int = 1000) -> Dict:
+    """Move many emails to trash."""
+    # Applying the TRASH label is how batchModify trashes; batchDelete would delete permanently
+    return batch_modify_emails(message_ids, query, add_label_ids=['TRASH'], max_messages=max_messages)
+
+
+def bulk_add_label(label: str, message_ids: Optional[List[str]] = None, query: Optional[str] = None,
+                   max_messages: int = 1000, create_if_missing: bool = False) -> Dict:
+    """Add a label (by name or id) to many emails, optionally creating the label first."""
+    try:
+        resolved, created = _resolve_label(label, create_if_missing)
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+    
+    result = batch_modify_emails(message_ids, query, add_label_ids=[resolved['id']], max_messages=max_messages)
+    if result['success']:
+        result['label_id'] = resolved['id']
+        result['label_name'] = resolved['name']
+        result['label_created'] = created
+    return result
+
+
+# ============================================================
+# MAILBOX EXPORT
+# ============================================================
+
+# Messages per batch call, and batch calls in flight, while exporting. Raw (mbox) messages
+# carry their attachments, so they come in smaller batches; memory is bounded by one page
+# of EXPORT_WORKERS batches however many messages are exported.
+EXPORT_WORKERS = 4
+EXPORT_BATCH_SIZE = {'jsonl': 25, 'mbox': 10}
+
+# mboxrd quoting: a body line starting with "From " (after any '>'s) gains one more '>'
+_MBOX_FROM_RE = re.compile(rb'^(>*From )', re.MULTILINE)
+
+
+@_pooled
+def _fetch_export_chunk(message_ids: List[str], export_format: str) -> Tuple[Dict[str, Dict], Dict[str, Exception]]:
+    """Internal helper to batch-fetch messages as an export needs them: raw for mbox, full for JSONL"""
+    service = get_gmail_service()
+    return execute_batch(service, {
+        message_id: service.users().messages().get(
+            userId='me',
+            id=message_id,
+            format='raw' if export_format == 'mbox' else 'full'
+        )
+        for message_id in message_ids
+    })
+
+
+def _mbox_record(message: Dict) -> bytes:
+    """Internal helper to turn a raw-format message into one mboxrd entry, with Gmail's thread id and labels"""
+    raw = base64.urlsafe_b64decode(message['raw'] + '=' * (-len(message['raw']) % 4)).replace(b'\r\n', b'\n')
+    received = time.asctime(time.gmtime(int(message.get('internalDate', 0)) / 1000))
+    gmail_headers = (
+        f"X-GM-THRID: {message.get('threadId', '')}\n"
+        f"X-Gmail-Labels: {','.join(message.get('labelIds', []))}\n"
+    ).encode('utf-8')
+    body = _MBOX_FROM_RE.sub(rb'>\1', gmail_headers + raw)
+    if not body.endswith(b'\n'):
+        body += b'\n'
+    return b'From MAILER-DAEMON ' + received.encode('ascii') + b'\n' + body + b'\n'
+
+
+def _jsonl_record(message: Dict) -> Tuple[bytes, Dict, str]:
+    """Internal helper to turn a full-format message into a JSONL line; returns (line, details, body)"""
+    details = _parse_email_details(message)
+    body = _extract_body(message['payload'])
+    record = {
+        **details,
+        'labels': message.get('labelIds', []),
+        'internal_date': int(message.get('internalDate', 0)),
+        'body': body,
+        'attachments': [
+            {'filename': part['filename'], 'mime_type': part.get('mimeType', ''), 'size': part['body'].get('size', 0)}
+            for part in _find_attachments(message['payload'])
+        ]
+    }
+    return (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'), details, body
+
+
+def export_emails(query: str, path: str, export_format: str = 'jsonl', max_messages: int = 0,
+                  overwrite: bool = False) -> Dict:
+    """Stream every email matching a Gmail query, with headers and bodies, into an mbox or JSONL file."""
+    try:
+        export_format = export_format.lower().lstrip('.')
+        if export_format not in EXPORT_BATCH_SIZE:
+            return {'success': False, 'error': f"Unsupported format '{export_format}'; use 'jsonl' or 'mbox'"}
+        
+        file_path = normalize_path(path)
+        if os.path.isdir(file_path) or path.endswith(('/', '\\')):
+            file_path = os.path.join(file_path, f"emails_{datetime.now():%Y%m%d_%H%M%S}.{export_format}")
+        if os.path.exists(file_path) and not overwrite:
+            return {'success': False, 'error': f"File already exists: {file_path}"}
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        
+        batch_size = EXPORT_BATCH_SIZE[export_format]
+        exported = 0
+        processed = 0
+        failed = []
+        temp_path = file_path + '.part'
+        try:
+            with open(temp_path, 'wb') as f, ThreadPoolExecutor(max_workers=EXPORT_WORKERS) as pool:
+                pages = _iter_message_pages(query, batch_size * EXPORT_WORKERS, needed=max_messages or None)
+                for _, messages, _ in pages:
+                    message_ids = [msg['id'] for msg in messages]
+                    if max_messages:
+                        message_ids = message_ids[:max_messages - processed]
+                    processed += len(message_ids)
+                    
+                    chunks = [message_ids[i:i + batch_size] for i in range(0, len(message_ids), batch_size)]
+                    page_details = []
+                    page_bodies = []
+                    for chunk, (responses, errors) in zip(
+                        chunks, pool.map(partial(_fetch_export_chunk, export_format=export_format), chunks)
+                    ):
+                        for message_id in chunk:
+                            if message_id not in responses:
+                                failed.append(message_id)
+                                continue
+                            if export_format == 'mbox':
+                                f.write(_mbox_record(responses[message_id]))
+                            else:
+                                line, details, body = _jsonl_record(responses[message_id])
+                                f.write(line)
+                                page_details.append(details)
+                                page_bodies.append(body)
+                            exported += 1
+                    _index_emails(page_details, page_bodies)
+                    
+                    if max_messages and processed >= max_messages:
+                        break
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        
+        return {
+            'success': True,
+            'query': query,
+            'format': export_format,
+            'file_path': file_path,
+            'exported_count': exported,
+            'failed_count': len(failed),
+            'failed_ids': failed[:20],
+            'size_bytes': os.path.getsize(file_path),
+            'message': f'Exported {exported} emails to {file_path}'
+        }
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
 # ============================================================
 # LANGCHAIN TOOL WRAPPERS FOR LANGGRAPH
 # ============================================================
 
 @tool
 def send_email_tool(to: str, subject: str, body: str) -> str:
-    """Send an email to a recipient.
+    """Send an email to a recipient. The email is queued and sent in the background;
+    the returned tracking_id can be checked with get_send_status_tool.
     
     Args:
         to: Recipient email address
@@ -466,31 +2009,74 @@ def send_email_tool(to: str, subject: str, body: str) -> str:
         body: Email body text
     """
     result = send_email(to, subject, body)
-    return json.dumps(result)
+    return _to_json(result)
+
+
+@tool
+def send_bulk_email_tool(recipients: List[str], subject: str, body: str) -> str:
+    """Send the same email separately to many recipients in one call (each gets their own copy).
+    Emails are queued and sent in the background; returns a tracking_id per recipient.
+    
+    Args:
+        recipients: Recipient email addresses
+        subject: Email subject
+        body: Email body text
+    """
+    result = send_bulk_email(recipients, subject, body)
+    return _to_json(result)
+
+
+@tool
+def get_send_status_tool(tracking_ids: Optional[List[str]] = None) -> str:
+    """Check whether queued emails and replies were sent.
+    Status "unknown" means sending was interrupted and Gmail may or may not have sent it.
+    
+    Args:
+        tracking_ids: tracking_id values returned by the send/reply tools; omit for a summary of recent sends
+    """
+    result = get_send_status(tracking_ids)
+    return _to_json(result)
 
 
 @tool
-def get_recent_emails_tool(max_results: int = 10, include_spam_trash: bool = False) -> str:
+def get_recent_emails_tool(max_results: int = 10, include_spam_trash: bool = False, cursor: str = "") -> str:
     """Get the most recent emails.
     
     Args:
-        max_results: Number of emails to retrieve (default: 10, max: 100)
+        max_results: Number of emails to retrieve (default: 10)
         include_spam_trash: Include spam and trash emails (default: False)
+        cursor: next_cursor from a previous call, to continue where it stopped
     """
-    result = get_recent_emails(max_results, include_spam_trash)
-    return json.dumps(result)
+    result = get_recent_emails(max_results, include_spam_trash, cursor or None, max_tokens=LIST_TOKEN_BUDGET)
+    return _to_json(result)
 
 
 @tool
-def search_emails_tool(query: str, max_results: int = 50) -> str:
+def search_emails_tool(query: str, max_results: int = 50, cursor: str = "") -> str:
     """Search emails using Gmail query syntax.
     
     Args:
         query: Gmail search query (e.g., 'from:user@example.com', 'subject:meeting', 'has:attachment')
-        max_results: Maximum number of results (default: 50, max: 100)
+        max_results: Maximum number of results (default: 50)
+        cursor: next_cursor from a previous call, to continue where it stopped
+    """
+    result = search_emails(query, max_results, cursor or None, max_tokens=LIST_TOKEN_BUDGET)
+    return _to_json(result)
+
+
+@tool
+def search_local_emails_tool(query: str, max_results: int = 20, offset: int = 0) -> str:
+    """Search emails already seen in this or earlier sessions, offline and instantly.
+    Matches words in subjects, senders and bodies, best matches first.
+    Use search_emails_tool instead when the email may never have been fetched.
+    
+    Args:
+        query: Words to look for (e.g., 'quarterly budget review')
+        max_results: Maximum number of results (default: 20)
+        offset: Skip this many results, e.g. the next_offset of a previous call (default: 0)
     """
-    result = search_emails(query, max_results)
-    return json.dumps(result)
+    result = search_local_emails(query, max_results, offset, max_tokens=LIST_TOKEN_BUDGET)
+    return _to_json(result)
 
 
 @tool
@@ -501,43 +2087,46 @@ def count_emails_tool(query: str = "") -> str:
         query: Gmail search query (empty string = all emails)
     """
     result = count_emails(query)
-    return json.dumps(result)
+    return _to_json(result)
 
 
 @tool
-def get_unread_emails_tool(max_results: int = 20) -> str:
+def get_unread_emails_tool(max_results: int = 20, cursor: str = "") -> str:
     """Get unread emails.
     
     Args:
         max_results: Maximum number of unread emails to retrieve
+        cursor: next_cursor from a previous call, to continue where it stopped
     """
-    result = get_unread_emails(max_results)
-    return json.dumps(result)
+    result = get_unread_emails(max_results, cursor or None, max_tokens=LIST_TOKEN_BUDGET)
+    return _to_json(result)
 
 
 @tool
-def get_emails_from_sender_tool(sender_email: str, max_results: int = 50) -> str:
+def get_emails_from_sender_tool(sender_email: str, max_results: int = 50, cursor: str = "") -> str:
     """Get all emails from a specific sender.
     
     Args:
         sender_email: Email address of the sender
         max_results: Maximum number of emails to retrieve
+        cursor: next_cursor from a previous call, to continue where it stopped
     """
-    result = get_emails_from_sender(sender_email, max_results)
-    return json.dumps(result)
+    result = get_emails_from_sender(sender_email, max_results, cursor or None, max_tokens=LIST_TOKEN_BUDGET)
+    return _to_json(result)
 
 
 @tool
-def get_emails_by_date_range_tool(start_date: str, end_date: str, max_results: int = 50) -> str:
+def get_emails_by_date_range_tool(start_date: str, end_date: str, max_results: int = 50, cursor: str = "") -> str:
     """Get emails within a date range.
     
     Args:
         start_date: Start date in format 'YYYY/MM/DD' or 'YYYY-MM-DD'
         end_date: End date in format 'YYYY/MM/DD' or 'YYYY-MM-DD'
         max_results: Maximum number of emails to retrieve
+        cursor: next_cursor from a previous call, to continue where it stopped
     """
-    result = get_emails_by_date_range(start_date, end_date, max_results)
-    return json.dumps(result)
+    result = get_emails_by_date_range(start_date, end_date, max_results, cursor or None, max_tokens=LIST_TOKEN_BUDGET)
+    return _to_json(result)
 
 
 @tool
@@ -548,19 +2137,33 @@ def get_email_body_tool(message_id: str) -> str:
         message_id: The ID of the email
     """
     result = get_email_body(message_id)
-    return json.dumps(result)
+    return _to_json(result)
+
+
+@tool
+def get_email_thread_tool(thread_id: str, max_tokens: int = 0) -> str:
+    """Get a whole email conversation in one call: every message's headers and body,
+    in order, with quoted replies stripped and repeated bodies removed.
+    
+    Args:
+        thread_id: The thread_id of any email in the conversation
+        max_tokens: Approximate cap on the body text returned; newest messages are kept first (default: 0 = no cap)
+    """
+    result = get_email_thread(thread_id, max_tokens)
+    return _to_json(result)
 
 
 @tool
 def reply_to_email_tool(message_id: str, reply_body: str) -> str:
-    """Reply to a specific email.
+    """Reply to a specific email. The reply is queued and sent in the background;
+    the returned tracking_id can be checked with get_send_status_tool.
     
     Args:
         message_id: The ID of the email to reply to
         reply_body: The text of the reply
     """
     result = reply_to_email(message_id, reply_body)
-    return json.dumps(result)
+    return _to_json(result)
 
 
 @tool
@@ -571,7 +2174,7 @@ def mark_as_read_tool(message_id: str) -> str:
         message_id: The ID of the email to mark as read
     """
     result = mark_as_read(message_id)
-    return json.dumps(result)
+    return _to_json(result)
 
 
 @tool
@@ -582,7 +2185,7 @@ def mark_as_unread_tool(message_id: str) -> str:
         message_id: The ID of the email to mark as unread
     """
     result = mark_as_unread(message_id)
-    return json.dumps(result)
+    return _to_json(result)
 
 
 @tool
@@ -593,16 +2196,19 @@ def delete_email_tool(message_id: str) -> str:
         message_id: The ID of the email to delete
     """
     result = delete_email(message_id)
-    return json.dumps(result)
+    return _to_json(result)
 
 
 @tool
-def get_inbox_stats_tool() -> str:
+def get_inbox_stats_tool(use_cache: bool = True) -> str:
     """Get comprehensive inbox statistics (total, unread, starred, etc.).
     All counting done on machine, very fast.
+    
+    Args:
+        use_cache: Reuse stats fetched in the last few seconds (default: True)
     """
-    result = get_inbox_stats()
-    return json.dumps(result)
+    result = get_inbox_stats(use_cache)
+    return _to_json(result)
 
 
 @tool
@@ -613,7 +2219,7 @@ def count_emails_from_sender_tool(sender_email: str) -> str:
         sender_email: Sender's email address
     """
     result = count_emails_from_sender(sender_email)
-    return json.dumps(result)
+    return _to_json(result)
 
 
 @tool
@@ -625,48 +2231,154 @@ def count_emails_in_date_range_tool(start_date: str, end_date: str) -> str:
         end_date: End date (YYYY/MM/DD or YYYY-MM-DD)
     """
     result = count_emails_in_date_range(start_date, end_date)
-    return json.dumps(result)
+    return _to_json(result)
 
 
 @tool
-def get_emails_with_attachments_tool(max_results: int = 20) -> str:
+def get_emails_with_attachments_tool(max_results: int = 20, cursor: str = "") -> str:
     """Get emails that have attachments.
     
     Args:
         max_results: Maximum number of emails to retrieve
+        cursor: next_cursor from a previous call, to continue where it stopped
     """
-    result = get_emails_with_attachments(max_results)
-    return json.dumps(result)
+    result = get_emails_with_attachments(max_results, cursor or None, max_tokens=LIST_TOKEN_BUDGET)
+    return _to_json(result)
 
 
 @tool
-def get_starred_emails_tool(max_results: int = 20) -> str:
+def get_starred_emails_tool(max_results: int = 20, cursor: str = "") -> str:
     """Get starred/important emails.
     
     Args:
         max_results: Maximum number of emails to retrieve
+        cursor: next_cursor from a previous call, to continue where it stopped
     """
-    result = get_starred_emails(max_results)
-    return json.dumps(result)
+    result = get_starred_emails(max_results, cursor or None, max_tokens=LIST_TOKEN_BUDGET)
+    return _to_json(result)
 
 
 @tool
-def add_label_to_email_tool(message_id: str, label_id: str) -> str:
-    """Add a label to an email.
+def add_label_to_email_tool(message_id: str, label: str, create_if_missing: bool = False) -> str:
+    """Add a label to an email. Takes the label's name directly, no need to look up its id.
     
     Args:
         message_id: The ID of the email
-        label_id: The ID of the label to add
+        label: Name (e.g. 'Invoices', 'STARRED') or ID of the label to add
+        create_if_missing: Create the label first if it does not exist (default: False)
     """
-    result = add_label_to_email(message_id, label_id)
-    return json.dumps(result)
+    result = add_label_to_email(message_id, label, create_if_missing)
+    return _to_json(result)
 
 
 @tool
-def get_email_labels_tool() -> str:
-    """Get all available Gmail labels."""
-    result = get_email_labels()
-    return json.dumps(result)
+def get_email_labels_tool(refresh: bool = False) -> str:
+    """Get all available Gmail labels.
+    
+    Args:
+        refresh: Reload from Gmail instead of using the cached list (default: False)
+    """
+    result = get_email_labels(refresh)
+    return _to_json(result)
+
+
+@tool
+def bulk_mark_as_read_tool(message_ids: Optional[List[str]] = None, query: str = "", max_messages: int = 1000) -> str:
+    """Mark many emails as read in one call, by ids or by Gmail query.
+    
+    Args:
+        message_ids: IDs of the emails to mark as read
+        query: Gmail search query selecting the emails instead of ids (e.g., 'from:news@example.com is:unread')
+        max_messages: Upper limit on how many emails are changed (default: 1000)
+    """
+    result = bulk_mark_as_read(message_ids, query or None, max_messages)
+    return _to_json(result)
+
+
+@tool
+def bulk_mark_as_unread_tool(message_ids: Optional[List[str]] = None, query: str = "", max_messages: int = 1000) -> str:
+    """Mark many emails as unread in one call, by ids or by Gmail query.
+    
+    Args:
+        message_ids: IDs of the emails to mark as unread
+        query: Gmail search query selecting the emails instead of ids
+        max_messages: Upper limit on how many emails are changed (default: 1000)
+    """
+    result = bulk_mark_as_unread(message_ids, query or None, max_messages)
+    return _to_json(result)
+
+
+@tool
+def bulk_delete_emails_tool(message_ids: Optional[List[str]] = None, query: str = "", max_messages: int = 1000) -> str:
+    """Move many emails to trash in one call, by ids or by Gmail query.
+    
+    Args:
+        message_ids: IDs of the emails to delete
+        query: Gmail search query selecting the emails instead of ids
+        max_messages: Upper limit on how many emails are changed (default: 1000)
+    """
+    result = bulk_delete_emails(message_ids, query or None, max_messages)
+    return _to_json(result)
+
+
+@tool
+def bulk_add_label_tool(label: str, message_ids: Optional[List[str]] = None, query: str = "",
+                        max_messages: int = 1000, create_if_missing: bool = False) -> str:
+    """Add a label to many emails in one call, by ids or by Gmail query.
+    
+    Args:
+        label: Name (e.g. 'Invoices') or ID of the label to add
+        message_ids: IDs of the emails to label
+        query: Gmail search query selecting the emails instead of ids
+        max_messages: Upper limit on how many emails are changed (default: 1000)
+        create_if_missing: Create the label first if it does not exist (default: False)
+    """
+    result = bulk_add_label(label, message_ids, query or None, max_messages, create_if_missing)
+    return _to_json(result)
+
+
+@tool
+def list_email_attachments_tool(message_id: str) -> str:
+    """List the attachments (name, type, size) of a specific email.
+    
+    Args:
+        message_id: The ID of the email
+    """
+    result = list_email_attachments(message_id)
+    return _to_json(result)
+
+
+@tool
+def download_email_attachments_tool(message_id: str, save_path: str = ".", filenames: Optional[List[str]] = None,
+                                    overwrite: bool = False) -> str:
+    """Download the attachments of an email straight to disk.
+    
+    Args:
+        message_id: The ID of the email
+        save_path: Folder to save the attachments in (default: current directory)
+        filenames: Only download attachments with these names (default: all)
+        overwrite: Replace existing files instead of saving as 'name (1).ext' (default: False)
+    """
+    result = download_email_attachments(message_id, save_path, filenames, overwrite)
+    return _to_json(result)
+
+
+@tool
+def export_emails_tool(query: str, path: str, export_format: str = "jsonl", max_messages: int = 0,
+                       overwrite: bool = False) -> str:
+    """Save every email matching a Gmail query (headers and full bodies) straight into a file.
+    The emails are written directly to disk and never returned here, so use this instead of
+    reading emails and calling write_file_tool. Returns only a summary.
+    
+    Args:
+        query: Gmail search query selecting the emails ('' = all mail except spam/trash)
+        path: File to write, or a folder to create a timestamped file in (e.g. 'desktop/emails.jsonl')
+        export_format: 'jsonl' (one JSON object per email) or 'mbox' (original messages, for mail clients)
+        max_messages: Stop after this many emails (default: 0 = no limit)
+        overwrite: Replace the file if it already exists (default: False)
+    """
+    result = export_emails(query, path, export_format, max_messages, overwrite)
+    return _to_json(result)
 
 
 # ============================================================
@@ -675,13 +2387,17 @@ def get_email_labels_tool() -> str:
 
 LANGCHAIN_TOOLS = [
     send_email_tool,
+    send_bulk_email_tool,
+    get_send_status_tool,
     get_recent_emails_tool,
     search_emails_tool,
+    search_local_emails_tool,
     count_emails_tool,
     get_unread_emails_tool,
     get_emails_from_sender_tool,
     get_emails_by_date_range_tool,
     get_email_body_tool,
+    get_email_thread_tool,
     reply_to_email_tool,
     mark_as_read_tool,
     mark_as_unread_tool,
@@ -692,5 +2408,106 @@ LANGCHAIN_TOOLS = [
     get_emails_with_attachments_tool,
     get_starred_emails_tool,
     add_label_to_email_tool,
-    get_email_labels_tool
+    get_email_labels_tool,
+    bulk_mark_as_read_tool,
+    bulk_mark_as_unread_tool,
+    bulk_delete_emails_tool,
+    bulk_add_label_tool,
+    list_email_attachments_tool,
+    download_email_attachments_tool,
+    export_emails_tool
 ]
+
+
+# ============================================================
+# ASYNC EMAIL CLIENT
+# ============================================================
+
+# Worker threads serving async callers; each thread holds its own Gmail connection
+ASYNC_WORKERS = 8
+
+_async_executor = None
+_async_executor_lock = threading.Lock()
+
+
+def _get_async_executor() -> ThreadPoolExecutor:
+    """Internal helper to create the async worker pool on first use"""
+    global _async_executor
+    if _async_executor is None:
+        with _async_executor_lock:
+            if _async_executor is None:
+                _async_executor = ThreadPoolExecutor(max_workers=ASYNC_WORKERS, thread_name_prefix='gmail-async')
+    return _async_executor
+
+
+async def run_email_function(func, *args, **kwargs):
+    """Await a (blocking) email function on the async worker pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_async_executor(), partial(func, *args, **kwargs))
+
+
+def _make_async(func):
+    """Internal helper wrapping a blocking email function as a coroutine function"""
+    pooled = _pooled(func)
+    
+    @wraps(func)
+    async def _async_func(*args, **kwargs):
+        return await run_email_function(pooled, *args, **kwargs)
+    return _async_func
+
+
+class AsyncEmailClient:
+    """
+    Awaitable versions of the email functions, e.g.
+    `await AsyncEmailClient().search_emails('is:unread')`.
+    Calls run concurrently on the async worker pool.
+    """
+    
+    FUNCTIONS = (
+        'send_email',
+        'send_bulk_email',
+        'get_send_status',
+        'get_recent_emails',
+        'search_emails',
+        'search_local_emails',
+        'count_emails',
+        'get_unread_emails',
+        'get_emails_from_sender',
+        'get_emails_by_date_range',
+        'get_email_body',
+        'get_email_thread',
+        'reply_to_email',
+        'mark_as_read',
+        'mark_as_unread',
+        'delete_email',
+        'get_email_labels',
+        'add_label_to_email',
+        'get_emails_with_attachments',
+        'get_starred_emails',
+        'get_inbox_stats',
+        'count_emails_from_sender',
+        'count_emails_in_date_range',
+        'list_email_attachments',
+        'download_email_attachments',
+        'batch_modify_emails',
+        'bulk_mark_as_read',
+        'bulk_mark_as_unread',
+        'bulk_delete_emails',
+        'bulk_add_label',
+        'export_emails'
+    )
+    
+    def __getattr__(self, name):
+        if name not in self.FUNCTIONS:
+            raise AttributeError(f"AsyncEmailClient has no function '{name}'")
+        return _make_async(globals()[name])
+
+
+# Every tool call returns its Gmail service to the pool when it finishes, and
+# LangGraph's ToolNode can await the tools: ainvoke runs them on the async pool
+for _email_tool in LANGCHAIN_TOOLS:
+    _email_tool.func = _pooled(_email_tool.func)
+    _email_tool.coroutine = _make_async(_email_tool.func)
+
+# Only now, with every function defined, may outbox workers start sending
+_resume_email_outbox()
@@ -0,0 +1,233 @@
+"""
+Email Outbox
+Durable SQLite queue of outgoing emails, drained by a small pool of worker
+threads with bounded concurrency and retries. Queued sends survive restarts
+and go out once the outbox is opened again (email_operations opens an existing
+outbox when it loads); a send cut off by a restart is marked unknown rather than
+sent again.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    message_id TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    next_attempt_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at);
+"""
+
+# queued -> sending -> sent | failed; a retryable error puts the row back in queued.
+# A row still 'sending' when the outbox reopens becomes 'unknown': Gmail may or may
+# not have sent it, so the user has to check Sent mail before sending it again.
+STATUSES = ('queued', 'sending', 'sent', 'failed', 'unknown')
+
+INTERRUPTED_ERROR = 'Interrupted while sending; check Sent mail before sending it again'
+
+RETRY_BASE_SECONDS = 5
+RETRY_MAX_SECONDS = 300
+
+# Payload fields never echoed back by status() (bodies can be long)
+HIDDEN_FIELDS = ('body', 'reply_body')
+
+
+class EmailOutbox:
+    """
+    Outbox whose workers call deliver(kind, payload) for every queued email.
+    deliver returns the Gmail send result ({'id': ...}) or raises; errors for which
+    is_retryable(error) is True are retried with backoff up to max_attempts times.
+    These are the only retries: deliver should make a single attempt.
+    """
+
+    def __init__(self, db_path: str, deliver: Callable[[str, Dict], Dict],
+                 is_retryable: Callable[[Exception], bool], workers: int = 4, max_attempts: int = 5):
+        self.db_path = os.path.expanduser(db_path)
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.deliver = deliver
+        self.is_retryable = is_retryable
+        self.workers = workers
+        self.max_attempts = max_attempts
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+        self._active = 0
+        self._threads = []
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+        # a send interrupted by a restart may already have reached Gmail; don't send it twice
+        with self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'unknown', error = ?, updated_at = ? WHERE status = 'sending'",
+                (INTERRUPTED_ERROR, time.time())
+            )
+
+    # ---------- producers ----------
+
+    def enqueue(self, kind: str, payload: Dict) -> str:
+        """Queue one email and return its tracking id"""
+        return self.enqueue_many([(kind, payload)])[0]
+
+    def enqueue_many(self, items: List[Tuple[str, Dict]]) -> List[str]:
+        """Queue several emails in one transaction; returns tracking ids in order"""
+        now = time.time()
+        rows = [
+            (uuid.uuid4().hex, kind, json.dumps(payload), 'queued', now, now, now)
+            for kind, payload in items
+        ]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO outbox (id, kind, payload, status, created_at, updated_at, next_attempt_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+            self._wakeup.notify_all()
+        self.start()
+        return [row[0] for row in rows]
+
+    # ---------- status ----------
+
+    @staticmethod
+    def _row_to_status(row) -> Dict:
+        payload = json.loads(row[2])
+        status = {
+            'tracking_id': row[0],
+            'kind': row[1],
+            'status': row[3],
+            'attempts': row[4],
+            'message_id': row[5],
+            'error': row[6],
+            'created_at': row[7],
+            'updated_at': row[8]
+        }
+        status.update({key: value for key, value in payload.items() if key not in HIDDEN_FIELDS})
+        return status
+
+    def status(self, tracking_ids: List[str]) -> Dict[str, Optional[Dict]]:
+        """Status of each tracking id (None for unknown ids)"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, kind, payload, status, attempts, message_id, error, created_at, updated_at "
+                f"FROM outbox WHERE id IN ({', '.join('?' * len(tracking_ids))})",
+                list(tracking_ids)
+            ).fetchall() if tracking_ids else []
+        found = {row[0]: self._row_to_status(row) for row in rows}
+        return {tracking_id: found.get(tracking_id) for tracking_id in tracking_ids}
+
+    def summary(self, limit: int = 20) -> Dict:
+        """Counts per status plus the most recently updated entries"""
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+            rows = self._conn.execute(
+                "SELECT id, kind, payload, status, attempts, message_id, error, created_at, updated_at "
+                "FROM outbox ORDER BY updated_at DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return {
+            'counts': {status: counts.get(status, 0) for status in STATUSES},
+            'recent': [self._row_to_status(row) for row in rows]
+        }
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until nothing is queued for now or sending; False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while True:
+                tracking_id, due = self._next_due()
+                if not self._active and (tracking_id is None or due > time.time()):
+                    return True
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining if remaining is not None else 0.5)
+
+    # ---------- workers ----------
+
+    def start(self) -> None:
+        """Start the worker threads (idempotent); called on the first enqueue"""
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            for i in range(len(self._threads), self.workers):
+                thread = threading.Thread(target=self._work, name=f"email-outbox-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _next_due(self) -> Tuple[Optional[str], float]:
+        """Caller holds the lock: (id, due time) of the next queued email, or (None, 0)"""
+        row = self._conn.execute(
+            "SELECT id, next_attempt_at FROM outbox WHERE status = 'queued' "
+            "ORDER BY next_attempt_at, created_at LIMIT 1"
+        ).fetchone()
+        return (row[0], row[1]) if row else (None, 0.0)
+
+    def _claim(self) -> Tuple[str, str, Dict, int]:
+        """Block until an email is due, mark it sending and return (id, kind, payload, attempts)"""
+        with self._lock:
+            while True:
+                tracking_id, due = self._next_due()
+                now = time.time()
+                if tracking_id is not None and due <= now:
+                    # the status check keeps another process sharing the database from claiming it too
+                    with self._conn:
+                        claimed = self._conn.execute(
+                            "UPDATE outbox SET status = 'sending', attempts = attempts + 1, updated_at = ? "
+                            "WHERE id = ? AND status = 'queued'",
+                            (now, tracking_id)
+                        ).rowcount
+                    if not claimed:
+                        continue
+                    row = self._conn.execute(
+                        "SELECT kind, payload, attempts FROM outbox WHERE id = ?", (tracking_id,)
+                    ).fetchone()
+                    self._active += 1
+                    return tracking_id, row[0], json.loads(row[1]), row[2]
+                self._idle.notify_all()
+                self._wakeup.wait(None if tracking_id is None else due - now)
+
+    def _finish(self, tracking_id: str, status: str, message_id: Optional[str] = None,
+                error: Optional[str] = None, retry_at: float = 0.0) -> None:
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE outbox SET status = ?, message_id = ?, error = ?, updated_at = ?, next_attempt_at = ? "
+                    "WHERE id = ?",
+                    (status, message_id, error, now, retry_at or now, tracking_id)
+                )
+            self._active -= 1
+            self._wakeup.notify_all()
+            self._idle.notify_all()
+
+    def _work(self) -> None:
+        while True:
+            tracking_id, kind, payload, attempts = self._claim()
+            try:
+                result = self.deliver(kind, payload)
+            except Exception as e:
+                if self.is_retryable(e) and attempts < self.max_attempts:
+                    delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * (2 ** (attempts - 1)))
+                    self._finish(tracking_id, 'queued', error=str(e), retry_at=time.time() + delay)
+                else:
+                    self._finish(tracking_id, 'failed', error=str(e))
+                continue
+            self._finish(tracking_id, 'sent', message_id=result.get('id'))
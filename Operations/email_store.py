@@ -0,0 +1,286 @@
+"""
+Email Metadata Store
+Local SQLite cache of Gmail message metadata (ids, headers, labels, snippets)
+that can answer a subset of Gmail query syntax without an API call
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    thread_id TEXT,
+    subject TEXT,
+    sender TEXT,
+    recipient TEXT,
+    date TEXT,
+    internal_date INTEGER,
+    snippet TEXT
+);
+CREATE TABLE IF NOT EXISTS message_labels (
+    message_id TEXT NOT NULL,
+    label_id TEXT NOT NULL,
+    PRIMARY KEY (message_id, label_id)
+);
+CREATE INDEX IF NOT EXISTS idx_messages_internal_date ON messages (internal_date DESC);
+CREATE INDEX IF NOT EXISTS idx_message_labels_label ON message_labels (label_id, message_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Gmail query operators that map onto a system label
+LABEL_OPERATORS = {
+    'is:unread': 'UNREAD',
+    'is:starred': 'STARRED',
+    'is:important': 'IMPORTANT',
+    'in:inbox': 'INBOX',
+    'in:sent': 'SENT',
+    'in:drafts': 'DRAFT',
+    'in:spam': 'SPAM',
+    'in:trash': 'TRASH',
+}
+
+# Header operators answered with a case-insensitive substring match
+HEADER_OPERATORS = {
+    'from': 'sender',
+    'to': 'recipient',
+    'subject': 'subject',
+}
+
+
+def _header(message: Dict, name: str, default: str) -> str:
+    """Read a header value from a Gmail message resource"""
+    headers = message.get('payload', {}).get('headers', [])
+    return next((h['value'] for h in headers if h['name'] == name), default)
+
+
+def _date_to_millis(value: str) -> Optional[int]:
+    """Convert a Gmail after:/before: date (YYYY/MM/DD) to epoch milliseconds"""
+    try:
+        return int(datetime.strptime(value.replace('-', '/'), '%Y/%m/%d').timestamp() * 1000)
+    except ValueError:
+        return None
+
+
+def translate_query(query: str) -> Optional[Tuple[str, List]]:
+    """
+    Translate a Gmail query into a SQL WHERE clause and parameters.
+    Returns None when the query uses syntax the store cannot answer exactly
+    (free text, OR, grouping, quoting, attachments, user labels, ...).
+    """
+    clauses = []
+    params = []
+    mentions_spam_trash = False
+
+    for token in query.split():
+        negate = token.startswith('-')
+        term = token[1:] if negate else token
+        lowered = term.lower()
+
+        if any(ch in term for ch in '"(){}') or term in ('OR', 'AND') or ':' not in term:
+            return None
+
+        operator, value = lowered.split(':', 1)
+        if not value:
+            return None
+
+        if lowered in LABEL_OPERATORS:
+            label_id = LABEL_OPERATORS[lowered]
+            mentions_spam_trash = mentions_spam_trash or label_id in ('SPAM', 'TRASH')
+            clause = "id IN (SELECT message_id FROM message_labels WHERE label_id = ?)"
+            params.append(label_id)
+        elif lowered == 'is:read':
+            clause = "id NOT IN (SELECT message_id FROM message_labels WHERE label_id = ?)"
+            params.append('UNREAD')
+        elif operator in HEADER_OPERATORS:
+            clause = f"{HEADER_OPERATORS[operator]} LIKE ?"
+            params.append(f"%{term.split(':', 1)[1]}%")
+        elif operator in ('after', 'before'):
+            millis = _date_to_millis(value)
+            if millis is None:
+                return None
+            clause = "internal_date >= ?" if operator == 'after' else "internal_date < ?"
+            params.append(millis)
+        else:
+            return None
+
+        clauses.append(f"NOT ({clause})" if negate else clause)
+
+    # Like messages.list, spam and trash are excluded unless the query asks for them
+    if not mentions_spam_trash:
+        clauses.append(
+            "id NOT IN (SELECT message_id FROM message_labels WHERE label_id IN ('SPAM', 'TRASH'))"
+        )
+
+    return " AND ".join(clauses), params
+
+
+class EmailStore:
+    """SQLite-backed metadata store kept current by Gmail history deltas"""
+
+    def __init__(self, db_path: str):
+        self.db_path = os.path.expanduser(db_path)
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._stale = False
+
+    # ---------- sync state ----------
+
+    def _get_state(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key: str, value: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value)
+            )
+
+    @property
+    def history_id(self) -> Optional[str]:
+        return self._get_state('history_id')
+
+    @property
+    def is_complete(self) -> bool:
+        """True once an initial backfill has finished"""
+        return self._get_state('backfill_complete') == '1'
+
+    def is_fresh(self, max_age_seconds: float) -> bool:
+        """True when the store was synced within max_age_seconds and nothing marked it stale"""
+        last_sync = self._get_state('last_sync')
+        if self._stale or not self.is_complete or last_sync is None:
+            return False
+        return time.time() - float(last_sync) <= max_age_seconds
+
+    def mark_stale(self) -> None:
+        """Force a sync before the next read (used after local mutations)"""
+        self._stale = True
+
+    def mark_synced(self, history_id: str) -> None:
+        self._set_state('history_id', str(history_id))
+        self._set_state('last_sync', str(time.time()))
+        self._stale = False
+
+    def mark_backfill_complete(self) -> None:
+        self._set_state('backfill_complete', '1')
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM sync_state WHERE key IN ('backfill_history_id', 'backfill_page_token')"
+            )
+
+    def backfill_checkpoint(self) -> Tuple[Optional[str], Optional[str]]:
+        """(history id, next page token) of an unfinished backfill; (None, None) if none is under way"""
+        return self._get_state('backfill_history_id'), self._get_state('backfill_page_token')
+
+    def save_backfill_checkpoint(self, history_id: str, page_token: str) -> None:
+        """Record backfill progress; page_token is '' before the first page"""
+        self._set_state('backfill_history_id', str(history_id))
+        self._set_state('backfill_page_token', page_token)
+
+    def reset(self) -> None:
+        """Drop all cached messages and sync state"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages")
+            self._conn.execute("DELETE FROM message_labels")
+            self._conn.execute("DELETE FROM sync_state")
+
+    # ---------- writes ----------
+
+    def upsert_messages(self, messages: List[Dict]) -> None:
+        """Insert or replace messages from Gmail message resources (metadata format)"""
+        with self._lock, self._conn:
+            for message in messages:
+                message_id = message['id']
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO messages "
+                    "(id, thread_id, subject, sender, recipient, date, internal_date, snippet) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        message_id,
+                        message.get('threadId', ''),
+                        _header(message, 'Subject', 'No Subject'),
+                        _header(message, 'From', 'Unknown'),
+                        _header(message, 'To', 'Unknown'),
+                        _header(message, 'Date', 'Unknown'),
+                        int(message.get('internalDate', 0)),
+                        message.get('snippet', ''),
+                    )
+                )
+                self._conn.execute("DELETE FROM message_labels WHERE message_id = ?", (message_id,))
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO message_labels (message_id, label_id) VALUES (?, ?)",
+                    [(message_id, label_id) for label_id in message.get('labelIds', [])]
+                )
+
+    def delete_messages(self, message_ids: List[str]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM messages WHERE id = ?", [(i,) for i in message_ids])
+            self._conn.executemany(
+                "DELETE FROM message_labels WHERE message_id = ?", [(i,) for i in message_ids]
+            )
+
+    def update_labels(self, message_ids: List[str], add: List[str] = (), remove: List[str] = ()) -> None:
+        """Apply a label change made through the API to messages already in the store"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO message_labels (message_id, label_id) "
+                "SELECT id, ? FROM messages WHERE id = ?",
+                [(label_id, message_id) for message_id in message_ids for label_id in add]
+            )
+            self._conn.executemany(
+                "DELETE FROM message_labels WHERE message_id = ? AND label_id = ?",
+                [(message_id, label_id) for message_id in message_ids for label_id in remove]
+            )
+
+    # ---------- reads ----------
+
+    def search(self, query: str, max_results: int, offset: int = 0) -> Optional[List[Dict]]:
+        """Newest-first messages matching a Gmail query, or None if the query is unsupported"""
+        translated = translate_query(query)
+        if translated is None:
+            return None
+        where, params = translated
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, subject, sender, recipient, date, snippet, thread_id FROM messages "
+                f"WHERE {where} ORDER BY internal_date DESC, id LIMIT ? OFFSET ?",
+                params + [max_results, offset]
+            ).fetchall()
+
+        return [
+            {
+                'id': row[0],
+                'subject': row[1],
+                'from': row[2],
+                'to': row[3],
+                'date': row[4],
+                'snippet': row[5],
+                'thread_id': row[6]
+            }
+            for row in rows
+        ]
+
+    def count(self, query: str) -> Optional[int]:
+        """Exact count of messages matching a Gmail query, or None if the query is unsupported"""
+        translated = translate_query(query)
+        if translated is None:
+            return None
+        where, params = translated
+
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM messages WHERE {where}", params).fetchone()[0]
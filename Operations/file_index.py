@@ -0,0 +1,349 @@
+"""
+File Index
+Persistent SQLite cache of directory scans keyed by each directory's mtime, and a
+parallel crawler that re-scans only the directories whose mtime has changed. The
+scans double as a file-name index for glob, substring and extension searches.
+
+A directory's mtime changes when entries are added, removed or renamed in it, not
+when an existing file is edited in place; pass refresh=True to pick those up.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    files INTEGER NOT NULL,
+    links INTEGER NOT NULL,
+    children TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    PRIMARY KEY (dir, name)
+);
+CREATE INDEX IF NOT EXISTS idx_files_ext ON files (ext);
+"""
+
+# A directory modified this recently may change again within the same mtime tick;
+# such scans are stored with mtime -1 so the next crawl re-scans them
+MTIME_SETTLE_NS = 2_000_000_000
+
+
+class _DirScan:
+    """One directory's own files (not its subdirectories) and the names of its subdirectories"""
+
+    __slots__ = ('path', 'mtime_ns', 'size', 'files', 'links', 'children', 'file_entries', 'error')
+
+    def __init__(self, path: str, mtime_ns: int = -1, size: int = 0, files: int = 0, links: int = 0,
+                 children: Optional[List[str]] = None, error: Optional[str] = None):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.files = files
+        self.links = links  # symlinked directories, counted but not followed
+        self.children = children if children is not None else []
+        self.file_entries = []  # (name, size, mtime_ns) of a fresh scan, until it is saved
+        self.error = error
+
+
+def _like_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _glob_escape(text: str) -> str:
+    return "".join(f"[{char}]" if char in "*?[" else char for char in text)
+
+
+def _path_range(root: str) -> Tuple[str, str]:
+    """Bounds of the paths strictly below root, for an index range scan instead of LIKE"""
+    prefix = root.rstrip(os.sep) + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+
+def _is_within(path: str, root: str) -> bool:
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+def _scan_directory(path: str, cached: Optional[_DirScan]) -> Tuple[_DirScan, bool]:
+    """Return (scan, fresh): the cached scan if the directory's mtime is unchanged, else a new scandir pass"""
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError as e:
+        return _DirScan(path, error=str(e)), False
+    if cached is not None and cached.mtime_ns == mtime_ns:
+        return cached, False
+
+    scan = _DirScan(path, mtime_ns)
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        scan.children.append(entry.name)
+                    elif entry.is_dir():
+                        scan.links += 1
+                    else:
+                        stat = entry.stat()
+                        scan.size += stat.st_size
+                        scan.files += 1
+                        scan.file_entries.append((entry.name, stat.st_size, stat.st_mtime_ns))
+                except OSError:
+                    pass  # broken symlink or file removed mid-scan
+    except OSError as e:
+        scan.error = str(e)
+    if time.time_ns() - mtime_ns < MTIME_SETTLE_NS:
+        scan.mtime_ns = -1
+    return scan, True
+
+
+class FileIndex:
+    """Directory scan cache shared by the file tools; crawl() fans subtrees out over `workers` threads"""
+
+    def __init__(self, db_path: str, workers: int = 8):
+        self.db_path = os.path.expanduser(db_path)
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._verified = {}  # root -> time.monotonic() of its last complete crawl
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        has_files = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'files'"
+        ).fetchone()
+        self._conn.executescript(SCHEMA)
+        if not has_files:
+            # directories cached before file names were indexed must be scanned again
+            with self._conn:
+                self._conn.execute("DELETE FROM dirs")
+
+    def _load(self, root: str) -> Dict[str, _DirScan]:
+        """Cached scans of root and everything below it"""
+        low, high = _path_range(root)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, mtime_ns, size, files, links, children FROM dirs "
+                "WHERE path = ? OR (path >= ? AND path < ?)",
+                (root, low, high)
+            ).fetchall()
+        return {row[0]: _DirScan(row[0], row[1], row[2], row[3], row[4], json.loads(row[5])) for row in rows}
+
+    def _load_one(self, path: str) -> Optional[_DirScan]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, mtime_ns, size, files, links, children FROM dirs WHERE path = ?", (path,)
+            ).fetchone()
+        return _DirScan(row[0], row[1], row[2], row[3], row[4], json.loads(row[5])) if row else None
+
+    def _save(self, scans: List[_DirScan], removed: List[str]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO dirs (path, mtime_ns, size, files, links, children) VALUES (?, ?, ?, ?, ?, ?)",
+                [(s.path, s.mtime_ns, s.size, s.files, s.links, json.dumps(s.children)) for s in scans]
+            )
+            self._conn.executemany("DELETE FROM dirs WHERE path = ?", [(path,) for path in removed])
+            self._conn.executemany(
+                "DELETE FROM files WHERE dir = ?", [(path,) for path in removed] + [(s.path,) for s in scans]
+            )
+            self._conn.executemany(
+                "INSERT INTO files (dir, name, ext, size, mtime_ns) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (s.path, name, os.path.splitext(name)[1].lower(), size, mtime_ns)
+                    for s in scans for name, size, mtime_ns in s.file_entries
+                ]
+            )
+        for scan in scans:
+            scan.file_entries = []
+
+    def crawl(self, root: str, refresh: bool = False, recursive: bool = True,
+              exclude_dirs: Tuple[str, ...] = ()) -> Tuple[Dict[str, _DirScan], Dict[str, int]]:
+        """
+        Scan root and all its subdirectories (or only root), reusing cached scans of unchanged
+        directories and not descending into directories named in exclude_dirs. Returns
+        ({path: scan} with every parent before its children, counters).
+        """
+        started = time.monotonic()
+        if recursive:
+            cached = self._load(root)
+        else:
+            root_scan = self._load_one(root)
+            cached = {root: root_scan} if root_scan else {}
+        scans = {}
+        fresh_scans = []
+        counters = {'scanned': 0, 'cached': 0, 'unreadable': 0}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='file-index') as pool:
+            pending = {pool.submit(_scan_directory, root, None if refresh else cached.get(root))}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    scan, fresh = future.result()
+                    scans[scan.path] = scan
+                    if scan.error:
+                        counters['unreadable'] += 1
+                        continue
+                    if fresh:
+                        fresh_scans.append(scan)
+                        counters['scanned'] += 1
+                    else:
+                        counters['cached'] += 1
+                    if not recursive:
+                        continue
+                    for name in scan.children:
+                        if name in exclude_dirs:
+                            continue
+                        child = os.path.join(scan.path, name)
+                        pending.add(pool.submit(_scan_directory, child, None if refresh else cached.get(child)))
+
+        # directories that were deleted, or are no longer reachable from a changed parent;
+        # cached scans inside excluded directories were just not visited, so they stay
+        excluded = set(exclude_dirs)
+        removed = [
+            path for path in cached
+            if path not in scans and not (excluded and excluded.intersection(os.path.relpath(path, root).split(os.sep)))
+        ]
+        self._save(fresh_scans, removed)
+        if recursive and not exclude_dirs:
+            with self._lock:
+                self._verified[root] = started
+        return scans, counters
+
+    def _recently_crawled(self, root: str, max_age: float) -> bool:
+        """True if root, or a directory above it, was fully crawled in the last max_age seconds"""
+        cutoff = time.monotonic() - max_age
+        with self._lock:
+            return any(crawled >= cutoff and _is_within(root, path) for path, crawled in self._verified.items())
+
+    def invalidate(self, paths: List[str]) -> None:
+        """
+        Record that files or folders at these paths were created, changed or removed: the
+        directories holding them are re-scanned on the next crawl (even if their mtime did
+        not change, as with in-place edits), and no earlier crawl over them counts as recent.
+        """
+        dirs = {os.path.dirname(path) for path in paths} | set(paths)
+        with self._lock:
+            with self._conn:
+                self._conn.executemany("UPDATE dirs SET mtime_ns = -1 WHERE path = ?", [(d,) for d in dirs])
+            for root in list(self._verified):
+                if any(_is_within(d, root) or _is_within(root, d) for d in dirs):
+                    del self._verified[root]
+
+    def search(self, root: str, glob: str = "", substring: str = "", extension: str = "",
+               recursive: bool = True, max_results: int = 200, max_age: float = 30,
+               exclude_dirs: Tuple[str, ...] = ()) -> Dict:
+        """
+        Files under root whose name matches every given filter: a glob pattern (case-sensitive),
+        a substring (case-insensitive) and an extension, skipping anything inside a directory
+        named in exclude_dirs. The index is brought up to date first unless root was crawled
+        within max_age seconds; returned hits are checked on disk. If some have vanished since
+        a skipped crawl, the crawl is run after all. Returns {'total', 'files': [(path, size, mtime)],
+        'stale', ...} where total excludes the stale (vanished) hits.
+        """
+        counters = {'scanned': 0, 'cached': 0, 'unreadable': 0}
+        crawled = False
+        if not (recursive and self._recently_crawled(root, max_age)):
+            _, counters = self.crawl(root, recursive=recursive, exclude_dirs=exclude_dirs)
+            crawled = True
+
+        total, files, stale = self._query(root, glob, substring, extension, recursive, max_results, exclude_dirs)
+        if stale and not crawled:
+            _, counters = self.crawl(root, recursive=recursive, exclude_dirs=exclude_dirs)
+            total, files, stale = self._query(root, glob, substring, extension, recursive, max_results,
+                                              exclude_dirs)
+        return {'total': total - stale, 'files': files, 'stale': stale, **counters}
+
+    def _query(self, root: str, glob: str, substring: str, extension: str, recursive: bool, max_results: int,
+               exclude_dirs: Tuple[str, ...]) -> Tuple[int, List[Tuple[str, int, float]], int]:
+        """(total matches in the index, up to max_results hits that still exist on disk, hits that vanished)"""
+        clauses = []
+        params = []
+        if recursive:
+            low, high = _path_range(root)
+            clauses.append("(dir = ? OR (dir >= ? AND dir < ?))")
+            params += [root, low, high]
+        else:
+            clauses.append("dir = ?")
+            params.append(root)
+        if glob and glob != "*":
+            clauses.append("name GLOB ?")
+            params.append(glob)
+        if substring:
+            clauses.append("name LIKE ? ESCAPE '\\'")
+            params.append(f"%{_like_escape(substring)}%")
+        if extension:
+            clauses.append("ext = ?")
+            params.append(("." + extension.lstrip(".")).lower())
+        # like crawl(), only directories below root are excluded, never root or its ancestors
+        below_root = _glob_escape(root.rstrip(os.sep)) + "*" + os.sep
+        for name in exclude_dirs:
+            clauses.append("dir NOT GLOB ? AND dir NOT GLOB ?")
+            escaped = below_root + _glob_escape(name)
+            params += [escaped, escaped + os.sep + "*"]
+        where = " AND ".join(clauses)
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM files WHERE {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT dir, name FROM files WHERE {where} ORDER BY dir, name LIMIT ?", params + [max_results]
+            ).fetchall()
+
+        files = []
+        stale = 0
+        for directory, name in rows:
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                stale += 1
+                continue
+            files.append((path, stat.st_size, stat.st_mtime))
+        return total, files, stale
+
+    def folder_size(self, root: str, refresh: bool = False) -> Dict:
+        """Recursive totals of root plus a per-child breakdown"""
+        scans, counters = self.crawl(root, refresh)
+
+        # children finish after their parents, so the reverse order sums bottom-up
+        totals = {}
+        for path in reversed(list(scans)):
+            scan = scans[path]
+            size, files, folders = scan.size, scan.files, len(scan.children) + scan.links
+            for name in scan.children:
+                child = totals.get(os.path.join(path, name))
+                if child:
+                    size += child[0]
+                    files += child[1]
+                    folders += child[2]
+            totals[path] = (size, files, folders)
+
+        root_scan = scans[root]
+        children = []
+        for name in root_scan.children:
+            size, files, folders = totals.get(os.path.join(root, name), (0, 0, 0))
+            children.append({'name': name, 'size_bytes': size, 'file_count': files, 'folder_count': folders})
+        children.sort(key=lambda child: child['size_bytes'], reverse=True)
+
+        size, files, folders = totals[root]
+        return {
+            'size': size,
+            'files': files,
+            'folders': folders,
+            'own_files_size': root_scan.size,
+            'own_file_count': root_scan.files,
+            'children': children,
+            'error': root_scan.error,
+            **counters
+        }
@@ -7,9 +7,23 @@ import os
 import shutil
 import platform
 import json
-from typing import Dict, Any, List
+import base64
+import bisect
+import fnmatch
+import heapq
+import mmap
+import multiprocessing
+import threading
+from array import array
+from collections import Counter, OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
 from langchain_core.tools import tool
 
+from . import content_search
+from .file_index import FileIndex
+
 
 # =============== HELPERS ===============
 
@@ -42,6 +56,43 @@ def normalize_path(path: str) -> str:
     return os.path.normpath(path)
 
 
+# Directory scans are cached on disk by directory mtime (see file_index.py), so repeated
+# folder queries only re-scan what changed, and file searches are answered from the cached
+# names. FILE_INDEX_PATH moves the cache; setting it to an empty string keeps it in memory
+# for the current session only. A folder crawled less than FILE_INDEX_MAX_AGE seconds ago
+# is searched without re-checking directory mtimes. The cache is about the local file
+# system, not the mailbox, so it lives in the user's cache directory.
+DEFAULT_FILE_INDEX_PATH = os.path.join(os.getenv("XDG_CACHE_HOME") or "~/.cache", "file_index", "file_index.db")
+FILE_INDEX_WORKERS = 8
+FILE_INDEX_MAX_AGE = float(os.getenv("FILE_INDEX_MAX_AGE", "30"))
+_file_index = None
+_file_index_lock = threading.Lock()
+
+
+def _get_file_index() -> FileIndex:
+    """Internal helper to open the directory scan cache on first use"""
+    global _file_index
+    with _file_index_lock:
+        if _file_index is None:
+            index_path = os.getenv("FILE_INDEX_PATH", DEFAULT_FILE_INDEX_PATH)
+            try:
+                _file_index = FileIndex(index_path or ":memory:", FILE_INDEX_WORKERS)
+            except Exception as e:
+                print(f"⚠️ File index unavailable, caching directory scans in memory: {e}")
+                _file_index = FileIndex(":memory:", FILE_INDEX_WORKERS)
+        return _file_index
+
+
+def _file_index_changed(*paths: str) -> None:
+    """Internal helper telling the file index about paths a tool changed; never fails the tool call"""
+    if _file_index is None:
+        return
+    try:
+        _file_index.invalidate(list(paths))
+    except Exception as e:
+        print(f"⚠️ Could not update the file index: {e}")
+
+
 # =============== CORE FILE OPERATIONS ===============
 
 def create_file(filename: str = "new_file.txt", path: str = ".", content: str = "") -> Dict[str, Any]:
@@ -59,6 +110,7 @@ def create_file(filename: str = "new_file.txt", path: str = ".", content: str =
         
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(content)
+        _file_index_changed(file_path)
         
         return {
             "success": True,
@@ -74,8 +126,113 @@ def create_file(filename: str = "new_file.txt", path: str = ".", content: str =
 
 
 
-def read_file(file_path: str) -> Dict[str, Any]:
-    """Read content from a file"""
+# =============== RANGED READS ===============
+
+# read_file returns at most READ_MAX_BYTES of content per call; larger files are read by
+# line or byte range. Files from MMAP_THRESHOLD bytes up are memory-mapped, so a range of a
+# multi-gigabyte file never loads the whole file.
+READ_MAX_BYTES = int(os.getenv("FILE_READ_MAX_BYTES", "200000"))
+MMAP_THRESHOLD = 1024 * 1024
+
+# Sparse line index: the number of newlines before every LINE_INDEX_BLOCK-byte block, so
+# finding a line only scans one block. Kept for the LINE_INDEX_CACHE_SIZE most recently
+# read files, keyed on path and invalidated when the size or mtime changes.
+LINE_INDEX_BLOCK = 256 * 1024
+LINE_INDEX_CACHE_SIZE = 32
+_line_indexes = OrderedDict()  # path -> (size, mtime_ns, newline counts)
+_line_indexes_lock = threading.Lock()
+
+
+@contextmanager
+def _open_bytes(path: str, size: int) -> Iterator[Union[bytes, mmap.mmap]]:
+    """Internal helper to expose a file as a buffer: memory-mapped when large, read at once when small"""
+    with open(path, "rb") as f:
+        if size < MMAP_THRESHOLD:
+            yield f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def _line_index(path: str, stat: os.stat_result, buf) -> array:
+    """Internal helper returning counts[i] = newlines before byte i * LINE_INDEX_BLOCK (last item: all newlines)"""
+    with _line_indexes_lock:
+        cached = _line_indexes.get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            _line_indexes.move_to_end(path)
+            return cached[2]
+    
+    counts = array("q", [0])
+    for start in range(0, stat.st_size, LINE_INDEX_BLOCK):
+        counts.append(counts[-1] + buf[start:start + LINE_INDEX_BLOCK].count(b"\n"))
+    
+    with _line_indexes_lock:
+        _line_indexes[path] = (stat.st_size, stat.st_mtime_ns, counts)
+        _line_indexes.move_to_end(path)
+        while len(_line_indexes) > LINE_INDEX_CACHE_SIZE:
+            _line_indexes.popitem(last=False)
+    return counts
+
+
+def _line_start(buf, counts: array, line: int) -> Optional[int]:
+    """Internal helper returning the byte offset where a 1-based line starts, or None past the last newline"""
+    newlines_before = line - 1
+    if newlines_before <= 0:
+        return 0
+    if newlines_before > counts[-1]:
+        return None
+    block = bisect.bisect_left(counts, newlines_before) - 1
+    position = block * LINE_INDEX_BLOCK
+    for _ in range(newlines_before - counts[block]):
+        position = buf.find(b"\n", position) + 1
+    return position
+
+
+def _skip_lines(buf, start: int, lines: int, limit: int) -> int:
+    """Internal helper returning the offset after `lines` lines from start, stopping at limit"""
+    position = start
+    for _ in range(lines):
+        newline = buf.find(b"\n", position, limit)
+        if newline == -1:
+            return limit
+        position = newline + 1
+    return position
+
+
+def _char_start(buf, position: int, floor: int) -> int:
+    """Internal helper moving a cut back off UTF-8 continuation bytes, so it never splits a character"""
+    moved = position
+    for _ in range(3):
+        if moved <= floor or moved >= len(buf) or buf[moved] & 0xC0 != 0x80:
+            break
+        moved -= 1
+    return moved if moved > floor else position
+
+
+def _cap_range(buf, start: int, end: int, max_bytes: int) -> int:
+    """Internal helper shortening [start, end) to max_bytes, ending after a whole line when there is one"""
+    if end - start <= max_bytes:
+        return end
+    newline = buf.rfind(b"\n", start, start + max_bytes)
+    return newline + 1 if newline != -1 else _char_start(buf, start + max_bytes, start)
+
+
+def _continue_after(buf, capped: int, next_line: int) -> Dict[str, Any]:
+    """Internal helper for where a truncated read continues: next_line at a line start, else next_byte_offset"""
+    if buf[capped - 1:capped] == b"\n":
+        return {"truncated": True, "next_line": next_line}
+    return {"truncated": True, "next_byte_offset": capped}
+
+
+def read_file(file_path: str, start_line: int = 0, end_line: int = 0, head: int = 0, tail: int = 0,
+              byte_offset: int = -1, byte_length: int = 0, max_bytes: int = READ_MAX_BYTES) -> Dict[str, Any]:
+    """
+    Read content from a file: all of it, a 1-based inclusive line range, the first (head) or
+    last (tail) lines, or a byte range. At most max_bytes of content are returned; larger
+    reads are cut at a line boundary (or, inside an overlong line, a character boundary) and
+    marked truncated with next_line or next_byte_offset to continue from. A truncated tail
+    keeps the end and reports the omitted part as omitted_byte_offset/omitted_bytes.
+    """
     try:
         target_path = normalize_path(file_path)
         
@@ -85,16 +242,77 @@ def read_file(file_path: str) -> Dict[str, Any]:
         if not os.path.isfile(target_path):
             return {"success": False, "error": f"Path is not a file: {target_path}"}
         
-        with open(target_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        return {
-            "success": True,
-            "content": content,
-            "size": len(content),
-            "path": target_path,
-            "filename": os.path.basename(target_path)
-        }
+        stat = os.stat(target_path)
+        file_size = stat.st_size
+        result = {"success": True, "path": target_path, "filename": os.path.basename(target_path),
+                  "file_size": file_size}
+        
+        if file_size == 0:
+            result.update({"content": "", "size": 0})
+            return result
+        
+        with _open_bytes(target_path, file_size) as buf:
+            if byte_offset >= 0:
+                start = min(byte_offset, file_size)
+                end = min(file_size, start + min(byte_length or max_bytes, max_bytes))
+                end = _char_start(buf, end, start)
+                # an offset not from a previous read can still start inside a multi-byte character
+                content = buf[start:end].decode("utf-8", errors="replace")
+                result.update({"byte_offset": start, "bytes_read": end - start})
+                if end < file_size:
+                    result["next_byte_offset"] = end
+            
+            elif tail > 0:
+                position = file_size - 1 if buf[file_size - 1:file_size] == b"\n" else file_size
+                for _ in range(tail):
+                    position = buf.rfind(b"\n", 0, position)
+                    if position == -1:
+                        break
+                requested = position + 1
+                start = requested
+                # keep the end of the file when the tail is too large
+                capped = max(start, file_size - max_bytes)
+                if capped > start:
+                    newline = buf.find(b"\n", capped)
+                    if newline != -1 and newline + 1 < file_size:
+                        start = newline + 1
+                    else:
+                        start = capped
+                        while start < file_size and buf[start] & 0xC0 == 0x80:
+                            start += 1
+                    result.update({"truncated": True, "omitted_byte_offset": requested,
+                                   "omitted_bytes": start - requested})
+                content = buf[start:file_size].decode("utf-8")
+                result["lines_read"] = content.count("\n") + (0 if content.endswith("\n") else 1)
+            
+            elif start_line > 0 or end_line > 0:
+                counts = _line_index(target_path, stat, buf)
+                total_lines = counts[-1] + (0 if buf[file_size - 1:file_size] == b"\n" else 1)
+                first = max(start_line, 1)
+                last = min(end_line, total_lines) if end_line > 0 else total_lines
+                result["total_lines"] = total_lines
+                start = _line_start(buf, counts, first)
+                if start is None or first > last:
+                    result.update({"content": "", "size": 0, "start_line": first, "end_line": first - 1})
+                    return result
+                end = _line_start(buf, counts, last + 1) if last < total_lines else file_size
+                capped = _cap_range(buf, start, end, max_bytes)
+                content = buf[start:capped].decode("utf-8")
+                if capped < end:
+                    last = first + content.count("\n") - (1 if content.endswith("\n") else 0)
+                    result.update(_continue_after(buf, capped, last + 1))
+                result.update({"start_line": first, "end_line": last})
+            
+            else:
+                end = _skip_lines(buf, 0, head, file_size) if head > 0 else file_size
+                capped = _cap_range(buf, 0, end, max_bytes)
+                content = buf[:capped].decode("utf-8")
+                if capped < end:
+                    result.update(_continue_after(buf, capped, content.count("\n") + 1))
+        
+        result["content"] = content
+        result["size"] = len(content)
+        return result
     except UnicodeDecodeError:
         return {"success": False, "error": "File contains binary data or unsupported encoding"}
     except Exception as e:
@@ -115,6 +333,7 @@ def write_file(file_path: str, content: str, overwrite: bool = False) -> Dict[st
         
         with open(target_path, 'w', encoding='utf-8') as f:
             f.write(content)
+        _file_index_changed(target_path)
         
         return {
             "success": True,
@@ -139,6 +358,7 @@ def append_to_file(file_path: str, content: str) -> Dict[str, Any]:
         
         with open(target_path, 'a', encoding='utf-8') as f:
             f.write(content)
+        _file_index_changed(target_path)
         
         new_size = os.path.getsize(target_path)
         
@@ -165,6 +385,7 @@ def delete_file(file_path: str) -> Dict[str, Any]:
             return {"success": False, "error": f"Not a file: {target_path}"}
         
         os.remove(target_path)
+        _file_index_changed(target_path)
         
         return {
             "success": True,
@@ -185,6 +406,7 @@ def create_folder(folder_name: str, path: str = ".") -> Dict[str, Any]:
             return {"success": False, "error": f"Folder already exists: {folder_path}"}
         
         os.makedirs(folder_path, exist_ok=True)
+        _file_index_changed(folder_path)
         
         return {
             "success": True,
@@ -211,6 +433,7 @@ def delete_folder(folder_path: str, recursive: bool = False) -> Dict[str, Any]:
             shutil.rmtree(target_path)
         else:
             os.rmdir(target_path)
+        _file_index_changed(target_path)
         
         return {
             "success": True,
@@ -226,8 +449,80 @@ def delete_folder(folder_path: str, recursive: bool = False) -> Dict[str, Any]:
         return {"success": False, "error": f"Error deleting folder: {str(e)}"}
 
 
-def list_directory(path: str = ".") -> Dict[str, Any]:
-    """List all files and folders in a directory"""
+# =============== DIRECTORY LISTING ===============
+
+LIST_SORT_KEYS = ("name", "size", "modified", "extension")
+LIST_TYPE_FILTERS = ("all", "files", "folders")
+
+
+def _entry_stat(entry: os.DirEntry) -> Optional[os.stat_result]:
+    """Stat a directory entry (cached by DirEntry); None for broken links and vanished files"""
+    try:
+        return entry.stat()
+    except OSError:
+        return None
+
+
+def _entry_is_dir(entry: os.DirEntry) -> bool:
+    """Folder check from the entry's cached type info; no syscall on most platforms"""
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+
+def _listing_key(entry: os.DirEntry, is_dir: bool, sort_by: str, descending: bool) -> Tuple:
+    """
+    Sort key of an entry: folders first (also when descending, hence the flipped group),
+    then the sort field, then the name so keys are unique and usable as a cursor position.
+    """
+    group = (1 if is_dir else 0) if descending else (0 if is_dir else 1)
+    if sort_by == "size":
+        stat = None if is_dir else _entry_stat(entry)
+        primary = stat.st_size if stat else 0
+    elif sort_by == "modified":
+        stat = _entry_stat(entry)
+        primary = stat.st_mtime if stat else 0.0
+    elif sort_by == "extension":
+        primary = "" if is_dir else os.path.splitext(entry.name)[1].lower()
+    else:
+        primary = entry.name.lower()
+    return (group, primary, entry.name)
+
+
+def _encode_listing_cursor(options: Dict[str, Any], last_key: Tuple) -> str:
+    state = json.dumps({**options, "last": list(last_key)})
+    return base64.urlsafe_b64encode(state.encode("utf-8")).decode("utf-8")
+
+
+def _decode_listing_cursor(cursor: str, options: Dict[str, Any]) -> Tuple:
+    """Return the last key of the previous page, checking the cursor belongs to the same listing"""
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode("utf-8")))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if any(state.get(key) != value for key, value in options.items()):
+        raise ValueError("Cursor belongs to a different listing; repeat the same path, filters and sort")
+    return tuple(state["last"])
+
+
+def _listing_item(entry: os.DirEntry, is_dir: bool) -> Dict[str, Any]:
+    if is_dir:
+        return {"name": entry.name, "type": "folder", "path": entry.path}
+    stat = _entry_stat(entry)
+    return {
+        "name": entry.name,
+        "type": "file",
+        "size": stat.st_size if stat else None,
+        "modified": stat.st_mtime if stat else None,
+        "path": entry.path
+    }
+
+
+def list_directory(path: str = ".", pattern: str = "", type_filter: str = "all", sort_by: str = "name",
+                   descending: bool = False, offset: int = 0, limit: int = 100, cursor: str = "",
+                   include_hidden: bool = True, summary_only: bool = False) -> Dict[str, Any]:
+    """List files and folders in a directory, one page at a time"""
     try:
         target_path = normalize_path(path)
         
@@ -237,31 +532,74 @@ def list_directory(path: str = ".") -> Dict[str, Any]:
         if not os.path.isdir(target_path):
             return {"success": False, "error": f"Not a directory: {target_path}"}
         
-        items = os.listdir(target_path)
-        folders = []
-        files = []
+        if sort_by not in LIST_SORT_KEYS:
+            return {"success": False, "error": f"sort_by must be one of: {', '.join(LIST_SORT_KEYS)}"}
         
-        for item in items:
-            item_path = os.path.join(target_path, item)
-            if os.path.isdir(item_path):
-                folders.append({"name": item, "type": "folder", "path": item_path})
-            else:
-                files.append({
-                    "name": item,
-                    "type": "file",
-                    "size": os.path.getsize(item_path),
-                    "path": item_path
-                })
+        if type_filter not in LIST_TYPE_FILTERS:
+            return {"success": False, "error": f"type_filter must be one of: {', '.join(LIST_TYPE_FILTERS)}"}
         
-        return {
+        if limit < 1 or offset < 0:
+            return {"success": False, "error": "limit must be at least 1 and offset must not be negative"}
+        
+        options = {"path": target_path, "pattern": pattern, "type_filter": type_filter, "sort_by": sort_by,
+                   "descending": descending, "include_hidden": include_hidden}
+        last_key = _decode_listing_cursor(cursor, options) if cursor else None
+        
+        # one scandir pass; type info comes from the directory read itself, stat is deferred
+        total_items = 0
+        folder_count = 0
+        candidates = []
+        with os.scandir(target_path) as entries:
+            for entry in entries:
+                total_items += 1
+                if not include_hidden and entry.name.startswith("."):
+                    continue
+                if pattern and not fnmatch.fnmatch(entry.name, pattern):
+                    continue
+                is_dir = _entry_is_dir(entry)
+                if (type_filter == "files" and is_dir) or (type_filter == "folders" and not is_dir):
+                    continue
+                folder_count += is_dir
+                candidates.append((entry, is_dir))
+        
+        result = {
             "success": True,
             "path": target_path,
-            "total_items": len(items),
-            "folder_count": len(folders),
-            "file_count": len(files),
-            "folders": sorted(folders, key=lambda x: x["name"]),
-            "files": sorted(files, key=lambda x: x["name"])
+            "total_items": total_items,
+            "matched_items": len(candidates),
+            "folder_count": folder_count,
+            "file_count": len(candidates) - folder_count
         }
+        
+        if summary_only:
+            extensions = Counter()
+            total_size = 0
+            for entry, is_dir in candidates:
+                if not is_dir:
+                    extensions[os.path.splitext(entry.name)[1].lower() or "(none)"] += 1
+                    stat = _entry_stat(entry)
+                    total_size += stat.st_size if stat else 0
+            result["total_file_size_bytes"] = total_size
+            result["top_extensions"] = dict(extensions.most_common(10))
+            return result
+        
+        keyed = ((_listing_key(entry, is_dir, sort_by, descending), entry, is_dir) for entry, is_dir in candidates)
+        if last_key is not None:
+            keyed = (item for item in keyed if (item[0] < last_key if descending else item[0] > last_key))
+        
+        # only the requested page (+1 to detect more) is ordered, not the whole directory
+        select = heapq.nlargest if descending else heapq.nsmallest
+        window = select(offset + limit + 1, keyed, key=lambda item: item[0])
+        page = window[offset:offset + limit]
+        
+        items = [_listing_item(entry, is_dir) for _, entry, is_dir in page]
+        result["offset"] = offset
+        result["count"] = len(items)
+        result["folders"] = [item for item in items if item["type"] == "folder"]
+        result["files"] = [item for item in items if item["type"] == "file"]
+        if len(window) > offset + limit:
+            result["next_cursor"] = _encode_listing_cursor(options, page[-1][0])
+        return result
     except Exception as e:
         return {"success": False, "error": f"Error listing directory: {str(e)}"}
 
@@ -283,6 +621,7 @@ def move_file(source_path: str, destination_path: str) -> Dict[str, Any]:
             os.makedirs(dest_dir, exist_ok=True)
         
         shutil.move(str(src), str(dest))
+        _file_index_changed(src, dest)
         
         return {
             "success": True,
@@ -314,6 +653,7 @@ def move_folder(source_path: str, destination_path: str) -> Dict[str, Any]:
             os.makedirs(dest_parent, exist_ok=True)
         
         shutil.move(str(src), str(dest))
+        _file_index_changed(src, dest)
         
         return {
             "success": True,
@@ -325,42 +665,84 @@ def move_folder(source_path: str, destination_path: str) -> Dict[str, Any]:
         return {"success": False, "error": f"Error moving folder: {str(e)}"}
 
 
-def search_files(directory: str = ".", pattern: str = "*", recursive: bool = False) -> Dict[str, Any]:
-    """Search for files matching a pattern"""
+def _search_files_glob(dir_path: str, pattern: str, recursive: bool) -> Dict[str, Any]:
+    """Internal helper for patterns spanning folders (e.g. "src/*.py"), which the index can't answer"""
+    from pathlib import Path
+    
+    path_obj = Path(dir_path)
+    
+    if recursive:
+        matches = list(path_obj.rglob(pattern))
+    else:
+        matches = list(path_obj.glob(pattern))
+    
+    files = [m for m in matches if m.is_file()]
+    
+    results = []
+    for file in files:
+        results.append({
+            "name": file.name,
+            "path": str(file.absolute()),
+            "size": file.stat().st_size,
+            "extension": file.suffix
+        })
+    
+    return {
+        "success": True,
+        "pattern": pattern,
+        "directory": str(dir_path),
+        "recursive": recursive,
+        "count": len(results),
+        "files": results
+    }
+
+
+def search_files(directory: str = ".", pattern: str = "*", recursive: bool = False, name_contains: str = "",
+                 extension: str = "", max_results: int = 200) -> Dict[str, Any]:
+    """Search for files by name pattern, name substring and/or extension, using the file index"""
     try:
-        from pathlib import Path
-        
         dir_path = normalize_path(directory)
         
         if not os.path.exists(dir_path):
             return {"success": False, "error": f"Directory not found: {dir_path}"}
         
-        path_obj = Path(dir_path)
-        
-        if recursive:
-            matches = list(path_obj.rglob(pattern))
-        else:
-            matches = list(path_obj.glob(pattern))
-        
-        files = [m for m in matches if m.is_file()]
-        
-        results = []
-        for file in files:
-            results.append({
-                "name": file.name,
-                "path": str(file.absolute()),
-                "size": file.stat().st_size,
-                "extension": file.suffix
-            })
-        
-        return {
+        if not os.path.isdir(dir_path):
+            return {"success": False, "error": f"Not a directory: {dir_path}"}
+        
+        pattern = pattern or "*"
+        if pattern.startswith("**/"):
+            pattern, recursive = pattern[3:], True
+        if "/" in pattern or os.sep in pattern:
+            return _search_files_glob(dir_path, pattern, recursive)
+        
+        found = _get_file_index().search(dir_path, pattern, name_contains, extension, recursive,
+                                         max_results, FILE_INDEX_MAX_AGE)
+        results = [
+            {
+                "name": os.path.basename(path),
+                "path": path,
+                "size": size,
+                "extension": os.path.splitext(path)[1]
+            }
+            for path, size, _ in found["files"]
+        ]
+        
+        result = {
             "success": True,
             "pattern": pattern,
-            "directory": str(dir_path),
+            "directory": dir_path,
             "recursive": recursive,
             "count": len(results),
+            "total_matches": found["total"],
             "files": results
         }
+        if name_contains:
+            result["name_contains"] = name_contains
+        if extension:
+            result["extension"] = extension
+        if found["total"] > max_results:
+            result["truncated"] = True
+        return result
     except Exception as e:
         return {"success": False, "error": f"Error searching files: {str(e)}"}
 
@@ -382,6 +764,7 @@ def copy_file(source_path: str, destination_path: str) -> Dict[str, Any]:
             os.makedirs(dest_dir, exist_ok=True)
         
         shutil.copy2(str(src), str(dest))
+        _file_index_changed(dest)
         
         return {
             "success": True,
@@ -441,8 +824,8 @@ def get_file_size(file_path: str) -> Dict[str, Any]:
         return {"success": False, "error": f"Error getting file size: {str(e)}"}
 
 
-def get_folder_size(folder_path: str) -> Dict[str, Any]:
-    """Calculate total size of all files in a folder"""
+def get_folder_size(folder_path: str, breakdown: int = 10, refresh: bool = False) -> Dict[str, Any]:
+    """Calculate total size of all files in a folder, with the largest subfolders"""
     try:
         target_path = normalize_path(folder_path)
         
@@ -452,34 +835,170 @@ def get_folder_size(folder_path: str) -> Dict[str, Any]:
         if not os.path.isdir(target_path):
             return {"success": False, "error": f"Path is not a folder: {target_path}"}
         
-        total_size = 0
-        file_count = 0
-        folder_count = 0
-        
-        for dirpath, dirnames, filenames in os.walk(target_path):
-            folder_count += len(dirnames)
-            for filename in filenames:
-                file_path = os.path.join(dirpath, filename)
-                try:
-                    total_size += os.path.getsize(file_path)
-                    file_count += 1
-                except:
-                    pass
+        sizes = _get_file_index().folder_size(target_path, refresh)
+        if sizes["error"]:
+            return {"success": False, "error": f"Error calculating folder size: {sizes['error']}"}
         
-        return {
+        total_size = sizes["size"]
+        result = {
             "success": True,
             "path": target_path,
             "total_size_bytes": total_size,
             "total_size_kb": round(total_size / 1024, 2),
             "total_size_mb": round(total_size / 1024 / 1024, 2),
             "total_size_gb": round(total_size / 1024 / 1024 / 1024, 2),
-            "file_count": file_count,
-            "folder_count": folder_count
+            "file_count": sizes["files"],
+            "folder_count": sizes["folders"],
+            "files_directly_inside_bytes": sizes["own_files_size"],
+            "scanned_folders": sizes["scanned"],
+            "cached_folders": sizes["cached"]
         }
+        if sizes["unreadable"]:
+            result["unreadable_folders"] = sizes["unreadable"]
+        if breakdown:
+            result["largest_subfolders"] = sizes["children"][:breakdown]
+        return result
     except Exception as e:
         return {"success": False, "error": f"Error calculating folder size: {str(e)}"}
 
 
+# =============== CONTENT SEARCH ===============
+
+# Folders never searched for content; FILE_SEARCH_IGNORE_DIRS (comma-separated) replaces the list
+SEARCH_IGNORE_DIRS = tuple(
+    name.strip() for name in os.getenv(
+        "FILE_SEARCH_IGNORE_DIRS", ".git,__pycache__,node_modules,.venv,venv,.mypy_cache,.pytest_cache,.tox,.idea"
+    ).split(",") if name.strip()
+)
+SEARCH_WORKERS = os.cpu_count() or 4
+# Below this many bytes in total, searching in-process is faster than handing chunks to workers
+SEARCH_INLINE_BYTES = 8 * 1024 * 1024
+SEARCH_MAX_FILES = 100_000
+_search_pool = None
+_search_pool_lock = threading.Lock()
+
+
+def _get_search_pool() -> ProcessPoolExecutor:
+    """Internal helper to start the content search worker processes on first use"""
+    global _search_pool
+    with _search_pool_lock:
+        if _search_pool is None:
+            # spawn, not fork: forking would copy the agent's background threads' locks mid-use
+            _search_pool = ProcessPoolExecutor(max_workers=SEARCH_WORKERS,
+                                               mp_context=multiprocessing.get_context("spawn"))
+        return _search_pool
+
+
+def _run_search_chunks(chunks: List[Tuple[str, int, int]], args: Tuple, max_matches: int,
+                       parallel: bool) -> Tuple[List[Dict], bool]:
+    """
+    Internal helper running chunk searches until max_matches are found; returns (chunk results, stopped early).
+    Results are counted and returned in chunk order, so parallel and serial runs find the same first matches.
+    """
+    results = []
+    found = 0
+    if not parallel:
+        for path, start, end in chunks:
+            chunk = content_search.search_chunk(path, start, end, *args, max_matches - found)
+            results.append(chunk)
+            found += len(chunk["matches"])
+            if found >= max_matches:
+                return results, True
+        return results, False
+    
+    global _search_pool
+    try:
+        pool = _get_search_pool()
+        futures = {pool.submit(content_search.search_chunk, path, start, end, *args, max_matches): i
+                   for i, (path, start, end) in enumerate(chunks)}
+        pending = set(futures)
+    except Exception as e:
+        print(f"⚠️ Content search workers unavailable, searching in-process: {e}")
+        with _search_pool_lock:
+            _search_pool = None
+        return _run_search_chunks(chunks, args, max_matches, parallel=False)
+    
+    # chunks finish in any order; a chunk only counts once every chunk before it has finished
+    finished = {}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            finished[futures[future]] = future.result()
+        while len(results) in finished:
+            chunk = finished.pop(len(results))
+            results.append(chunk)
+            found += len(chunk["matches"])
+            if found >= max_matches:
+                for future in pending:
+                    future.cancel()
+                return results, len(results) < len(chunks)
+    return results, False
+
+
+def search_file_contents(pattern: str, directory: str = ".", file_pattern: str = "*", literal: bool = False,
+                         case_sensitive: bool = False, context_lines: int = 1, max_matches: int = 50,
+                         recursive: bool = True) -> Dict[str, Any]:
+    """Search inside text files for a regex or literal pattern, like grep"""
+    try:
+        dir_path = normalize_path(directory)
+        
+        if not os.path.exists(dir_path):
+            return {"success": False, "error": f"Directory not found: {dir_path}"}
+        
+        if not os.path.isdir(dir_path):
+            return {"success": False, "error": f"Not a directory: {dir_path}"}
+        
+        if not pattern:
+            return {"success": False, "error": "Pattern must not be empty"}
+        
+        try:
+            content_search.compile_pattern(pattern, literal, case_sensitive)
+        except Exception as e:
+            return {"success": False, "error": f"Invalid regular expression: {str(e)}"}
+        
+        # max_age=0: always check folder mtimes, so files changed by other programs are searched too
+        candidates = _get_file_index().search(dir_path, file_pattern or "*", recursive=recursive,
+                                              max_results=SEARCH_MAX_FILES, max_age=0,
+                                              exclude_dirs=SEARCH_IGNORE_DIRS)
+        files = [(path, size) for path, size, _ in candidates["files"]]
+        total_bytes = sum(size for _, size in files)
+        
+        chunks = content_search.plan_chunks(files)
+        args = (pattern, literal, case_sensitive, max(context_lines, 0))
+        chunk_results, stopped = _run_search_chunks(chunks, args, max_matches,
+                                                    parallel=total_bytes >= SEARCH_INLINE_BYTES)
+        
+        matches = content_search.number_matches(chunk_results)
+        truncated = stopped or len(matches) > max_matches
+        matches = matches[:max_matches]
+        if not context_lines:
+            for match in matches:
+                del match["before"], match["after"]
+        
+        skipped_binary = {chunk["path"] for chunk in chunk_results if chunk["binary"]}
+        unreadable = {chunk["path"] for chunk in chunk_results if chunk["error"]}
+        result = {
+            "success": True,
+            "pattern": pattern,
+            "directory": dir_path,
+            "files_searched": len(files) - len(skipped_binary) - len(unreadable),
+            "bytes_searched": total_bytes,
+            "match_count": len(matches),
+            "matches": matches
+        }
+        if skipped_binary:
+            result["binary_files_skipped"] = len(skipped_binary)
+        if unreadable:
+            result["unreadable_files"] = len(unreadable)
+        if truncated:
+            result["truncated"] = True
+        if candidates["total"] > SEARCH_MAX_FILES:
+            result["files_not_searched"] = candidates["total"] - SEARCH_MAX_FILES
+        return result
+    except Exception as e:
+        return {"success": False, "error": f"Error searching file contents: {str(e)}"}
+
+
 # ============================================================
 # LANGCHAIN TOOL WRAPPERS FOR LANGGRAPH
 # ============================================================
@@ -498,13 +1017,21 @@ def create_file_tool(filename: str = "new_file.txt", path: str = ".", content: s
 
 
 @tool
-def read_file_tool(file_path: str) -> str:
-    """Read content from a file.
+def read_file_tool(file_path: str, start_line: int = 0, end_line: int = 0, head: int = 0, tail: int = 0,
+                   byte_offset: int = -1, byte_length: int = 0) -> str:
+    """Read content from a file, or part of it. Large files are returned in pieces marked "truncated";
+    continue with start_line=next_line, or byte_offset=next_byte_offset when the cut fell inside a long line.
     
     Args:
         file_path: Full path to the file to read
+        start_line: First line to read, 1-based (default: from the start)
+        end_line: Last line to read, inclusive (default: to the end)
+        head: Read only the first N lines
+        tail: Read only the last N lines, e.g. of a log file
+        byte_offset: Read raw bytes starting at this offset instead of lines
+        byte_length: Number of bytes to read from byte_offset
     """
-    result = read_file(file_path)
+    result = read_file(file_path, start_line, end_line, head, tail, byte_offset, byte_length)
     return json.dumps(result)
 
 
@@ -569,13 +1096,23 @@ def delete_folder_tool(folder_path: str, recursive: bool = False) -> str:
 
 
 @tool
-def list_directory_tool(path: str = ".") -> str:
-    """List all files and folders in a directory.
+def list_directory_tool(path: str = ".", pattern: str = "", type_filter: str = "all", sort_by: str = "name",
+                        descending: bool = False, limit: int = 100, cursor: str = "",
+                        summary_only: bool = False) -> str:
+    """List files and folders in a directory, folders first, one page at a time.
     
     Args:
         path: Directory path to list (default: current directory)
+        pattern: Only names matching this pattern, e.g. "*.csv" (default: all)
+        type_filter: "all", "files" or "folders" (default: "all")
+        sort_by: "name", "size", "modified" or "extension" (default: "name")
+        descending: Reverse the sort order, e.g. largest or newest first (default: False)
+        limit: Maximum entries to return (default: 100)
+        cursor: next_cursor from a previous call, to get the next page
+        summary_only: Only return counts, total size and common extensions (default: False)
     """
-    result = list_directory(path)
+    result = list_directory(path, pattern, type_filter, sort_by, descending, 0, limit, cursor,
+                            summary_only=summary_only)
     return json.dumps(result)
 
 
@@ -604,15 +1141,19 @@ def move_folder_tool(source_path: str, destination_path: str) -> str:
 
 
 @tool
-def search_files_tool(directory: str = ".", pattern: str = "*", recursive: bool = False) -> str:
-    """Search for files matching a pattern.
+def search_files_tool(directory: str = ".", pattern: str = "*", recursive: bool = False, name_contains: str = "",
+                      extension: str = "", max_results: int = 200) -> str:
+    """Search for files by name. All given filters must match.
     
     Args:
         directory: Directory to search in (default: current directory)
         pattern: File pattern to match (e.g., "*.txt", "data*") (default: "*")
         recursive: Whether to search subdirectories (default: False)
+        name_contains: Text the file name must contain, case-insensitive (e.g., "invoice")
+        extension: File extension, e.g. "pdf" (default: any)
+        max_results: Maximum files to return (default: 200)
     """
-    result = search_files(directory, pattern, recursive)
+    result = search_files(directory, pattern, recursive, name_contains, extension, max_results)
     return json.dumps(result)
 
 
@@ -651,13 +1192,36 @@ def get_file_size_tool(file_path: str) -> str:
 
 
 @tool
-def get_folder_size_tool(folder_path: str) -> str:
-    """Calculate total size of all files in a folder.
+def get_folder_size_tool(folder_path: str, breakdown: int = 10, refresh: bool = False) -> str:
+    """Calculate total size of all files in a folder, with its largest subfolders.
     
     Args:
         folder_path: Full path to the folder
+        breakdown: How many of the largest subfolders to list (default: 10, 0 for none)
+        refresh: Re-scan every folder, e.g. after files were edited in place (default: False)
+    """
+    result = get_folder_size(folder_path, breakdown, refresh)
+    return json.dumps(result)
+
+
+@tool
+def search_file_contents_tool(pattern: str, directory: str = ".", file_pattern: str = "*", literal: bool = False,
+                              case_sensitive: bool = False, context_lines: int = 1, max_matches: int = 50) -> str:
+    """Search inside files for text or a regular expression (like grep), in a folder and its subfolders.
+    Returns the matching lines with file path, line number and surrounding lines. Binary files and folders
+    such as .git and __pycache__ are skipped.
+    
+    Args:
+        pattern: Regular expression to search for, or plain text with literal=True
+        directory: Folder to search in (default: current directory)
+        file_pattern: Only search files whose name matches, e.g. "*.py" (default: all files)
+        literal: Treat pattern as plain text instead of a regular expression (default: False)
+        case_sensitive: Match letter case exactly (default: False)
+        context_lines: Lines to include before and after each match (default: 1)
+        max_matches: Maximum matching lines to return (default: 50)
     """
-    result = get_folder_size(folder_path)
+    result = search_file_contents(pattern, directory, file_pattern, literal, case_sensitive, context_lines,
+                                  max_matches)
     return json.dumps(result)
 
 
@@ -680,7 +1244,8 @@ LANGCHAIN_TOOLS = [
     copy_file_tool,
     get_file_info_tool,
     get_file_size_tool,
-    get_folder_size_tool
+    get_folder_size_tool,
+    search_file_contents_tool
 ]
 
 
@@ -0,0 +1,225 @@
+"""
+Gmail Request Executor
+Central place where Gmail API requests are executed: token-bucket rate limiting
+sized to Gmail's per-user quota, retries with exponential backoff and jitter,
+and per-method call/quota/latency counters
+"""
+
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from googleapiclient.errors import HttpError
+
+
+# Quota units per method, from https://developers.google.com/gmail/api/reference/quota
+QUOTA_UNITS = {
+    'gmail.users.getProfile': 1,
+    'gmail.users.labels.list': 1,
+    'gmail.users.labels.get': 1,
+    'gmail.users.labels.create': 5,
+    'gmail.users.history.list': 2,
+    'gmail.users.messages.list': 5,
+    'gmail.users.messages.get': 5,
+    'gmail.users.messages.modify': 5,
+    'gmail.users.messages.trash': 5,
+    'gmail.users.messages.attachments.get': 5,
+    'gmail.users.messages.batchModify': 50,
+    'gmail.users.messages.send': 100,
+    'gmail.users.threads.get': 10,
+    'gmail.users.threads.list': 10,
+}
+DEFAULT_QUOTA_UNITS = 5
+
+# Gmail allows 15,000 quota units per user per minute
+QUOTA_UNITS_PER_SECOND = 250
+
+MAX_RETRIES = 5
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 32
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded')
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until enough tokens are available"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float) -> float:
+        """Take tokens from the bucket, returning the seconds spent waiting"""
+        tokens = min(tokens, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+_bucket = TokenBucket(QUOTA_UNITS_PER_SECOND, QUOTA_UNITS_PER_SECOND)
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _method_id(request) -> str:
+    return getattr(request, 'methodId', None) or 'unknown'
+
+
+def _quota_units(request) -> int:
+    return QUOTA_UNITS.get(_method_id(request), DEFAULT_QUOTA_UNITS)
+
+
+def _record(method: str, quota_units: int = 0, latency: Optional[float] = None, calls: int = 1,
+            errors: int = 0, retries: int = 0, throttled: float = 0.0) -> None:
+    """Add to a method's counters; latency is None for sub-requests timed as part of a batch"""
+    with _stats_lock:
+        entry = _stats.setdefault(method, {
+            'calls': 0, 'quota_units': 0, 'errors': 0, 'retries': 0, 'timed_calls': 0,
+            'total_latency': 0.0, 'max_latency': 0.0, 'throttled_seconds': 0.0
+        })
+        entry['calls'] += calls
+        entry['quota_units'] += quota_units
+        entry['errors'] += errors
+        entry['retries'] += retries
+        entry['throttled_seconds'] += throttled
+        if latency is not None:
+            entry['timed_calls'] += 1
+            entry['total_latency'] += latency
+            entry['max_latency'] = max(entry['max_latency'], latency)
+
+
+def is_retryable(error: Exception, idempotent: bool = True) -> bool:
+    """
+    True for errors worth retrying: rate limits, server errors and dropped connections.
+    A non-idempotent request (messages.send) that failed with a server error or a dropped
+    connection may still have been carried out, so it is only retried on rate limits,
+    which Gmail answers before doing anything.
+    """
+    if isinstance(error, HttpError):
+        status = error.resp.status
+        if status == 429:
+            return True
+        if status == 403:
+            content = error.content.decode('utf-8', errors='replace') if isinstance(error.content, bytes) else str(error.content)
+            return any(reason in content for reason in RATE_LIMIT_REASONS)
+        return idempotent and status in RETRYABLE_STATUSES
+    return idempotent and isinstance(error, (ConnectionError, TimeoutError))
+
+
+def _backoff_delay(attempt: int, error: Optional[Exception] = None) -> float:
+    """Exponential backoff with full jitter, honouring a Retry-After header when present"""
+    if isinstance(error, HttpError):
+        retry_after = error.resp.get('retry-after')
+        if retry_after and str(retry_after).isdigit():
+            return min(float(retry_after), BACKOFF_MAX_SECONDS)
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+
+def execute_request(request, http=None, idempotent: bool = True, max_retries: int = MAX_RETRIES):
+    """
+    Execute one Gmail API request under the quota limiter, retrying transient failures.
+    Pass idempotent=False for requests that must not run twice (see is_retryable), and
+    max_retries=0 when the caller retries the request itself.
+    """
+    method = _method_id(request)
+    units = _quota_units(request)
+
+    for attempt in range(max_retries + 1):
+        throttled = _bucket.acquire(units)
+        started = time.monotonic()
+        try:
+            response = request.execute(http=http)
+            _record(method, units, time.monotonic() - started, throttled=throttled)
+            return response
+        except Exception as e:
+            retry = attempt < max_retries and is_retryable(e, idempotent)
+            _record(method, units, time.monotonic() - started, errors=1, retries=int(retry), throttled=throttled)
+            if not retry:
+                raise
+            time.sleep(_backoff_delay(attempt, e))
+
+
+def execute_batch(service, requests: Dict[str, object], http=None) -> Tuple[Dict[str, Dict], Dict[str, Exception]]:
+    """
+    Execute requests (keyed by request id) as Gmail batch calls, under the quota limiter.
+    Sub-requests that fail with transient errors are retried in a smaller batch.
+    Returns (responses, errors), both keyed by request id.
+    """
+    responses = {}
+    errors = {}
+    pending = dict(requests)
+
+    for attempt in range(MAX_RETRIES + 1):
+        failed = {}
+
+        def _on_response(request_id, response, exception):
+            if exception is None:
+                responses[request_id] = response
+            else:
+                failed[request_id] = exception
+
+        batch = service.new_batch_http_request(callback=_on_response)
+        for request_id, request in pending.items():
+            batch.add(request, request_id=request_id)
+
+        throttled = _bucket.acquire(sum(_quota_units(request) for request in pending.values()))
+        started = time.monotonic()
+        try:
+            batch.execute(http=http)
+        except Exception as e:
+            # the whole batch call failed; every sub-request shares that error
+            if attempt == MAX_RETRIES or not is_retryable(e):
+                raise
+            failed = {request_id: e for request_id in pending}
+        _record('batch', latency=time.monotonic() - started, throttled=throttled)
+
+        for request_id, request in pending.items():
+            error = failed.get(request_id)
+            _record(_method_id(request), _quota_units(request), errors=int(error is not None))
+
+        retryable = {
+            request_id: pending[request_id]
+            for request_id, error in failed.items()
+            if attempt < MAX_RETRIES and is_retryable(error)
+        }
+        errors.update({request_id: error for request_id, error in failed.items() if request_id not in retryable})
+        if not retryable:
+            break
+
+        for request_id in retryable:
+            _record(_method_id(retryable[request_id]), calls=0, retries=1)
+        time.sleep(_backoff_delay(attempt, failed[next(iter(retryable))]))
+        pending = retryable
+
+    return responses, errors
+
+
+def get_api_stats() -> Dict[str, Dict]:
+    """Per-method counters: calls, quota units, errors, retries, latency and time spent throttled"""
+    with _stats_lock:
+        stats = {}
+        for method, entry in _stats.items():
+            stats[method] = dict(entry)
+            if entry['timed_calls']:
+                stats[method]['avg_latency'] = entry['total_latency'] / entry['timed_calls']
+        return stats
+
+
+def reset_api_stats() -> None:
+    """Clear all per-method counters"""
+    with _stats_lock:
+        _stats.clear()
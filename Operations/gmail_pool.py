@@ -0,0 +1,164 @@
+"""
+Gmail Service Pool
+Bounded pool of Gmail API service objects, each with its own keep-alive HTTP
+connection. A service is leased to one thread at a time (googleapiclient's HTTP
+objects are not thread-safe) and returned for reuse by other threads afterwards.
+"""
+
+import select
+import threading
+import time
+import weakref
+from typing import Callable, Dict, List, Optional
+
+
+class _Entry:
+    """A pooled service and its bookkeeping"""
+
+    __slots__ = ('service', 'created', 'last_used', 'uses')
+
+    def __init__(self, service):
+        self.service = service
+        self.created = time.monotonic()
+        self.last_used = self.created
+        self.uses = 0
+
+
+def _connections(service) -> Optional[Dict]:
+    """httplib2 connection cache of a service (AuthorizedHttp -> httplib2.Http), if it has one"""
+    http = getattr(getattr(service, '_http', None), 'http', None)
+    return getattr(http, 'connections', None)
+
+
+def drop_dead_connections(service) -> int:
+    """
+    Health check: close keep-alive sockets the server has already closed. An idle
+    socket that polls readable has either hit EOF or holds stray bytes; reusing it
+    would fail or stall the next request. Returns how many were dropped.
+    """
+    connections = _connections(service)
+    if not connections:
+        return 0
+    dropped = 0
+    for key, conn in list(connections.items()):
+        sock = getattr(conn, 'sock', None)
+        if sock is None:
+            continue
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+        except (OSError, ValueError):
+            readable = [sock]
+        if readable:
+            conn.close()
+            connections.pop(key, None)
+            dropped += 1
+    return dropped
+
+
+def close_service(service) -> None:
+    """Close every connection a service holds"""
+    for conn in list((_connections(service) or {}).values()):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+class PooledService:
+    """A lease on a pooled service; release() (or garbage collection) hands it back"""
+
+    def __init__(self, pool: 'ServicePool', entry: _Entry):
+        self.service = entry.service
+        self._finalizer = weakref.finalize(self, pool._release, entry)
+
+    def release(self) -> None:
+        self._finalizer()
+
+
+class ServicePool:
+    """
+    Thread-safe pool of at most max_size services built by factory(). acquire() reuses
+    the most recently returned service, builds a new one while under the limit, and
+    otherwise waits up to acquire_timeout seconds. Services idle for longer than
+    max_idle_seconds are closed and dropped.
+    """
+
+    def __init__(self, factory: Callable[[], object], max_size: int = 32, max_idle_seconds: float = 300,
+                 acquire_timeout: float = 60):
+        self.factory = factory
+        self.max_size = max_size
+        self.max_idle_seconds = max_idle_seconds
+        self.acquire_timeout = acquire_timeout
+
+        self._idle: List[_Entry] = []  # most recently used last
+        self._in_use = 0
+        self._available = threading.Condition(threading.Lock())
+        self._stats = {'created': 0, 'reused': 0, 'expired': 0, 'dead_connections': 0, 'waits': 0, 'wait_seconds': 0.0}
+
+    def _expire_idle(self) -> List[_Entry]:
+        """Caller holds the lock: remove idle entries past max_idle_seconds and return them"""
+        cutoff = time.monotonic() - self.max_idle_seconds
+        expired = [entry for entry in self._idle if entry.last_used < cutoff]
+        if expired:
+            self._idle = [entry for entry in self._idle if entry.last_used >= cutoff]
+            self._stats['expired'] += len(expired)
+        return expired
+
+    def acquire(self) -> PooledService:
+        deadline = time.monotonic() + self.acquire_timeout
+        waited = False
+        with self._available:
+            expired = self._expire_idle()
+            while not self._idle and self._in_use >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"All {self.max_size} pooled Gmail services are busy")
+                if not waited:
+                    self._stats['waits'] += 1
+                    waited = True
+                started = time.monotonic()
+                self._available.wait(remaining)
+                self._stats['wait_seconds'] += time.monotonic() - started
+            entry = self._idle.pop() if self._idle else None
+            self._in_use += 1
+
+        for old in expired:
+            close_service(old.service)
+
+        try:
+            if entry is None:
+                entry = _Entry(self.factory())
+                with self._available:
+                    self._stats['created'] += 1
+            else:
+                dropped = drop_dead_connections(entry.service)
+                with self._available:
+                    self._stats['reused'] += 1
+                    self._stats['dead_connections'] += dropped
+        except Exception:
+            with self._available:
+                self._in_use -= 1
+                self._available.notify()
+            raise
+
+        entry.uses += 1
+        return PooledService(self, entry)
+
+    def _release(self, entry: _Entry) -> None:
+        entry.last_used = time.monotonic()
+        with self._available:
+            self._in_use -= 1
+            self._idle.append(entry)
+            self._available.notify()
+
+    def close(self) -> None:
+        """Close and drop every idle service"""
+        with self._available:
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            close_service(entry.service)
+
+    def stats(self) -> Dict:
+        with self._available:
+            return {'size': len(self._idle) + self._in_use, 'in_use': self._in_use, 'idle': len(self._idle),
+                    'max_size': self.max_size, **self._stats}
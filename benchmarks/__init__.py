@@ -0,0 +1 @@
+"""Benchmarks for the agent tools, run against in-process fakes"""
@@ -0,0 +1,248 @@
+"""
+Email Tools Benchmark
+Runs every tool in Operations.email_operations.LANGCHAIN_TOOLS against the
+in-process FakeGmailService and reports p50/p99 latency and Gmail API usage.
+
+    python -m benchmarks.bench_email_tools
+    python -m benchmarks.bench_email_tools --latency 0.05 --failure-rate 0.01 --output results.json
+    python -m benchmarks.bench_email_tools --baseline results.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+# keep benchmark runs away from the user's real index and metadata store
+_scratch_dir = tempfile.mkdtemp(prefix='email_bench_')
+os.environ['EMAIL_INDEX_PATH'] = os.path.join(_scratch_dir, 'email_index.db')
+os.environ['EMAIL_OUTBOX_PATH'] = os.path.join(_scratch_dir, 'outbox.db')
+os.environ.pop('EMAIL_STORE_PATH', None)
+
+from Operations import email_operations
+from Operations import gmail_executor
+from benchmarks.fake_gmail import FakeGmailService
+
+
+class BenchContext:
+    """Hands out message, thread and sender ids from the fake mailbox for tool arguments"""
+
+    def __init__(self, fake: FakeGmailService, seed: int = 11):
+        self.fake = fake
+        self.rng = random.Random(seed)
+        self.inbox = fake._matching_ids('in:inbox')[:5000]
+        self.with_attachments = fake._matching_ids('has:attachment')[:500]
+        self.save_path = os.path.join(_scratch_dir, 'attachments')
+
+    def message_id(self) -> str:
+        return self.rng.choice(self.inbox)
+
+    def message_ids(self, count: int) -> List[str]:
+        return self.rng.sample(self.inbox, count)
+
+    def thread_id(self) -> str:
+        return self.fake._messages[self.message_id()].thread_id
+
+    def attachment_message_id(self) -> str:
+        return self.rng.choice(self.with_attachments)
+
+    @staticmethod
+    def date(days_ago: int) -> str:
+        return (datetime.now() - timedelta(days=days_ago)).strftime('%Y/%m/%d')
+
+
+# Arguments for one call of each tool; every tool in LANGCHAIN_TOOLS needs a case
+CASES: Dict[str, Callable[[BenchContext], Dict]] = {
+    'send_email_tool': lambda ctx: {'to': 'bob@example.com', 'subject': 'Benchmark', 'body': 'Hello from the benchmark'},
+    'send_bulk_email_tool': lambda ctx: {'recipients': [f"user{i}@example.com" for i in range(40)],
+                                         'subject': 'Benchmark update', 'body': 'Hello everyone'},
+    'get_send_status_tool': lambda ctx: {},
+    'get_recent_emails_tool': lambda ctx: {'max_results': 10},
+    'search_emails_tool': lambda ctx: {'query': 'budget', 'max_results': 50},
+    'search_local_emails_tool': lambda ctx: {'query': 'budget review', 'max_results': 20},
+    'count_emails_tool': lambda ctx: {'query': 'is:unread'},
+    'get_unread_emails_tool': lambda ctx: {'max_results': 20},
+    'get_emails_from_sender_tool': lambda ctx: {'sender_email': 'alice', 'max_results': 50},
+    'get_emails_by_date_range_tool': lambda ctx: {'start_date': ctx.date(3), 'end_date': ctx.date(1), 'max_results': 50},
+    'get_email_body_tool': lambda ctx: {'message_id': ctx.message_id()},
+    'get_email_thread_tool': lambda ctx: {'thread_id': ctx.thread_id(), 'max_tokens': 2000},
+    'reply_to_email_tool': lambda ctx: {'message_id': ctx.message_id(), 'reply_body': 'Thanks, noted.'},
+    'mark_as_read_tool': lambda ctx: {'message_id': ctx.message_id()},
+    'mark_as_unread_tool': lambda ctx: {'message_id': ctx.message_id()},
+    'delete_email_tool': lambda ctx: {'message_id': ctx.message_id()},
+    'get_inbox_stats_tool': lambda ctx: {},
+    'count_emails_from_sender_tool': lambda ctx: {'sender_email': 'carol'},
+    'count_emails_in_date_range_tool': lambda ctx: {'start_date': ctx.date(30), 'end_date': ctx.date(1)},
+    'get_emails_with_attachments_tool': lambda ctx: {'max_results': 20},
+    'get_starred_emails_tool': lambda ctx: {'max_results': 20},
+    'add_label_to_email_tool': lambda ctx: {'message_id': ctx.message_id(), 'label': 'Benchmark', 'create_if_missing': True},
+    'get_email_labels_tool': lambda ctx: {},
+    'bulk_mark_as_read_tool': lambda ctx: {'message_ids': ctx.message_ids(50)},
+    'bulk_mark_as_unread_tool': lambda ctx: {'message_ids': ctx.message_ids(50)},
+    'bulk_delete_emails_tool': lambda ctx: {'message_ids': ctx.message_ids(20)},
+    'bulk_add_label_tool': lambda ctx: {'label': 'important', 'query': 'from:dave', 'max_messages': 500},
+    'list_email_attachments_tool': lambda ctx: {'message_id': ctx.attachment_message_id()},
+    'download_email_attachments_tool': lambda ctx: {'message_id': ctx.attachment_message_id(),
+                                                    'save_path': ctx.save_path, 'overwrite': True},
+    'export_emails_tool': lambda ctx: {'query': 'in:inbox', 'path': os.path.join(_scratch_dir, 'export.jsonl'),
+                                       'max_messages': 500, 'overwrite': True},
+}
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.4999)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _drain_outbox() -> None:
+    """Wait for queued sends, so their API calls are counted against the tool that queued them"""
+    outbox = email_operations._email_outbox
+    if outbox is not None:
+        outbox.wait_idle(timeout=60)
+
+
+def _clear_caches() -> None:
+    """Drop in-process caches so every call pays its full cost (--cold)"""
+    email_operations._fetch_email_body.cache_clear()
+    email_operations._label_cache['expires'] = 0.0
+    email_operations._mailbox_changed()
+
+
+def bench_tool(tool, ctx: BenchContext, iterations: int, warmup: int, cold: bool) -> Dict:
+    """Time repeated calls of one tool; API counts are per call, including background sends"""
+    for _ in range(warmup):
+        tool.invoke(CASES[tool.name](ctx))
+        _drain_outbox()
+
+    fake = ctx.fake
+    fake.reset_counters()
+    gmail_executor.reset_api_stats()
+    latencies = []
+    failures = 0
+    for _ in range(iterations):
+        if cold:
+            _clear_caches()
+        args = CASES[tool.name](ctx)
+        started = time.perf_counter()
+        result = json.loads(tool.invoke(args))
+        latencies.append(time.perf_counter() - started)
+        _drain_outbox()
+        failures += int(isinstance(result, dict) and result.get('success') is False)
+
+    api_calls = sum(count for method, count in fake.calls.items() if method != 'batch')
+    quota_units = sum(entry['quota_units'] for entry in gmail_executor.get_api_stats().values())
+    return {
+        'p50_ms': round(_percentile(latencies, 50) * 1000, 3),
+        'p99_ms': round(_percentile(latencies, 99) * 1000, 3),
+        'api_calls': round(api_calls / iterations, 2),
+        'round_trips': round(fake.round_trips / iterations, 2),
+        'quota_units': round(quota_units / iterations, 2),
+        'failures': failures
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Regressions against a baseline: p50 or API calls more than `tolerance` (fraction) worse"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        for metric in ('p50_ms', 'api_calls'):
+            # 1ms / 1 call of slack so near-zero baselines don't flag noise
+            slack = 1.0
+            if result[metric] > before[metric] * (1 + tolerance) + slack:
+                regressions.append(f"{name}: {metric} {before[metric]} -> {result[metric]}")
+    return regressions
+
+
+def run(message_count: int = 100_000, iterations: int = 20, warmup: int = 1, latency: float = 0.0,
+        failure_rate: float = 0.0, cold: bool = False, quota: bool = True,
+        only: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """Benchmark every email tool against a fresh fake mailbox"""
+    started = time.perf_counter()
+    fake = FakeGmailService(message_count=message_count, latency=latency, failure_rate=failure_rate)
+    print(f"Generated {message_count:,} synthetic messages in {time.perf_counter() - started:.1f}s")
+    email_operations.set_gmail_service(fake)
+    if not quota:
+        gmail_executor._bucket = gmail_executor.TokenBucket(1e12, 1e12)
+
+    ctx = BenchContext(fake)
+    results = {}
+    for tool in email_operations.LANGCHAIN_TOOLS:
+        if only and tool.name not in only:
+            continue
+        if tool.name not in CASES:
+            print(f"⚠️ No benchmark case for {tool.name}")
+            results[tool.name] = None
+            continue
+        results[tool.name] = bench_tool(tool, ctx, iterations, warmup, cold)
+    return results
+
+
+def print_table(results: Dict[str, Dict]) -> None:
+    header = f"{'tool':<36}{'p50 ms':>10}{'p99 ms':>10}{'calls':>8}{'trips':>8}{'quota':>8}{'fail':>6}"
+    print(header)
+    print('-' * len(header))
+    for name, result in results.items():
+        if result is None:
+            print(f"{name:<36}{'no case':>10}")
+            continue
+        print(f"{name:<36}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['api_calls']:>8}"
+              f"{result['round_trips']:>8}{result['quota_units']:>8}{result['failures']:>6}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Gmail tools against an in-process fake")
+    parser.add_argument('--messages', type=int, default=100_000, help="synthetic mailbox size")
+    parser.add_argument('--iterations', type=int, default=20, help="timed calls per tool")
+    parser.add_argument('--warmup', type=int, default=1, help="untimed calls per tool before timing")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every HTTP round trip")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="fraction of API calls failing with 503")
+    parser.add_argument('--cold', action='store_true', help="clear in-process caches before every call")
+    parser.add_argument('--no-quota', action='store_true', help="disable the Gmail quota rate limiter")
+    parser.add_argument('--tool', action='append', help="only benchmark this tool (repeatable)")
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--baseline', help="JSON results to compare against; exits 1 on regressions")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed regression as a fraction")
+    args = parser.parse_args(argv)
+
+    results = run(
+        message_count=args.messages,
+        iterations=args.iterations,
+        warmup=args.warmup,
+        latency=args.latency,
+        failure_rate=args.failure_rate,
+        cold=args.cold,
+        quota=not args.no_quota,
+        only=args.tool
+    )
+    print_table(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    missing = [name for name, result in results.items() if result is None]
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare({k: v for k, v in results.items() if v}, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"❌ {regression}")
+        if regressions:
+            return 1
+        print("✅ No regressions against baseline")
+    return 1 if missing else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
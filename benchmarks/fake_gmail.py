@@ -0,0 +1,490 @@
+"""
+Fake Gmail Service
+In-process stand-in for the googleapiclient Gmail resource used by
+Operations/email_operations.py, backed by a synthetic mailbox. Supports
+configurable per-round-trip latency, failure injection and API call counting.
+
+    from benchmarks.fake_gmail import FakeGmailService
+    from Operations import email_functions
+    email_functions.set_gmail_service(FakeGmailService(message_count=100_000))
+"""
+
+import base64
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import formatdate
+from typing import Callable, Dict, List, Optional
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+
+SYSTEM_LABELS = ['INBOX', 'UNREAD', 'STARRED', 'IMPORTANT', 'SENT', 'DRAFT', 'SPAM', 'TRASH']
+SENDER_NAMES = ['alice', 'bob', 'carol', 'dave', 'erin', 'frank', 'grace', 'heidi', 'ivan', 'judy']
+DOMAINS = ['example.com', 'corp.example', 'news.example', 'shop.example', 'mail.example']
+TOPICS = ['budget', 'meeting', 'invoice', 'release', 'newsletter', 'travel', 'report', 'hiring',
+          'roadmap', 'security', 'offsite', 'contract', 'feedback', 'launch', 'incident']
+WORDS = ['please', 'review', 'attached', 'numbers', 'schedule', 'update', 'thanks', 'team',
+         'quarter', 'deadline', 'notes', 'draft', 'final', 'question', 'follow', 'agenda']
+
+
+def _http_error(status: int, reason: str = 'backendError') -> HttpError:
+    content = ('{"error": {"code": %d, "errors": [{"reason": "%s"}]}}' % (status, reason)).encode('utf-8')
+    return HttpError(httplib2.Response({'status': status}), content)
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode('ascii')
+
+
+class _Message:
+    """Compact synthetic message; resources are rendered on demand"""
+
+    __slots__ = ('id', 'thread_id', 'internal_date', 'sender', 'recipient', 'subject', 'topic',
+                 'labels', 'attachment_size', 'html_only', 'raw')
+
+    def __init__(self, message_id, thread_id, internal_date, sender, recipient, subject, topic,
+                 labels, attachment_size=0, html_only=False, raw=None):
+        self.id = message_id
+        self.thread_id = thread_id
+        self.internal_date = internal_date
+        self.sender = sender
+        self.recipient = recipient
+        self.subject = subject
+        self.topic = topic
+        self.labels = labels
+        self.attachment_size = attachment_size
+        self.html_only = html_only
+        self.raw = raw
+
+    @property
+    def body(self) -> str:
+        rng = random.Random(self.id)
+        sentences = [
+            ' '.join(rng.choice(WORDS) for _ in range(rng.randint(6, 14))).capitalize() + '.'
+            for _ in range(rng.randint(3, 12))
+        ]
+        return f"Hi,\n\nAbout the {self.topic}: " + '\n'.join(sentences) + f"\n\n{self.sender.split('@')[0]}"
+
+    @property
+    def snippet(self) -> str:
+        return ' '.join(self.body.split())[:100]
+
+
+class FakeRequest:
+    """Mimics googleapiclient.http.HttpRequest: methodId plus execute()"""
+
+    def __init__(self, service: 'FakeGmailService', method_id: str, handler: Callable[[], Dict]):
+        self.service = service
+        self.methodId = method_id
+        self._handler = handler
+
+    def _run(self) -> Dict:
+        self.service._count(self.methodId)
+        self.service._maybe_fail()
+        return self._handler()
+
+    def execute(self, http=None, num_retries=0):
+        self.service._round_trip()
+        return self._run()
+
+
+class FakeBatch:
+    """Mimics BatchHttpRequest: one round trip for all added requests"""
+
+    def __init__(self, service: 'FakeGmailService', callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request: FakeRequest, callback=None, request_id=None):
+        if len(self.requests) >= 100:
+            raise ValueError("Exceeded the maximum calls (100) in a single batch request.")
+        self.requests.append((request_id or str(len(self.requests)), request, callback or self.callback))
+
+    def execute(self, http=None):
+        self.service._count('batch')
+        self.service._round_trip()
+        for request_id, request, callback in self.requests:
+            try:
+                response, exception = request._run(), None
+            except HttpError as e:
+                response, exception = None, e
+            if callback:
+                callback(request_id, response, exception)
+
+
+class _Resource:
+    """Attribute bag so fake.users().messages().get(...) reads like the real client"""
+
+    def __init__(self, **methods):
+        self.__dict__.update(methods)
+
+
+class FakeGmailService:
+    """In-process fake of the Gmail users.messages/labels/threads/history surface"""
+
+    def __init__(self, message_count: int = 100_000, latency: float = 0.0, failure_rate: float = 0.0,
+                 seed: int = 7):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        # calls counts every API method invoked (batch sub-requests included);
+        # round_trips counts HTTP requests, so a whole batch is one
+        self.calls = Counter()
+        self.round_trips = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._messages: Dict[str, _Message] = {}
+        self._order: List[str] = []  # newest first
+        self._threads: Dict[str, List[str]] = {}
+        self._query_cache: Dict[str, List[str]] = {}
+        self._user_labels = {}
+        self._history = []
+        self._history_id = 1000
+        self._next_id = 0
+        self._generate(message_count)
+
+    # ---------- instrumentation ----------
+
+    def _count(self, method_id: str) -> None:
+        with self._lock:
+            self.calls[method_id] += 1
+
+    def _round_trip(self) -> None:
+        with self._lock:
+            self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _maybe_fail(self) -> None:
+        if self.failure_rate and self._rng.random() < self.failure_rate:
+            raise _http_error(503)
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self.round_trips = 0
+
+    # ---------- synthetic mailbox ----------
+
+    def _new_id(self) -> str:
+        self._next_id += 1
+        return format(0x18c0000000000000 + self._next_id, 'x')
+
+    def _generate(self, count: int) -> None:
+        rng = random.Random(count)
+        now_ms = int(time.time() * 1000)
+        thread_id = None
+        for i in range(count):
+            message_id = self._new_id()
+            if thread_id is None or rng.random() > 0.3:
+                thread_id = message_id
+            name = rng.choice(SENDER_NAMES)
+            topic = rng.choice(TOPICS)
+            labels = set()
+            roll = rng.random()
+            if roll < 0.02:
+                labels.add('SPAM')
+            elif roll < 0.05:
+                labels.add('TRASH')
+            elif roll < 0.15:
+                labels.add('SENT')
+            else:
+                labels.add('INBOX')
+            if rng.random() < 0.3:
+                labels.add('UNREAD')
+            if rng.random() < 0.05:
+                labels.add('STARRED')
+            self._messages[message_id] = _Message(
+                message_id=message_id,
+                thread_id=thread_id,
+                internal_date=now_ms - i * 60_000,
+                sender=f"{name}@{rng.choice(DOMAINS)}",
+                recipient='me@example.com',
+                subject=f"{topic.capitalize()} {rng.choice(WORDS)} #{i}",
+                topic=topic,
+                labels=labels,
+                attachment_size=rng.randint(10_000, 2_000_000) if rng.random() < 0.1 else 0,
+                html_only=rng.random() < 0.2
+            )
+            self._order.append(message_id)
+            self._threads.setdefault(thread_id, []).append(message_id)
+
+    # ---------- queries ----------
+
+    def _compile(self, q: str, include_spam_trash: bool) -> Callable[[_Message], bool]:
+        predicates = []
+        mentions_spam_trash = include_spam_trash
+        for token in (q or '').split():
+            negate = token.startswith('-')
+            term = token[1:] if negate else token
+            lowered = term.lower()
+            op, _, value = lowered.partition(':')
+            if op == 'is' and value == 'read':
+                pred = (lambda m: 'UNREAD' not in m.labels)
+            elif op in ('is', 'in', 'label'):
+                label = {'unread': 'UNREAD', 'starred': 'STARRED', 'important': 'IMPORTANT',
+                         'inbox': 'INBOX', 'sent': 'SENT', 'drafts': 'DRAFT', 'spam': 'SPAM',
+                         'trash': 'TRASH'}.get(value, value.upper())
+                label = self._user_labels.get(value, {}).get('id', label)
+                mentions_spam_trash = mentions_spam_trash or label in ('SPAM', 'TRASH')
+                pred = (lambda m, label=label: label in m.labels)
+            elif op == 'from':
+                pred = (lambda m, value=value: value in m.sender)
+            elif op == 'to':
+                pred = (lambda m, value=value: value in m.recipient)
+            elif op == 'subject':
+                pred = (lambda m, value=value: value in m.subject.lower())
+            elif op == 'has' and value == 'attachment':
+                pred = (lambda m: m.attachment_size > 0)
+            elif op in ('after', 'before'):
+                parts = [int(p) for p in value.replace('-', '/').split('/')]
+                millis = int(time.mktime((parts[0], parts[1], parts[2], 0, 0, 0, 0, 0, -1)) * 1000)
+                if op == 'after':
+                    pred = (lambda m, millis=millis: m.internal_date >= millis)
+                else:
+                    pred = (lambda m, millis=millis: m.internal_date < millis)
+            else:
+                pred = (lambda m, value=lowered: value in m.subject.lower() or value == m.topic)
+            predicates.append((lambda m, p=pred: not p(m)) if negate else pred)
+        if not mentions_spam_trash:
+            predicates.append(lambda m: not ({'SPAM', 'TRASH'} & m.labels))
+        return lambda m: all(pred(m) for pred in predicates)
+
+    def _matching_ids(self, q: str, include_spam_trash: bool = False) -> List[str]:
+        key = f"{include_spam_trash}|{q}"
+        with self._lock:
+            if key not in self._query_cache:
+                match = self._compile(q, include_spam_trash)
+                self._query_cache[key] = [mid for mid in self._order if match(self._messages[mid])]
+            return self._query_cache[key]
+
+    def _changed(self, message_id: str, kind: str, **extra) -> None:
+        self._query_cache.clear()
+        self._history_id += 1
+        self._history.append({'id': str(self._history_id), kind: [{'message': {'id': message_id}, **extra}]})
+
+    def _get(self, message_id: str) -> _Message:
+        message = self._messages.get(message_id)
+        if message is None:
+            raise _http_error(404, 'notFound')
+        return message
+
+    # ---------- resource rendering ----------
+
+    def _headers(self, m: _Message, names: Optional[List[str]] = None) -> List[Dict]:
+        headers = [
+            {'name': 'From', 'value': m.sender},
+            {'name': 'To', 'value': m.recipient},
+            {'name': 'Subject', 'value': m.subject},
+            {'name': 'Date', 'value': formatdate(m.internal_date / 1000, localtime=True)},
+            {'name': 'Message-ID', 'value': f"<{m.id}@fake.example>"},
+        ]
+        return [h for h in headers if names is None or h['name'] in names]
+
+    def _payload(self, m: _Message) -> Dict:
+        body = m.body
+        if m.html_only:
+            html = '<html><body>' + ''.join(f'<p>{line}</p>' for line in body.split('\n')) + '</body></html>'
+            text_part = {'partId': '0', 'mimeType': 'text/html', 'filename': '',
+                         'body': {'size': len(html), 'data': _b64(html.encode('utf-8'))}}
+        else:
+            text_part = {'partId': '0', 'mimeType': 'text/plain', 'filename': '',
+                         'body': {'size': len(body), 'data': _b64(body.encode('utf-8'))}}
+        payload = {'mimeType': 'multipart/mixed', 'headers': self._headers(m), 'body': {'size': 0},
+                   'parts': [{'partId': '0', 'mimeType': 'multipart/alternative', 'parts': [text_part]}]}
+        if m.attachment_size:
+            payload['parts'].append({
+                'partId': '1', 'mimeType': 'application/pdf', 'filename': f"{m.topic}-report.pdf",
+                'body': {'size': m.attachment_size, 'attachmentId': f"att-{m.id}"}
+            })
+        return payload
+
+    def _resource(self, m: _Message, format: str = 'full', metadataHeaders=None) -> Dict:
+        resource = {'id': m.id, 'threadId': m.thread_id, 'labelIds': sorted(m.labels),
+                    'snippet': m.snippet, 'internalDate': str(m.internal_date),
+                    'historyId': str(self._history_id), 'sizeEstimate': 2000 + m.attachment_size}
+        if format == 'metadata':
+            resource['payload'] = {'headers': self._headers(m, metadataHeaders)}
+        elif format == 'raw':
+            headers = ''.join(f"{h['name']}: {h['value']}\r\n" for h in self._headers(m))
+            resource['raw'] = _b64((headers + '\r\n' + m.body).encode('utf-8'))
+        elif format != 'minimal':
+            resource['payload'] = self._payload(m)
+        return resource
+
+    # ---------- API surface ----------
+
+    def new_batch_http_request(self, callback=None) -> FakeBatch:
+        return FakeBatch(self, callback)
+
+    def users(self) -> _Resource:
+        return _Resource(
+            messages=self._messages_resource,
+            labels=self._labels_resource,
+            threads=self._threads_resource,
+            history=self._history_resource,
+            getProfile=self._get_profile
+        )
+
+    def _request(self, method: str, handler: Callable[[], Dict]) -> FakeRequest:
+        return FakeRequest(self, f"gmail.users.{method}", handler)
+
+    def _get_profile(self, userId='me', **kwargs):
+        def handler():
+            with self._lock:
+                return {'emailAddress': 'me@example.com', 'messagesTotal': len(self._messages),
+                        'threadsTotal': len({m.thread_id for m in self._messages.values()}),
+                        'historyId': str(self._history_id)}
+        return self._request('getProfile', handler)
+
+    def _messages_resource(self) -> _Resource:
+        return _Resource(
+            list=self._messages_list,
+            get=self._messages_get,
+            send=self._messages_send,
+            modify=self._messages_modify,
+            batchModify=self._messages_batch_modify,
+            trash=self._messages_trash,
+            attachments=lambda: _Resource(get=self._attachments_get)
+        )
+
+    def _messages_list(self, userId='me', q='', maxResults=100, pageToken=None, includeSpamTrash=False,
+                       labelIds=None, **kwargs):
+        def handler():
+            ids = self._matching_ids(q, includeSpamTrash)
+            if labelIds:
+                ids = [mid for mid in ids if set(labelIds) <= self._messages[mid].labels]
+            start = int(pageToken or 0)
+            page = ids[start:start + min(maxResults, 500)]
+            result = {'resultSizeEstimate': len(ids)}
+            if page:
+                result['messages'] = [{'id': mid, 'threadId': self._messages[mid].thread_id} for mid in page]
+            if start + len(page) < len(ids):
+                result['nextPageToken'] = str(start + len(page))
+            return result
+        return self._request('messages.list', handler)
+
+    def _messages_get(self, userId='me', id=None, format='full', metadataHeaders=None, fields=None, **kwargs):
+        return self._request('messages.get', lambda: self._resource(self._get(id), format, metadataHeaders))
+
+    def _messages_send(self, userId='me', body=None, **kwargs):
+        def handler():
+            with self._lock:
+                message_id = self._new_id()
+                raw = base64.urlsafe_b64decode(body['raw'] + '=' * (-len(body['raw']) % 4)).decode('utf-8', 'replace')
+                subject = next((line[9:] for line in raw.splitlines() if line.lower().startswith('subject: ')), '')
+                to = next((line[4:] for line in raw.splitlines() if line.lower().startswith('to: ')), '')
+                self._messages[message_id] = _Message(
+                    message_id, body.get('threadId') or message_id, int(time.time() * 1000),
+                    'me@example.com', to, subject, 'sent', {'SENT'}, raw=raw
+                )
+                self._order.insert(0, message_id)
+                self._threads.setdefault(self._messages[message_id].thread_id, []).append(message_id)
+                self._changed(message_id, 'messagesAdded')
+                return {'id': message_id, 'threadId': self._messages[message_id].thread_id, 'labelIds': ['SENT']}
+        return self._request('messages.send', handler)
+
+    def _apply_labels(self, message_id: str, add: List[str], remove: List[str]) -> _Message:
+        m = self._get(message_id)
+        m.labels |= set(add or [])
+        m.labels -= set(remove or [])
+        if add:
+            self._changed(message_id, 'labelsAdded', labelIds=add)
+        if remove:
+            self._changed(message_id, 'labelsRemoved', labelIds=remove)
+        return m
+
+    def _messages_modify(self, userId='me', id=None, body=None, **kwargs):
+        def handler():
+            with self._lock:
+                m = self._apply_labels(id, body.get('addLabelIds'), body.get('removeLabelIds'))
+                return {'id': m.id, 'threadId': m.thread_id, 'labelIds': sorted(m.labels)}
+        return self._request('messages.modify', handler)
+
+    def _messages_batch_modify(self, userId='me', body=None, **kwargs):
+        def handler():
+            if len(body['ids']) > 1000:
+                raise _http_error(400, 'invalidArgument')
+            with self._lock:
+                for message_id in body['ids']:
+                    if message_id in self._messages:
+                        self._apply_labels(message_id, body.get('addLabelIds'), body.get('removeLabelIds'))
+            return {}
+        return self._request('messages.batchModify', handler)
+
+    def _messages_trash(self, userId='me', id=None, **kwargs):
+        def handler():
+            with self._lock:
+                m = self._apply_labels(id, ['TRASH'], ['INBOX'])
+                return {'id': m.id, 'labelIds': sorted(m.labels)}
+        return self._request('messages.trash', handler)
+
+    def _attachments_get(self, userId='me', messageId=None, id=None, **kwargs):
+        def handler():
+            m = self._get(messageId)
+            if not m.attachment_size or id != f"att-{m.id}":
+                raise _http_error(404, 'notFound')
+            data = random.Random(m.id).randbytes(m.attachment_size)
+            return {'size': m.attachment_size, 'data': _b64(data)}
+        return self._request('messages.attachments.get', handler)
+
+    def _labels_resource(self) -> _Resource:
+        return _Resource(list=self._labels_list, get=self._labels_get, create=self._labels_create)
+
+    def _label_counts(self, label_id: str) -> Dict:
+        with self._lock:
+            tagged = [m for m in self._messages.values() if label_id in m.labels]
+            return {'messagesTotal': len(tagged), 'messagesUnread': sum('UNREAD' in m.labels for m in tagged)}
+
+    def _labels_list(self, userId='me', **kwargs):
+        def handler():
+            labels = [{'id': label, 'name': label, 'type': 'system'} for label in SYSTEM_LABELS]
+            labels += [dict(label) for label in self._user_labels.values()]
+            return {'labels': labels}
+        return self._request('labels.list', handler)
+
+    def _labels_get(self, userId='me', id=None, **kwargs):
+        def handler():
+            label = next((label for label in self._user_labels.values() if label['id'] == id), None)
+            if label is None and id not in SYSTEM_LABELS:
+                raise _http_error(404, 'notFound')
+            label = dict(label) if label else {'id': id, 'name': id, 'type': 'system'}
+            label.update(self._label_counts(id))
+            return label
+        return self._request('labels.get', handler)
+
+    def _labels_create(self, userId='me', body=None, **kwargs):
+        def handler():
+            with self._lock:
+                if body['name'].lower() in self._user_labels:
+                    raise _http_error(409, 'duplicate')
+                label = {'id': f"Label_{len(self._user_labels) + 1}", 'name': body['name'], 'type': 'user'}
+                self._user_labels[body['name'].lower()] = label
+                return dict(label)
+        return self._request('labels.create', handler)
+
+    def _threads_resource(self) -> _Resource:
+        return _Resource(get=self._threads_get)
+
+    def _threads_get(self, userId='me', id=None, format='full', metadataHeaders=None, **kwargs):
+        def handler():
+            with self._lock:
+                members = [self._messages[mid] for mid in self._threads.get(id, [])]
+            if not members:
+                raise _http_error(404, 'notFound')
+            members.sort(key=lambda m: m.internal_date)
+            return {'id': id, 'messages': [self._resource(m, format, metadataHeaders) for m in members]}
+        return self._request('threads.get', handler)
+
+    def _history_resource(self) -> _Resource:
+        return _Resource(list=self._history_list)
+
+    def _history_list(self, userId='me', startHistoryId=None, pageToken=None, **kwargs):
+        def handler():
+            with self._lock:
+                records = [record for record in self._history if int(record['id']) > int(startHistoryId)]
+                return {'history': records, 'historyId': str(self._history_id)}
+        return self._request('history.list', handler)
@@ -0,0 +1,34 @@
+"""
+Shared test setup: point every on-disk store at a temporary directory before the
+Operations modules read their environment variables, and run the email tools
+against benchmarks.fake_gmail.FakeGmailService instead of Gmail.
+"""
+
+import os
+import tempfile
+
+_scratch_dir = tempfile.mkdtemp(prefix='agent_tests_')
+os.environ['FILE_INDEX_PATH'] = os.path.join(_scratch_dir, 'file_index.db')
+os.environ['EMAIL_INDEX_PATH'] = os.path.join(_scratch_dir, 'email_index.db')
+os.environ['EMAIL_OUTBOX_PATH'] = ''
+os.environ.pop('EMAIL_STORE_PATH', None)
+
+import pytest
+
+from benchmarks.fake_gmail import FakeGmailService
+
+
+@pytest.fixture
+def fake_gmail(monkeypatch):
+    """A small FakeGmailService installed as the Gmail service, with the quota limiter out of the way"""
+    from Operations import email_operations, gmail_executor
+
+    service = FakeGmailService(message_count=300, seed=7)
+    monkeypatch.setattr(gmail_executor, '_bucket', gmail_executor.TokenBucket(1e12, 1e12))
+    email_operations.set_gmail_service(service)
+    email_operations._mailbox_changed()
+    email_operations._label_cache.update(labels=None, expires=0.0)
+    yield service
+    email_operations.set_gmail_service(None)
+    email_operations._mailbox_changed()
+    email_operations._label_cache.update(labels=None, expires=0.0)
@@ -0,0 +1,47 @@
+"""Async access to the email functions: AsyncEmailClient and the tools' ainvoke"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from Operations import email_operations
+
+
+LATENCY = 0.2
+
+
+@pytest.fixture
+def slow_gmail(fake_gmail):
+    fake_gmail.latency = LATENCY
+    return fake_gmail
+
+
+def _timed(coroutine):
+    started = time.monotonic()
+    result = asyncio.run(coroutine)
+    return result, time.monotonic() - started
+
+
+def test_tool_ainvoke_calls_run_concurrently(slow_gmail):
+    ids = slow_gmail._matching_ids('in:inbox')[:4]
+
+    async def read_all():
+        return await asyncio.gather(*(
+            email_operations.get_email_body_tool.ainvoke({'message_id': message_id}) for message_id in ids
+        ))
+    results, elapsed = _timed(read_all())
+
+    assert [json.loads(result)['success'] for result in results] == [True] * 4
+    # four reads of one round trip each; run one after another they would take 4 * LATENCY
+    assert elapsed < 2.5 * LATENCY
+
+
+def test_async_client_matches_the_blocking_functions(fake_gmail):
+    client = email_operations.AsyncEmailClient()
+    result, _ = _timed(client.search_emails('is:unread', max_results=5))
+    assert result == email_operations.search_emails('is:unread', max_results=5)
+
+    with pytest.raises(AttributeError):
+        client.not_an_email_function
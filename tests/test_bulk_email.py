@@ -0,0 +1,41 @@
+"""Bulk label changes through messages.batchModify"""
+
+import math
+
+from Operations import email_operations
+
+
+def test_query_is_applied_in_batch_modify_chunks(fake_gmail, monkeypatch):
+    monkeypatch.setattr(email_operations, 'BATCH_MODIFY_SIZE', 25)
+    unread = list(fake_gmail._matching_ids('is:unread'))
+    fake_gmail.reset_counters()
+
+    result = email_operations.bulk_mark_as_read(query='is:unread')
+    assert result['success'] and result['query'] == 'is:unread'
+    assert result['matched_count'] == result['modified_count'] == len(unread)
+    assert fake_gmail.calls['gmail.users.messages.batchModify'] == math.ceil(len(unread) / 25)
+    assert fake_gmail.calls['gmail.users.messages.modify'] == 0
+    assert fake_gmail._matching_ids('is:unread') == []
+
+
+def test_given_ids_are_deduplicated_and_capped(fake_gmail):
+    first, second, third = fake_gmail._matching_ids('in:inbox')[:3]
+
+    result = email_operations.bulk_delete_emails([first, first, second, third], max_messages=2)
+    assert result['matched_count'] == result['modified_count'] == 2
+    assert set(fake_gmail._matching_ids('in:trash')) >= {first, second}
+    assert third not in fake_gmail._matching_ids('in:trash')
+
+
+def test_label_by_name_and_counts_are_refreshed(fake_gmail):
+    assert email_operations.count_emails('label:projects')['count'] == 0
+    ids = fake_gmail._matching_ids('from:alice')[:5]
+
+    result = email_operations.bulk_add_label('Projects', ids, create_if_missing=True)
+    assert result['success'] and result['label_created'] and result['modified_count'] == 5
+    assert email_operations.count_emails('label:projects')['count'] == 5
+
+
+def test_nothing_to_act_on_is_an_error(fake_gmail):
+    result = email_operations.bulk_mark_as_unread()
+    assert not result['success'] and 'query' in result['error']
@@ -0,0 +1,112 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from Operations import content_search
+from Operations import file_operations as fo
+
+
+def _tree(tmp_path):
+    (tmp_path / 'src').mkdir()
+    (tmp_path / '.git').mkdir()
+    (tmp_path / 'src/app.py').write_text('import os\n\ndef main():\n    return API_KEY\n')
+    (tmp_path / '.git/config').write_text('API_KEY in git\n')
+    (tmp_path / 'blob.bin').write_bytes(b'API_KEY\x00\x01')
+    return str(tmp_path)
+
+
+def test_matches_with_line_and_context(tmp_path):
+    root = _tree(tmp_path)
+    result = fo.search_file_contents('api_key', root)
+    assert result['success']
+    assert [(os.path.basename(m['path']), m['line']) for m in result['matches']] == [('app.py', 4)]
+    match = result['matches'][0]
+    assert match['text'] == '    return API_KEY'
+    assert match['before'] == ['def main():'] and match['after'] == []
+    assert result['binary_files_skipped'] == 1
+
+
+def test_literal_case_sensitive_and_invalid_regex(tmp_path):
+    root = _tree(tmp_path)
+    assert fo.search_file_contents('main()', root, literal=True)['match_count'] == 1
+    assert fo.search_file_contents('api_key', root, case_sensitive=True)['match_count'] == 0
+    assert fo.search_file_contents('(', root)['success'] is False
+
+
+def test_ignored_dirs_are_not_crawled(tmp_path):
+    root = _tree(tmp_path)
+    fo.search_file_contents('API_KEY', root)
+    scans, _ = fo._get_file_index().crawl(root, exclude_dirs=fo.SEARCH_IGNORE_DIRS)
+    assert os.path.join(root, '.git') not in scans
+
+
+def test_file_written_by_another_program_is_searched_at_once(tmp_path):
+    root = _tree(tmp_path)
+    assert fo.search_file_contents('needle', root)['match_count'] == 0
+    (tmp_path / 'src/new.txt').write_text('a needle\n')
+    assert fo.search_file_contents('needle', root)['match_count'] == 1
+
+
+def test_matches_never_span_lines(tmp_path):
+    (tmp_path / 'a.py').write_text('x = 1\n\n    return {\n')
+    result = fo.search_file_contents(r'^\s*return \{', str(tmp_path), context_lines=0)
+    assert [m['line'] for m in result['matches']] == [3]
+
+
+def test_chunked_search_numbers_lines_across_chunks(tmp_path):
+    path = tmp_path / 'big.log'
+    path.write_text(''.join(f"line {i} {'hit' if i % 97 == 0 else ''}\n" for i in range(1, 5001)))
+    size = os.path.getsize(path)
+    chunks = content_search.plan_chunks([(str(path), size)], chunk_bytes=1000)
+    assert len(chunks) > 50
+    results = [content_search.search_chunk(p, s, e, 'hit', True, False, 0, 1000) for p, s, e in chunks]
+    assert [m['line'] for m in content_search.number_matches(results)] == list(range(97, 5001, 97))
+
+
+def test_parallel_search_matches_inline(tmp_path, monkeypatch):
+    root = _tree(tmp_path)
+    inline = fo.search_file_contents('API_KEY', root)
+    monkeypatch.setattr(fo, 'SEARCH_INLINE_BYTES', 0)
+    parallel = fo.search_file_contents('API_KEY', root)
+    assert parallel['matches'] == inline['matches']
+
+
+def test_excluded_name_among_root_ancestors(tmp_path):
+    project = tmp_path / 'venv' / 'proj'
+    project.mkdir(parents=True)
+    (project / 'main.py').write_text('needle = 1\n')
+    (project / 'node_modules').mkdir()
+    (project / 'node_modules/dep.js').write_text('needle\n')
+
+    result = fo.search_file_contents('needle', str(project))
+    assert [os.path.basename(m['path']) for m in result['matches']] == ['main.py']
+    assert fo.search_files(str(project), '*.py', recursive=True)['count'] == 1
+
+
+class _EarliestLastPool:
+    """Thread pool whose tasks finish in reverse submission order, like late first chunks"""
+
+    def __init__(self):
+        self._pool = ThreadPoolExecutor(max_workers=64)
+        self._submitted = 0
+
+    def submit(self, fn, *args):
+        delay = max(0.0, 0.2 - 0.003 * self._submitted)
+        self._submitted += 1
+        return self._pool.submit(lambda: (time.sleep(delay), fn(*args))[1])
+
+
+def test_parallel_search_returns_the_first_matches_in_order(tmp_path, monkeypatch):
+    for name in ('a.log', 'b.log'):
+        (tmp_path / name).write_text(''.join(f"line {i} {'hit' if i % 50 == 0 else ''}\n" for i in range(1, 2001)))
+    monkeypatch.setattr(content_search, 'CHUNK_BYTES', 1024)
+
+    serial = fo.search_file_contents('hit', str(tmp_path), context_lines=0, max_matches=30)
+    monkeypatch.setattr(fo, 'SEARCH_INLINE_BYTES', 0)
+    monkeypatch.setattr(fo, '_get_search_pool', _EarliestLastPool)
+    parallel = fo.search_file_contents('hit', str(tmp_path), context_lines=0, max_matches=30)
+
+    expected = [('a.log', line) for line in range(50, 2001, 50)][:30]
+    assert serial['truncated'] and parallel['truncated']
+    assert parallel['matches'] == serial['matches']
+    assert [(os.path.basename(m['path']), m['line']) for m in parallel['matches']] == expected
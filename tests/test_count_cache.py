@@ -0,0 +1,47 @@
+"""count_emails: LRU+TTL cache keyed by normalised query"""
+
+from Operations import email_operations
+
+
+def _stats_delta(before):
+    after = email_operations.get_count_cache_stats()
+    return {key: after[key] - before[key] for key in ('hits', 'misses', 'expired', 'evictions', 'invalidations')}
+
+
+def test_equivalent_queries_share_one_api_call(fake_gmail):
+    before = email_operations.get_count_cache_stats()
+    fake_gmail.reset_counters()
+
+    first = email_operations.count_emails('From:alice is:unread')
+    again = email_operations.count_emails('is:unread   from:alice')
+    assert first['count'] == again['count'] == len(fake_gmail._matching_ids('from:alice is:unread'))
+    assert again['cached'] and again['query'] == 'is:unread   from:alice'
+    assert fake_gmail.calls['gmail.users.messages.list'] == 1
+
+    email_operations.count_emails_in_date_range('2024-01-01', '2024-02-01')
+    assert email_operations.count_emails('before:2024/02/01 after:2024/01/01')['cached']
+    assert fake_gmail.calls['gmail.users.messages.list'] == 2
+    assert _stats_delta(before) == {'hits': 2, 'misses': 2, 'expired': 0, 'evictions': 0, 'invalidations': 0}
+
+
+def test_mutations_invalidate_counts(fake_gmail):
+    unread = email_operations.count_emails('is:unread')['count']
+    email_operations.mark_as_read(fake_gmail._matching_ids('is:unread')[0])
+
+    result = email_operations.count_emails('is:unread')
+    assert not result.get('cached')
+    assert result['count'] == unread - 1
+
+
+def test_entries_expire_and_are_evicted(fake_gmail, monkeypatch):
+    monkeypatch.setattr(email_operations, 'COUNT_CACHE_SIZE', 2)
+    before = email_operations.get_count_cache_stats()
+    for query in ('from:alice', 'from:bob', 'from:carol', 'from:carol'):
+        email_operations.count_emails(query)
+    assert not email_operations.count_emails('from:alice').get('cached')
+    assert _stats_delta(before)['evictions'] == 2
+
+    monkeypatch.setattr(email_operations, 'COUNT_CACHE_TTL', 0)
+    email_operations.count_emails('from:dave')
+    assert not email_operations.count_emails('from:dave').get('cached')
+    assert _stats_delta(before)['expired'] == 1
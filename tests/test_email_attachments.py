@@ -0,0 +1,74 @@
+"""Attachment listing and streaming downloads"""
+
+import os
+import random
+
+import pytest
+
+from benchmarks.fake_gmail import _http_error
+from Operations import email_operations
+
+
+@pytest.fixture
+def with_attachment(fake_gmail):
+    message_id = fake_gmail._matching_ids('has:attachment')[0]
+    return fake_gmail._messages[message_id]
+
+
+def _attachment_bytes(message):
+    return random.Random(message.id).randbytes(message.attachment_size)
+
+
+def test_attachments_are_listed(fake_gmail, with_attachment):
+    result = email_operations.list_email_attachments(with_attachment.id)
+    assert result['count'] == 1
+    attachment = result['attachments'][0]
+    assert attachment['filename'] == f"{with_attachment.topic}-report.pdf"
+    assert attachment['size'] == with_attachment.attachment_size
+
+
+def test_download_is_decoded_in_chunks_to_disk(fake_gmail, with_attachment, tmp_path, monkeypatch):
+    monkeypatch.setattr(email_operations, 'DECODE_CHUNK_CHARS', 4096)
+    result = email_operations.download_email_attachments(with_attachment.id, str(tmp_path))
+
+    assert result['success'] and result['count'] == 1
+    path = result['files'][0]['path']
+    assert os.path.dirname(path) == str(tmp_path)
+    with open(path, 'rb') as f:
+        assert f.read() == _attachment_bytes(with_attachment)
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+
+
+def test_existing_files_are_kept_unless_overwritten(fake_gmail, with_attachment, tmp_path):
+    names = []
+    for overwrite in (False, False, True):
+        result = email_operations.download_email_attachments(with_attachment.id, str(tmp_path), overwrite=overwrite)
+        names.append(result['files'][0]['filename'])
+    name = f"{with_attachment.topic}-report.pdf"
+    assert names == [name, f"{with_attachment.topic}-report (1).pdf", name]
+
+
+def test_sender_chosen_names_stay_in_the_target_folder(fake_gmail, with_attachment, tmp_path, monkeypatch):
+    payload = fake_gmail._payload
+
+    def traversing_payload(message):
+        rendered = payload(message)
+        rendered['parts'][-1]['filename'] = '../../evil.pdf'
+        return rendered
+    monkeypatch.setattr(fake_gmail, '_payload', traversing_payload)
+
+    result = email_operations.download_email_attachments(with_attachment.id, str(tmp_path / 'inbox'))
+    assert result['files'][0]['path'] == str(tmp_path / 'inbox' / 'evil.pdf')
+
+
+def test_failed_download_leaves_no_partial_file(fake_gmail, with_attachment, tmp_path, monkeypatch):
+    def failing_get(**kwargs):
+        def fail():
+            raise _http_error(404, 'notFound')
+        return fake_gmail._request('messages.attachments.get', fail)
+    monkeypatch.setattr(fake_gmail, '_attachments_get', failing_get)
+
+    result = email_operations.download_email_attachments(with_attachment.id, str(tmp_path))
+    assert not result['success'] and result['count'] == 0
+    assert len(result['failed']) == 1
+    assert os.listdir(tmp_path) == []
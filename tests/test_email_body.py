@@ -0,0 +1,57 @@
+"""get_email_body: one fetch per message, nested MIME parts and HTML-only mail"""
+
+import base64
+
+import pytest
+
+from Operations import email_operations
+
+
+@pytest.fixture(autouse=True)
+def empty_body_cache():
+    email_operations._fetch_email_body.cache_clear()
+    yield
+    email_operations._fetch_email_body.cache_clear()
+
+
+def _part(mime_type, text, filename=''):
+    data = base64.urlsafe_b64encode(text.encode('utf-8')).decode('ascii')
+    return {'mimeType': mime_type, 'filename': filename, 'body': {'data': data}}
+
+
+def test_body_and_metadata_come_from_one_cached_fetch(fake_gmail):
+    message_id = next(mid for mid in fake_gmail._order if not fake_gmail._messages[mid].html_only)
+    fake_gmail.reset_counters()
+
+    first = email_operations.get_email_body(message_id)
+    again = email_operations.get_email_body(message_id)
+    assert first == again
+    assert first['body'] == fake_gmail._messages[message_id].body
+    assert first['metadata']['subject'] == fake_gmail._messages[message_id].subject
+    assert fake_gmail.round_trips == 1
+
+
+def test_html_only_email_is_returned_as_text(fake_gmail):
+    message_id = next(mid for mid in fake_gmail._order if fake_gmail._messages[mid].html_only)
+    body = email_operations.get_email_body(message_id)['body']
+    assert '<' not in body
+    assert body.splitlines()[0] == 'Hi,'
+
+
+def test_plain_text_is_found_in_nested_parts():
+    payload = {'mimeType': 'multipart/mixed', 'parts': [
+        _part('text/plain', 'not the body', filename='notes.txt'),
+        {'mimeType': 'multipart/related', 'parts': [
+            {'mimeType': 'multipart/alternative', 'parts': [
+                _part('text/html', '<p>html version</p>'),
+                _part('text/plain', 'plain version'),
+            ]},
+        ]},
+    ]}
+    assert email_operations._extract_body(payload) == 'plain version'
+
+
+def test_html_conversion_drops_scripts_and_keeps_paragraphs():
+    html = ('<html><head><style>p {color: red}</style></head><body>'
+            '<script>track()</script><p>Hello &amp; welcome</p><div>Second   line</div></body></html>')
+    assert email_operations._html_to_text(html) == 'Hello & welcome\n\nSecond line'
@@ -0,0 +1,67 @@
+"""Details of list-style results: batched, metadata-only fetches"""
+
+from benchmarks.fake_gmail import _http_error
+from Operations import email_operations
+
+
+def test_list_tools_fetch_details_in_batches_in_order(fake_gmail):
+    fake_gmail.reset_counters()
+    result = email_operations.search_emails('in:inbox', max_results=100)
+
+    assert [email['id'] for email in result['emails']] == fake_gmail._matching_ids('in:inbox')[:100]
+    assert fake_gmail.calls['gmail.users.messages.get'] == 100
+    assert fake_gmail.calls['batch'] == 100 // email_operations.BATCH_SIZE
+    assert fake_gmail.round_trips == fake_gmail.calls['batch'] + fake_gmail.calls['gmail.users.messages.list']
+
+
+def test_failed_message_is_reported_without_failing_the_call(fake_gmail, monkeypatch):
+    ids = fake_gmail._matching_ids('is:unread')[:10]
+    broken = ids[3]
+    messages_get = fake_gmail._messages_get
+
+    def get_or_fail(userId='me', id=None, **kwargs):
+        if id != broken:
+            return messages_get(userId=userId, id=id, **kwargs)
+
+        def fail():
+            raise _http_error(404, 'notFound')
+        return fake_gmail._request('messages.get', fail)
+    monkeypatch.setattr(fake_gmail, '_messages_get', get_or_fail)
+
+    result = email_operations.get_unread_emails(10)
+    assert result['success']
+    assert [email['id'] for email in result['emails']] == ids[:3] + ids[4:]
+    assert [failure['id'] for failure in result['failed']] == [broken]
+
+
+def _record_get_formats(fake_gmail, monkeypatch):
+    requested = []
+    messages_get = fake_gmail._messages_get
+
+    def recording_get(**kwargs):
+        requested.append(kwargs)
+        return messages_get(**kwargs)
+    monkeypatch.setattr(fake_gmail, '_messages_get', recording_get)
+    return requested
+
+
+def test_list_tools_request_only_the_headers_they_read(fake_gmail, monkeypatch):
+    requested = _record_get_formats(fake_gmail, monkeypatch)
+    result = email_operations.get_recent_emails(5)
+
+    assert len(requested) == 5
+    for kwargs in requested:
+        assert kwargs['format'] == 'metadata'
+        assert kwargs['metadataHeaders'] == email_operations.METADATA_HEADERS
+        assert 'payload/headers' in kwargs['fields']
+    email = result['emails'][0]
+    assert email['subject'] != 'No Subject' and '@' in email['from']
+
+
+def test_only_the_body_tool_fetches_full_messages(fake_gmail, monkeypatch):
+    email_operations._fetch_email_body.cache_clear()
+    requested = _record_get_formats(fake_gmail, monkeypatch)
+    message_id = fake_gmail._matching_ids('in:inbox')[0]
+    email_operations.get_email_body(message_id)
+
+    assert [kwargs['format'] for kwargs in requested] == ['full']
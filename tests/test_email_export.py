@@ -0,0 +1,63 @@
+"""export_emails: streaming a query's messages to JSONL or mbox"""
+
+import base64
+import json
+import mailbox
+import os
+
+from Operations import email_operations
+
+
+def test_jsonl_export_keeps_query_order_across_pages(fake_gmail, tmp_path, monkeypatch):
+    monkeypatch.setitem(email_operations.EXPORT_BATCH_SIZE, 'jsonl', 3)
+    expected = fake_gmail._matching_ids('from:alice')
+    path = tmp_path / 'alice.jsonl'
+
+    result = email_operations.export_emails('from:alice', str(path))
+    assert result['success'] and result['exported_count'] == len(expected)
+    with open(path, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert [record['id'] for record in records] == expected
+
+    plain = next(r for r in records if not fake_gmail._messages[r['id']].html_only)
+    assert plain['body'] == fake_gmail._messages[plain['id']].body
+    with_attachment = next(r for r in records if fake_gmail._messages[r['id']].attachment_size)
+    assert with_attachment['attachments'][0]['size'] == fake_gmail._messages[with_attachment['id']].attachment_size
+
+
+def test_mbox_export_is_readable_by_the_mailbox_module(fake_gmail, tmp_path):
+    expected = fake_gmail._matching_ids('from:bob')[:12]
+    result = email_operations.export_emails('from:bob', str(tmp_path), export_format='mbox', max_messages=12)
+
+    assert result['success'] and result['exported_count'] == 12
+    assert os.path.dirname(result['file_path']) == str(tmp_path) and result['file_path'].endswith('.mbox')
+    messages = list(mailbox.mbox(result['file_path']))
+    assert [message['Message-ID'] for message in messages] == [f"<{mid}@fake.example>" for mid in expected]
+    assert messages[0]['X-GM-THRID'] == fake_gmail._messages[expected[0]].thread_id
+
+
+def test_mbox_from_lines_are_quoted():
+    raw = b'Subject: quoting\r\n\r\nFrom the top\r\n>From a quote\r\nNot From here\r\n'
+    record = email_operations._mbox_record({
+        'raw': base64.urlsafe_b64encode(raw).decode('ascii'), 'threadId': 't1', 'labelIds': ['INBOX'],
+        'internalDate': '0'
+    })
+    lines = record.split(b'\n')
+    assert lines[0].startswith(b'From MAILER-DAEMON ')
+    assert b'>From the top' in lines and b'>>From a quote' in lines and b'Not From here' in lines
+
+
+def test_existing_file_is_not_replaced(fake_gmail, tmp_path):
+    path = tmp_path / 'export.jsonl'
+    path.write_text('keep me')
+
+    result = email_operations.export_emails('is:starred', str(path))
+    assert not result['success']
+    assert path.read_text() == 'keep me'
+    assert email_operations.export_emails('is:starred', str(path), overwrite=True)['success']
+    assert os.listdir(tmp_path) == ['export.jsonl']
+
+
+def test_unknown_format_is_rejected(fake_gmail, tmp_path):
+    result = email_operations.export_emails('is:starred', str(tmp_path / 'out.csv'), export_format='csv')
+    assert not result['success'] and 'csv' in result['error']
@@ -0,0 +1,56 @@
+"""The local full-text index follows sends, trashing and deletions"""
+
+import pytest
+
+from Operations import email_operations
+from Operations.email_index import EmailIndex
+
+
+@pytest.fixture
+def index(fake_gmail, tmp_path, monkeypatch):
+    index = EmailIndex(str(tmp_path / 'email_index.db'))
+    monkeypatch.setattr(email_operations, '_email_index', index)
+    return index
+
+
+def _indexed(index, email):
+    return email['id'] in {hit['id'] for hit in index.search(email['subject'], 100)['results']}
+
+
+def test_fetched_emails_are_indexed_and_trashed_ones_removed(fake_gmail, index):
+    emails = email_operations.search_emails('in:inbox', max_results=3)['emails']
+    assert all(_indexed(index, email) for email in emails)
+
+    assert email_operations.delete_email(emails[0]['id'])['success']
+    assert email_operations.bulk_delete_emails(message_ids=[emails[1]['id']])['success']
+
+    assert not _indexed(index, emails[0])
+    assert not _indexed(index, emails[1])
+    assert _indexed(index, emails[2])
+
+
+def test_sent_emails_are_indexed(fake_gmail, index):
+    result = email_operations.send_email('bob@example.com', 'Quarterly zeppelin review', 'See you there', queue=False)
+    assert result['success']
+    hits = email_operations.search_local_emails('zeppelin')['results']
+    assert [hit['id'] for hit in hits] == [result['message_id']]
+
+
+def test_history_deletions_are_removed_from_the_index(fake_gmail, index, tmp_path, monkeypatch):
+    monkeypatch.setenv('EMAIL_STORE_PATH', str(tmp_path / 'metadata.db'))
+    monkeypatch.setattr(email_operations, '_email_store', None)
+    store = email_operations._get_email_store()
+    email_operations._backfill_email_store(store)
+
+    email = email_operations.search_emails('in:inbox', max_results=1)['emails'][0]
+    assert _indexed(index, email)
+
+    # deleted permanently somewhere else (another client)
+    with fake_gmail._lock:
+        del fake_gmail._messages[email['id']]
+        fake_gmail._order.remove(email['id'])
+        fake_gmail._changed(email['id'], 'messagesDeleted')
+    store.mark_stale()
+
+    assert email_operations.search_emails('in:inbox', max_results=1)['source'] == 'local_store'
+    assert not _indexed(index, email)
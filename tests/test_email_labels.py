@@ -0,0 +1,47 @@
+"""Label cache and labelling by name"""
+
+from Operations import email_operations
+
+
+def test_labels_are_listed_once_until_refreshed(fake_gmail):
+    fake_gmail.reset_counters()
+    email_operations.get_email_labels()
+    email_operations.get_email_labels()
+    assert fake_gmail.calls['gmail.users.labels.list'] == 1
+    email_operations.get_email_labels(refresh=True)
+    assert fake_gmail.calls['gmail.users.labels.list'] == 2
+
+
+def test_missing_label_is_created_and_applied_in_one_call(fake_gmail):
+    first, second = fake_gmail._matching_ids('in:inbox')[:2]
+    fake_gmail.reset_counters()
+
+    created = email_operations.add_label_to_email(first, 'Receipts', create_if_missing=True)
+    assert created['success'] and created['label_created']
+    assert fake_gmail.calls['gmail.users.labels.create'] == 1
+
+    # the new label is cached, so naming it again needs no label calls at all
+    label_calls = sum(count for method, count in fake_gmail.calls.items() if '.labels.' in method)
+    reused = email_operations.add_label_to_email(second, 'receipts')
+    assert reused['success'] and not reused['label_created']
+    assert reused['label_id'] == created['label_id']
+    assert sum(count for method, count in fake_gmail.calls.items() if '.labels.' in method) == label_calls
+
+    assert fake_gmail._matching_ids('label:receipts') == [first, second]
+
+
+def test_label_created_elsewhere_is_found_by_one_refresh(fake_gmail):
+    message_id = fake_gmail._matching_ids('in:inbox')[0]
+    email_operations.get_email_labels()
+    fake_gmail._labels_create(body={'name': 'Travel plans'}).execute()
+
+    result = email_operations.add_label_to_email(message_id, 'Travel plans')
+    assert result['success'] and not result['label_created']
+
+
+def test_unknown_label_is_reported_with_the_available_ones(fake_gmail):
+    message_id = fake_gmail._matching_ids('in:inbox')[0]
+    result = email_operations.add_label_to_email(message_id, 'No such label')
+    assert not result['success']
+    assert 'STARRED' in result['error']
+    assert fake_gmail.calls['gmail.users.labels.create'] == 0
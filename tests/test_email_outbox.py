@@ -0,0 +1,142 @@
+"""Outbox delivery, retry policy and restart handling"""
+
+import sqlite3
+from functools import partial
+
+import pytest
+
+from benchmarks.fake_gmail import _http_error
+from Operations import email_operations, email_outbox, gmail_executor
+from Operations.email_outbox import EmailOutbox
+from Operations.gmail_executor import is_retryable
+
+
+@pytest.fixture
+def outbox_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(email_outbox, 'RETRY_BASE_SECONDS', 0)
+    return str(tmp_path / 'outbox.db')
+
+
+@pytest.fixture
+def gmail_outbox(fake_gmail, outbox_path, monkeypatch):
+    """The real outbox wiring of email_operations, on a temporary database"""
+    monkeypatch.setenv('EMAIL_OUTBOX_PATH', outbox_path)
+    monkeypatch.setattr(email_operations, '_email_outbox', None)
+    monkeypatch.setattr(email_operations, '_email_outbox_disabled', False)
+    return email_operations._get_email_outbox()
+
+
+def _send_failing_with(service, errors):
+    """Make the next messages.send calls of a FakeGmailService raise errors, in order"""
+    send = service._messages_send
+
+    def failing_send(**kwargs):
+        request = send(**kwargs)
+        if errors:
+            error = errors.pop(0)
+            request.execute = lambda http=None, num_retries=0: (service._count(request.methodId), _raise(error))
+        return request
+    service._messages_send = failing_send
+
+
+def _raise(error):
+    raise error
+
+
+def test_queued_email_is_sent_once(fake_gmail, gmail_outbox):
+    result = email_operations.send_email('bob@example.com', 'Lunch', 'Noon?')
+    assert result['success'] and result['status'] == 'queued'
+    assert gmail_outbox.wait_idle(timeout=10)
+
+    status = email_operations.get_send_status([result['tracking_id'], 'no-such-id'])
+    assert status['not_found'] == ['no-such-id']
+    entry = status['statuses'][0]
+    assert entry['status'] == 'sent' and entry['attempts'] == 1
+    assert fake_gmail.calls['gmail.users.messages.send'] == 1
+
+
+def test_rate_limited_send_is_retried_by_the_outbox_only(fake_gmail, gmail_outbox):
+    _send_failing_with(fake_gmail, [_http_error(429)])
+    tracking_id = email_operations.send_email('bob@example.com', 'Lunch', 'Noon?')['tracking_id']
+    assert gmail_outbox.wait_idle(timeout=10)
+
+    entry = gmail_outbox.status([tracking_id])[tracking_id]
+    assert entry['status'] == 'sent' and entry['attempts'] == 2
+    # one outbox attempt is one send request: the executor does not retry on top
+    assert fake_gmail.calls['gmail.users.messages.send'] == 2
+
+
+@pytest.mark.parametrize('error', [_http_error(503), ConnectionError('reset')])
+def test_ambiguous_send_failure_is_not_retried(fake_gmail, gmail_outbox, error):
+    _send_failing_with(fake_gmail, [error])
+    tracking_id = email_operations.send_email('bob@example.com', 'Lunch', 'Noon?')['tracking_id']
+    assert gmail_outbox.wait_idle(timeout=10)
+
+    entry = gmail_outbox.status([tracking_id])[tracking_id]
+    assert entry['status'] == 'failed' and entry['attempts'] == 1
+    assert fake_gmail.calls['gmail.users.messages.send'] == 1
+
+
+def test_send_interrupted_by_a_restart_is_marked_unknown(outbox_path):
+    delivered = []
+    outbox = EmailOutbox(outbox_path, lambda kind, payload: delivered.append(payload) or {'id': 'x'},
+                         partial(is_retryable, idempotent=False), workers=0)
+    tracking_id = outbox.enqueue('send', {'to': 'bob@example.com', 'subject': 'Hi', 'body': 'Hello'})
+    # simulate a worker that claimed the email and died before Gmail answered
+    with sqlite3.connect(outbox_path) as conn:
+        conn.execute("UPDATE outbox SET status = 'sending', attempts = 1 WHERE id = ?", (tracking_id,))
+
+    reopened = EmailOutbox(outbox_path, lambda kind, payload: delivered.append(payload) or {'id': 'x'},
+                           partial(is_retryable, idempotent=False))
+    assert reopened.wait_idle(timeout=10)
+
+    entry = reopened.status([tracking_id])[tracking_id]
+    assert entry['status'] == 'unknown'
+    assert 'Sent mail' in entry['error']
+    assert reopened.summary()['counts']['unknown'] == 1
+    assert delivered == []
+
+
+def test_failed_read_of_the_replied_to_email_is_retried(fake_gmail, gmail_outbox, monkeypatch):
+    monkeypatch.setattr(gmail_executor.time, 'sleep', lambda seconds: None)
+    original_id = fake_gmail._matching_ids('in:inbox')[0]
+    # more failures than the executor retries, so the outbox sees the error
+    failures = [_http_error(503)] * (gmail_executor.MAX_RETRIES + 1)
+    get = fake_gmail._messages_get
+
+    def flaky_get(**kwargs):
+        request = get(**kwargs)
+        execute = request.execute
+        request.execute = lambda http=None, num_retries=0: _raise(failures.pop(0)) if failures else execute(http)
+        return request
+    fake_gmail._messages_get = flaky_get
+
+    tracking_id = email_operations.reply_to_email(original_id, 'Thanks!')['tracking_id']
+    assert gmail_outbox.wait_idle(timeout=10)
+
+    entry = gmail_outbox.status([tracking_id])[tracking_id]
+    assert entry['status'] == 'sent' and entry['attempts'] == 2
+    assert fake_gmail.calls['gmail.users.messages.send'] == 1
+
+
+def test_emails_queued_by_an_earlier_session_are_sent_when_the_tools_load(fake_gmail, outbox_path, monkeypatch):
+    earlier = EmailOutbox(outbox_path, lambda kind, payload: {'id': 'x'}, is_retryable, workers=0)
+    tracking_id = earlier.enqueue('send', {'to': 'bob@example.com', 'subject': 'Hi', 'body': 'Hello'})
+
+    monkeypatch.setenv('EMAIL_OUTBOX_PATH', outbox_path)
+    monkeypatch.setattr(email_operations, '_email_outbox', None)
+    monkeypatch.setattr(email_operations, '_email_outbox_disabled', False)
+    email_operations._resume_email_outbox()
+
+    outbox = email_operations._email_outbox
+    assert outbox is not None and outbox.wait_idle(timeout=10)
+    assert outbox.status([tracking_id])[tracking_id]['status'] == 'sent'
+    assert fake_gmail.calls['gmail.users.messages.send'] == 1
+
+
+def test_nothing_is_opened_without_an_earlier_outbox(tmp_path, monkeypatch):
+    monkeypatch.setenv('EMAIL_OUTBOX_PATH', str(tmp_path / 'missing.db'))
+    monkeypatch.setattr(email_operations, '_email_outbox', None)
+    monkeypatch.setattr(email_operations, '_email_outbox_disabled', False)
+    email_operations._resume_email_outbox()
+    assert email_operations._email_outbox is None
@@ -0,0 +1,60 @@
+"""Cursor paging of the list tools, with and without a token budget"""
+
+import pytest
+
+from Operations import email_operations
+
+
+def _page_through(query, max_results, max_tokens=0):
+    ids = []
+    cursor = None
+    calls = 0
+    while True:
+        result = email_operations._list_emails(query, max_results, cursor, max_tokens)
+        assert result['success']
+        if max_tokens:
+            assert len(email_operations._to_json(result)) <= max_tokens * email_operations.CHARS_PER_TOKEN
+        ids.extend(email['id'] for email in result['emails'])
+        calls += 1
+        cursor = result.get('next_cursor')
+        if not cursor:
+            return ids, calls
+
+
+@pytest.mark.parametrize('max_results', [1, 7, 100, 250])
+def test_cursor_paging_returns_every_match_once_in_order(fake_gmail, max_results):
+    ids, _ = _page_through('is:unread', max_results)
+    assert ids == fake_gmail._matching_ids('is:unread')
+
+
+@pytest.mark.parametrize('max_tokens', [300, 1500])
+def test_budgeted_paging_fetches_each_email_once(fake_gmail, max_tokens):
+    ids, calls = _page_through('in:inbox', 20, max_tokens)
+    expected = fake_gmail._matching_ids('in:inbox')
+    assert ids == expected
+    assert calls > 1
+    # emails that did not fit are not fetched only to be dropped and fetched again later
+    assert fake_gmail.calls['gmail.users.messages.get'] <= len(expected) + 5
+    assert fake_gmail.calls['gmail.users.messages.list'] < 2 * calls
+
+
+def test_budgeted_result_reports_what_was_left_out(fake_gmail):
+    result = email_operations.get_unread_emails(20, max_tokens=300)
+    assert result['truncated'] and 0 < result['count'] < 20
+    assert result['omitted']['count'] == 20 - result['count']
+    assert result['next_cursor']
+
+
+def test_cursor_from_another_query_is_rejected(fake_gmail):
+    cursor = email_operations._list_emails('is:unread', 5)['next_cursor']
+    with pytest.raises(ValueError):
+        email_operations._list_emails('in:inbox', 5, cursor)
+
+
+def test_store_paging_with_budget(fake_gmail, tmp_path, monkeypatch):
+    monkeypatch.setenv('EMAIL_STORE_PATH', str(tmp_path / 'metadata.db'))
+    monkeypatch.setattr(email_operations, '_email_store', None)
+    email_operations._backfill_email_store(email_operations._get_email_store())
+
+    ids, _ = _page_through('is:unread', 20, 300)
+    assert ids == fake_gmail._matching_ids('is:unread')
@@ -0,0 +1,84 @@
+"""Local metadata store: background backfill and keeping it in sync with mutations"""
+
+import pytest
+
+from Operations import email_operations
+
+
+@pytest.fixture
+def store(fake_gmail, tmp_path, monkeypatch):
+    monkeypatch.setenv('EMAIL_STORE_PATH', str(tmp_path / 'metadata.db'))
+    monkeypatch.setattr(email_operations, '_email_store', None)
+    return email_operations._get_email_store()
+
+
+def _wait_for_backfill():
+    thread = email_operations._email_store_backfill
+    if thread is not None:
+        thread.join(timeout=30)
+
+
+def test_first_read_is_answered_by_the_api_while_the_store_fills(fake_gmail, store):
+    first = email_operations.search_emails('is:unread', max_results=5)
+    assert first['success'] and first.get('source') != 'local_store'
+    _wait_for_backfill()
+    assert store.is_complete
+
+    fake_gmail.reset_counters()
+    second = email_operations.search_emails('is:unread', max_results=5)
+    assert second['source'] == 'local_store'
+    assert [email['id'] for email in second['emails']] == [email['id'] for email in first['emails']]
+    assert fake_gmail.calls['gmail.users.messages.list'] == 0
+
+
+def test_interrupted_backfill_resumes_from_its_checkpoint(fake_gmail, store):
+    pages = []
+    list_messages = fake_gmail._messages_list
+
+    def list_then_fail(**kwargs):
+        pages.append(kwargs.get('pageToken'))
+        if len(pages) == 2:
+            raise ConnectionError('connection lost')
+        return list_messages(**{**kwargs, 'maxResults': 100})
+    fake_gmail._messages_list = list_then_fail
+
+    with pytest.raises(ConnectionError):
+        email_operations._backfill_email_store(store)
+    history_id, page_token = store.backfill_checkpoint()
+    assert history_id is not None and page_token == '100'
+    assert not store.is_complete
+
+    email_operations._backfill_email_store(store)
+    # the second run picked up at the checkpoint instead of starting over
+    assert pages[2] == '100'
+    assert store.is_complete and store.backfill_checkpoint() == (None, None)
+    assert store.count('in:inbox') == len(fake_gmail._matching_ids('in:inbox'))
+
+
+@pytest.fixture
+def filled_store(fake_gmail, store):
+    email_operations._backfill_email_store(store)
+    fake_gmail.reset_counters()
+    return store
+
+
+def test_single_message_changes_update_the_store_in_place(fake_gmail, filled_store):
+    unread = filled_store.search('is:unread', 2)
+    email_operations.mark_as_read(unread[0]['id'])
+    email_operations.delete_email(unread[1]['id'])
+
+    result = email_operations.search_emails('is:unread', max_results=500)
+    assert result['source'] == 'local_store'
+    assert {unread[0]['id'], unread[1]['id']}.isdisjoint(email['id'] for email in result['emails'])
+    assert filled_store.count('is:unread') == len(fake_gmail._matching_ids('is:unread'))
+    # answered without a history sync
+    assert fake_gmail.calls['gmail.users.history.list'] == 0
+
+
+def test_batch_modify_updates_the_store_in_place(fake_gmail, filled_store):
+    result = email_operations.bulk_mark_as_read(query='is:unread')
+    assert result['success'] and result['modified_count'] > 0
+
+    assert filled_store.count('is:unread') == 0
+    assert email_operations.count_emails('is:unread')['count'] == 0
+    assert fake_gmail.calls['gmail.users.history.list'] == 0
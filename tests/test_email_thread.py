@@ -0,0 +1,66 @@
+"""get_email_thread: one request per thread, quoted text stripped, token budget"""
+
+import base64
+
+import pytest
+
+from Operations import email_operations
+
+
+@pytest.fixture
+def thread(fake_gmail):
+    """Id and message ids (oldest first) of a thread with at least three messages"""
+    thread_id, message_ids = next((t, ids) for t, ids in fake_gmail._threads.items() if len(ids) >= 3)
+    return thread_id, sorted(message_ids, key=lambda mid: fake_gmail._messages[mid].internal_date)
+
+
+def _set_bodies(fake_gmail, monkeypatch, bodies):
+    """Serve the given plain-text body for each message id in bodies"""
+    payload = fake_gmail._payload
+
+    def payload_with_body(message):
+        rendered = payload(message)
+        if message.id in bodies:
+            data = base64.urlsafe_b64encode(bodies[message.id].encode('utf-8')).decode('ascii')
+            rendered['parts'][0]['parts'] = [{'mimeType': 'text/plain', 'filename': '', 'body': {'data': data}}]
+        return rendered
+    monkeypatch.setattr(fake_gmail, '_payload', payload_with_body)
+
+
+def test_whole_thread_in_one_request(fake_gmail, thread):
+    thread_id, message_ids = thread
+    fake_gmail.reset_counters()
+
+    result = email_operations.get_email_thread(thread_id)
+    assert fake_gmail.round_trips == 1
+    assert [message['id'] for message in result['messages']] == message_ids
+    assert result['message_count'] == len(message_ids)
+
+
+def test_quoted_history_and_repeated_bodies_are_dropped(fake_gmail, thread, monkeypatch):
+    thread_id, (first, second, third) = thread[0], thread[1][:3]
+    _set_bodies(fake_gmail, monkeypatch, {
+        first: 'Can we move the meeting?',
+        second: 'Sure, Thursday works.\n\nOn Mon, 1 Jan 2024 at 10:00, Alice <\nalice@example.com> wrote:\n'
+                '> Can we move the meeting?',
+        third: '> quoted only\nCan we move the meeting?',
+    })
+
+    messages = email_operations.get_email_thread(thread_id)['messages']
+    assert [message['body'] for message in messages[:3]] == [
+        'Can we move the meeting?', 'Sure, Thursday works.', ''
+    ]
+    assert messages[2]['duplicate_of'] == first
+
+
+def test_token_budget_keeps_the_newest_messages(fake_gmail, thread):
+    thread_id, message_ids = thread
+    full = email_operations.get_email_thread(thread_id)['messages']
+    max_tokens = len(full[-1]['body']) // email_operations.CHARS_PER_TOKEN + 5
+
+    result = email_operations.get_email_thread(thread_id, max_tokens=max_tokens)
+    messages = result['messages']
+    assert messages[-1]['body'] == full[-1]['body'] and not messages[-1].get('truncated')
+    assert messages[-2]['truncated'] and messages[-2]['body'].endswith('…[truncated]')
+    assert all(message['body'] == '' and message['truncated'] for message in messages[:-2])
+    assert result['omitted_bodies'] == len(message_ids) - 2
@@ -0,0 +1,64 @@
+import os
+
+from Operations import file_operations as fo
+
+
+def _tree(tmp_path):
+    for sub in ('a/b', 'a/c'):
+        (tmp_path / sub).mkdir(parents=True)
+    (tmp_path / 'a/b/one.txt').write_text('one')
+    (tmp_path / 'a/c/two.log').write_text('two')
+    return str(tmp_path)
+
+
+def _names(result):
+    return sorted(f['name'] for f in result['files'])
+
+
+def test_search_answers_from_index(tmp_path):
+    root = _tree(tmp_path)
+    assert _names(fo.search_files(root, '*.txt', recursive=True)) == ['one.txt']
+    assert _names(fo.search_files(root, recursive=True, name_contains='TW')) == ['two.log']
+    assert _names(fo.search_files(root, recursive=True, extension='log')) == ['two.log']
+    assert fo.search_files(root, '*.txt')['count'] == 0
+
+
+def test_tool_mutations_are_visible_immediately(tmp_path):
+    root = _tree(tmp_path)
+    assert fo.search_files(root, '*.txt', recursive=True)['count'] == 1
+
+    fo.create_file('new.txt', os.path.join(root, 'a/b'))
+    assert _names(fo.search_files(root, '*.txt', recursive=True)) == ['new.txt', 'one.txt']
+
+    fo.move_file(os.path.join(root, 'a/b/new.txt'), os.path.join(root, 'a/c/moved.txt'))
+    assert _names(fo.search_files(root, '*.txt', recursive=True)) == ['moved.txt', 'one.txt']
+
+    fo.copy_file(os.path.join(root, 'a/c/moved.txt'), os.path.join(root, 'copy.txt'))
+    assert _names(fo.search_files(root, '*.txt', recursive=True)) == ['copy.txt', 'moved.txt', 'one.txt']
+
+    fo.delete_file(os.path.join(root, 'a/b/one.txt'))
+    result = fo.search_files(root, '*.txt', recursive=True)
+    assert _names(result) == ['copy.txt', 'moved.txt']
+    assert result['total_matches'] == 2
+
+    fo.delete_folder(os.path.join(root, 'a/c'), recursive=True)
+    assert _names(fo.search_files(root, '*.txt', recursive=True)) == ['copy.txt']
+
+
+def test_vanished_hits_are_not_counted(tmp_path):
+    root = _tree(tmp_path)
+    assert fo.search_files(root, '*.txt', recursive=True)['count'] == 1
+    # removed behind the tools' back, within FILE_INDEX_MAX_AGE
+    os.remove(os.path.join(root, 'a/b/one.txt'))
+    result = fo.search_files(root, '*.txt', recursive=True)
+    assert result['files'] == [] and result['total_matches'] == 0
+
+
+def test_folder_size_sees_in_place_edits_by_tools(tmp_path):
+    root = _tree(tmp_path)
+    assert fo.get_folder_size(root)['total_size_bytes'] == 6
+    fo.append_to_file(os.path.join(root, 'a/b/one.txt'), 'x' * 10)
+    fo.write_file(os.path.join(root, 'a/c/two.log'), 'y' * 20, overwrite=True)
+    result = fo.get_folder_size(root)
+    assert result['total_size_bytes'] == 33
+    assert result['largest_subfolders'][0]['name'] == 'a'
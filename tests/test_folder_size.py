@@ -0,0 +1,57 @@
+import os
+import time
+
+from Operations import file_operations as fo
+
+
+def _tree(tmp_path):
+    for sub in ('docs/drafts', 'src/pkg', 'src/tests', 'empty'):
+        (tmp_path / sub).mkdir(parents=True)
+    (tmp_path / 'readme.md').write_text('r' * 10)
+    (tmp_path / 'docs/guide.md').write_text('g' * 100)
+    (tmp_path / 'docs/drafts/draft.md').write_text('d' * 50)
+    (tmp_path / 'src/pkg/main.py').write_text('m' * 300)
+    (tmp_path / 'src/tests/test_main.py').write_text('t' * 200)
+    return str(tmp_path)
+
+
+def _settle(root):
+    """Date every folder an hour back, as for a tree nobody is writing to"""
+    an_hour_ago = time.time() - 3600
+    for path, _, _ in os.walk(root):
+        os.utime(path, (an_hour_ago, an_hour_ago))
+
+
+def _walk_size(root):
+    return sum(os.path.getsize(os.path.join(path, name)) for path, _, files in os.walk(root) for name in files)
+
+
+def test_totals_and_breakdown_match_a_walk(tmp_path):
+    root = _tree(tmp_path)
+    result = fo.get_folder_size(root)
+
+    assert result['total_size_bytes'] == _walk_size(root) == 660
+    assert result['file_count'] == 5 and result['folder_count'] == 6
+    assert result['files_directly_inside_bytes'] == 10
+    assert [(child['name'], child['size_bytes']) for child in result['largest_subfolders']] == [
+        ('src', 500), ('docs', 150), ('empty', 0)
+    ]
+    assert result['largest_subfolders'][0]['file_count'] == 2
+    assert 'largest_subfolders' not in fo.get_folder_size(root, breakdown=0)
+
+
+def test_repeat_queries_rescan_only_changed_folders(tmp_path):
+    root = _tree(tmp_path)
+    _settle(root)
+    assert fo.get_folder_size(root)['scanned_folders'] == 7
+
+    again = fo.get_folder_size(root)
+    assert again['scanned_folders'] == 0 and again['cached_folders'] == 7
+
+    # written behind the tools' back: only the folder whose mtime changed is scanned again
+    (tmp_path / 'docs/drafts/second.md').write_text('s' * 40)
+    changed = fo.get_folder_size(root)
+    assert changed['total_size_bytes'] == 700
+    assert changed['scanned_folders'] == 1
+
+    assert fo.get_folder_size(root, refresh=True)['scanned_folders'] == 7
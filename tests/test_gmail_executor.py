@@ -0,0 +1,57 @@
+"""Retry policy of Operations.gmail_executor.execute_request"""
+
+import pytest
+
+from benchmarks.fake_gmail import _http_error
+from Operations import gmail_executor
+
+
+class FlakyRequest:
+    """Request stand-in that raises the queued errors before succeeding"""
+
+    methodId = 'gmail.users.messages.send'
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.executions = 0
+
+    def execute(self, http=None):
+        self.executions += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {'id': 'sent'}
+
+
+@pytest.fixture(autouse=True)
+def no_waiting(monkeypatch):
+    monkeypatch.setattr(gmail_executor, '_bucket', gmail_executor.TokenBucket(1e12, 1e12))
+    monkeypatch.setattr(gmail_executor.time, 'sleep', lambda seconds: None)
+
+
+@pytest.mark.parametrize('error', [_http_error(503), _http_error(500), ConnectionError(), TimeoutError()])
+def test_idempotent_requests_retry_transient_failures(error):
+    request = FlakyRequest(error)
+    assert gmail_executor.execute_request(request) == {'id': 'sent'}
+    assert request.executions == 2
+
+
+@pytest.mark.parametrize('error', [_http_error(503), _http_error(500), ConnectionError(), TimeoutError()])
+def test_non_idempotent_requests_are_not_retried_after_ambiguous_failures(error):
+    request = FlakyRequest(error)
+    with pytest.raises(type(error)):
+        gmail_executor.execute_request(request, idempotent=False)
+    assert request.executions == 1
+
+
+@pytest.mark.parametrize('error', [_http_error(429), _http_error(403, 'userRateLimitExceeded')])
+def test_non_idempotent_requests_retry_rate_limits(error):
+    request = FlakyRequest(error)
+    assert gmail_executor.execute_request(request, idempotent=False) == {'id': 'sent'}
+    assert request.executions == 2
+
+
+def test_other_client_errors_are_never_retried():
+    request = FlakyRequest(_http_error(403, 'insufficientPermissions'))
+    with pytest.raises(Exception):
+        gmail_executor.execute_request(request)
+    assert request.executions == 1
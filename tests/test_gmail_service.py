@@ -0,0 +1,133 @@
+"""Lazy construction of the Gmail service and the pool that shares it across threads"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from benchmarks.fake_gmail import FakeGmailService
+from Operations import email_operations, gmail_executor
+from Operations.gmail_pool import ServicePool
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(code):
+    return subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, capture_output=True, text=True,
+                          check=True).stdout.split()
+
+
+def test_importing_the_tools_does_not_authenticate():
+    assert _run(
+        "import Operations\n"
+        "tools = Operations.ALL_TOOLS\n"
+        "from Operations import email_functions\n"
+        "print(email_functions._credentials is None, email_functions._service_pool is None)"
+    ) == ['True', 'True']
+
+
+def test_light_submodules_do_not_load_the_email_client():
+    assert _run(
+        "import sys\n"
+        "import Operations.content_search\n"
+        "print('Operations.email_operations' in sys.modules, 'langchain_core' in sys.modules)"
+    ) == ['False', 'False']
+
+
+def test_unknown_package_attribute():
+    import Operations
+    with pytest.raises(AttributeError):
+        Operations.no_such_tools
+
+
+@pytest.fixture
+def lazy_service(monkeypatch):
+    """get_gmail_service() with counting stand-ins for OAuth and service construction"""
+    counts = {'credentials': 0, 'services': 0}
+
+    def get_credentials():
+        counts['credentials'] += 1
+        return object()
+
+    def build_service():
+        counts['services'] += 1
+        return FakeGmailService(message_count=20)
+    monkeypatch.setattr(email_operations, '_get_credentials', get_credentials)
+    monkeypatch.setattr(email_operations, '_build_gmail_service', build_service)
+    monkeypatch.setattr(email_operations, '_credentials', None)
+    monkeypatch.setattr(email_operations, '_service_pool', None)
+    monkeypatch.setattr(gmail_executor, '_bucket', gmail_executor.TokenBucket(1e12, 1e12))
+    email_operations.set_gmail_service(None)
+    yield counts
+    email_operations._mailbox_changed()
+
+
+def test_credentials_are_loaded_once_on_first_use(lazy_service):
+    assert lazy_service['credentials'] == 0
+
+    def use_service():
+        with email_operations.gmail_service_scope():
+            email_operations.get_gmail_service()
+    threads = [threading.Thread(target=use_service) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert lazy_service['credentials'] == 1
+    assert 1 <= lazy_service['services'] <= 8
+
+
+def test_tool_calls_return_their_service_to_the_pool(lazy_service):
+    message_id = FakeGmailService(message_count=20)._order[0]
+    for _ in range(3):
+        result = email_operations.mark_as_read_tool.invoke({'message_id': message_id})
+        assert json.loads(result)['success']
+
+    stats = email_operations.get_gmail_pool_stats()
+    assert stats['in_use'] == 0 and stats['idle'] == 1
+    assert stats['created'] == 1 and stats['reused'] == 2
+
+
+def test_threads_in_scope_at_once_get_their_own_service(lazy_service):
+    both_leased = threading.Barrier(2)
+    services = []
+
+    def use_service():
+        with email_operations.gmail_service_scope():
+            services.append(email_operations.get_gmail_service())
+            # a nested scope keeps the same service
+            with email_operations.gmail_service_scope():
+                assert email_operations.get_gmail_service() is services[-1]
+            both_leased.wait(timeout=5)
+    threads = [threading.Thread(target=use_service) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert services[0] is not services[1]
+    assert email_operations.get_gmail_pool_stats()['in_use'] == 0
+
+
+def test_pool_is_bounded_and_reuses_released_services():
+    pool = ServicePool(object, max_size=2, acquire_timeout=0.1)
+    first, second = pool.acquire(), pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+
+    service = first.service
+    first.release()
+    assert pool.acquire().service is service
+    stats = pool.stats()
+    assert stats['created'] == 2 and stats['reused'] == 1 and stats['waits'] == 1
+
+
+def test_idle_services_expire():
+    pool = ServicePool(object, max_idle_seconds=0)
+    pool.acquire().release()
+    pool.acquire()
+    assert pool.stats()['created'] == 2 and pool.stats()['expired'] == 1
@@ -0,0 +1,35 @@
+"""get_inbox_stats: exact counts and its short-lived cache"""
+
+from Operations import email_operations
+
+
+def test_totals_match_gmail_searches(fake_gmail):
+    stats = email_operations.get_inbox_stats(use_cache=False)['stats']
+    assert stats['total_emails'] == len(fake_gmail._matching_ids(''))
+    assert stats['unread_emails'] == len(fake_gmail._matching_ids('is:unread'))
+    assert stats['read_emails'] == stats['total_emails'] - stats['unread_emails']
+    assert stats['emails_in_inbox'] == len(fake_gmail._matching_ids('in:inbox'))
+
+
+def test_cache_is_dropped_by_mutations(fake_gmail):
+    first = email_operations.get_inbox_stats()
+    assert email_operations.get_inbox_stats().get('cached')
+
+    unread_id = fake_gmail._matching_ids('is:unread')[0]
+    email_operations.mark_as_read(unread_id)
+    after = email_operations.get_inbox_stats()
+    assert not after.get('cached')
+    assert after['stats']['unread_emails'] == first['stats']['unread_emails'] - 1
+
+
+def test_stats_fetched_during_a_mutation_are_not_cached(fake_gmail, monkeypatch):
+    execute_batch = email_operations.execute_batch
+
+    def mutate_while_fetching(service, requests, http=None):
+        responses = execute_batch(service, requests, http)
+        email_operations._mailbox_changed()
+        return responses
+    monkeypatch.setattr(email_operations, 'execute_batch', mutate_while_fetching)
+
+    email_operations.get_inbox_stats()
+    assert email_operations._inbox_stats_cache['stats'] is None
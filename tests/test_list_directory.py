@@ -0,0 +1,54 @@
+from Operations.file_operations import list_directory
+
+
+def _tree(tmp_path, files=25, folders=3):
+    for i in range(folders):
+        (tmp_path / f"dir{i}").mkdir()
+    for i in range(files):
+        (tmp_path / f"file{i:02d}.txt").write_text('x' * i)
+    return str(tmp_path)
+
+
+def _names(result):
+    return [item['name'] for item in result['folders'] + result['files']]
+
+
+def test_cursor_pages_cover_every_entry_once(tmp_path):
+    root = _tree(tmp_path)
+    for sort_by in ('name', 'size', 'modified', 'extension'):
+        for descending in (False, True):
+            seen, cursor = [], ''
+            while True:
+                page = list_directory(root, sort_by=sort_by, descending=descending, limit=7, cursor=cursor)
+                assert page['success']
+                seen += _names(page)
+                cursor = page.get('next_cursor')
+                if not cursor:
+                    break
+            assert sorted(seen) == sorted(_names(list_directory(root, limit=100)))
+            assert len(seen) == len(set(seen)) == 28
+
+
+def test_folders_first_and_size_sort(tmp_path):
+    root = _tree(tmp_path)
+    page = list_directory(root, sort_by='size', descending=True, limit=5)
+    assert _names(page) == ['dir2', 'dir1', 'dir0', 'file24.txt', 'file23.txt']
+
+
+def test_cursor_from_another_listing_is_rejected(tmp_path):
+    root = _tree(tmp_path)
+    cursor = list_directory(root, limit=5)['next_cursor']
+    assert list_directory(root, sort_by='size', limit=5, cursor=cursor)['success'] is False
+
+
+def test_invalid_limit_is_reported(tmp_path):
+    root = _tree(tmp_path)
+    result = list_directory(root, limit=0)
+    assert result == {"success": False, "error": "limit must be at least 1 and offset must not be negative"}
+
+
+def test_summary_only(tmp_path):
+    root = _tree(tmp_path, files=4)
+    result = list_directory(root, summary_only=True)
+    assert (result['folder_count'], result['file_count'], result['total_file_size_bytes']) == (3, 4, 6)
+    assert result['top_extensions'] == {'.txt': 4}
@@ -0,0 +1,72 @@
+from Operations.file_operations import read_file
+
+
+def _write(path, text):
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_small_file_is_read_whole(tmp_path):
+    path = _write(tmp_path / 'notes.txt', 'a\nb\nc')
+    result = read_file(path)
+    assert result['success']
+    assert result['content'] == 'a\nb\nc'
+    assert 'truncated' not in result
+
+
+def test_line_range_head_and_tail(tmp_path):
+    path = _write(tmp_path / 'log.txt', ''.join(f"line {i}\n" for i in range(1, 101)))
+    result = read_file(path, start_line=10, end_line=12)
+    assert result['content'] == 'line 10\nline 11\nline 12\n'
+    assert (result['start_line'], result['end_line'], result['total_lines']) == (10, 12, 100)
+    assert read_file(path, head=2)['content'] == 'line 1\nline 2\n'
+    assert read_file(path, tail=2)['content'] == 'line 99\nline 100\n'
+    assert read_file(path, start_line=101)['content'] == ''
+
+
+def test_cap_on_line_boundary_continues_by_line(tmp_path):
+    path = _write(tmp_path / 'log.txt', ''.join(f"line {i}\n" for i in range(1, 101)))
+    result = read_file(path, max_bytes=50)
+    assert result['truncated'] and result['content'].endswith('\n')
+    assert 'next_byte_offset' not in result
+    rest = read_file(path, start_line=result['next_line'], max_bytes=10_000)
+    assert result['content'] + rest['content'] == open(path, encoding='utf-8').read()
+
+
+def test_cut_inside_long_line_keeps_utf8_and_continues_by_byte(tmp_path):
+    text = '[xy' + '"café"' * 60000
+    path = _write(tmp_path / 'minified.json', text)
+    for kwargs in ({}, {'start_line': 1, 'end_line': 1}, {'head': 1}):
+        result = read_file(path, **kwargs)
+        assert result['success'], result
+        assert result['truncated'] and 'next_line' not in result
+        parts = [result['content']]
+        while 'next_byte_offset' in result:
+            result = read_file(path, byte_offset=result['next_byte_offset'])
+            parts.append(result['content'])
+        assert ''.join(parts) == text
+
+
+def test_cut_never_splits_a_character(tmp_path):
+    path = _write(tmp_path / 'accents.txt', 'é' * 100)
+    for max_bytes in (9, 10, 11):
+        result = read_file(path, max_bytes=max_bytes)
+        assert result['success'] and set(result['content']) == {'é'}
+        assert result['next_byte_offset'] == len(result['content']) * 2
+
+
+def test_truncated_tail_reports_omitted_bytes(tmp_path):
+    text = 'x' * 500 + '\nlast line\n'
+    path = _write(tmp_path / 'tail.txt', text)
+    result = read_file(path, tail=2, max_bytes=100)
+    assert result['truncated']
+    assert result['content'].endswith('last line\n')
+    omitted = read_file(path, byte_offset=result['omitted_byte_offset'], byte_length=result['omitted_bytes'],
+                        max_bytes=1000)
+    assert omitted['content'] + result['content'] == text
+
+
+def test_binary_file_is_rejected(tmp_path):
+    path = tmp_path / 'blob.bin'
+    path.write_bytes(bytes(range(256)))
+    assert read_file(str(path))['success'] is False